@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fuzz_parsers.py — Microbenchmarks y fuzzing de los parsers hechos a mano del toolkit.
+
+Una sola nota patológica (llaves sin cerrar, volcados de código de decenas de MB, anidación
+profunda, una línea interminable llena de comillas) puede atascar una ejecución entera.
+Este script ataca cada primitiva con entradas adversarias, deterministas (random con semilla):
+
+  Fuzz       cientos de entradas pequeñas por generador; cada primitiva no debe lanzar
+             excepciones y su resultado debe cumplir sus invariantes (los {…} empiezan en
+             '{' y acaban en '}', no se solapan, coinciden con un contador de llaves
+             ingenuo cuando no hay comillas que abran cadena —los apóstrofos de la prosa
+             no abren ninguna—, split de roles con nº impar de trozos…).
+  Medición   cada primitiva × generador a tamaños que se duplican: MB/s, cociente de tiempo
+             al duplicar el tamaño (lineal ≈ 2) y exponente de crecimiento de toda la serie
+             (pendiente de log tiempo frente a log tamaño: 1 lineal, 2 cuadrático). Un exponente
+             por encima de --max-exponent se marca como supralineal, y pasar del presupuesto de
+             segundos por MB de la primitiva corta esa serie (no se prueba el tamaño siguiente).
+             Cada medida es la mediana de --repeat ejecuciones; el exponente solo se juzga con
+             al menos 4 puntos por encima de --min-time, y antes de fallar se vuelve a medir
+             el punto más desviado de la recta.
+
+Sale con código 1 si algo falla (excepción, invariante, presupuesto o supralinealidad).
+
+Uso:
+  python fuzz_parsers.py
+  python fuzz_parsers.py --sizes-kb 256,512,1024,2048 --out fuzz.json
+  python fuzz_parsers.py --only find_balanced_dicts,role_split --gens long_line,quote_soup --budget role_split=0.5
+  python fuzz_parsers.py --sizes-kb 51200 --only parse_note_text --gens code_dump   (volcado de 50 MB)
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+HERE = Path(__file__).resolve().parent
+SCRIPTS = HERE.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+import CleanImageToolBlocks  # noqa: E402
+import RenderTetherQuotes  # noqa: E402
+import RoleBlockExtractor  # noqa: E402
+import tree_index  # noqa: E402
+import vault_catalog  # noqa: E402
+import vault_cleaner  # noqa: E402
+import vault_search  # noqa: E402
+from brace_scanner import SINGLE_QUOTE_OPENERS, balanced_spans  # noqa: E402
+
+DEFAULT_SIZES_KB = [64, 128, 256, 512, 1024]
+# Puntos por encima del ruido del reloj necesarios para juzgar el exponente, y veces que se
+# vuelve a medir el punto más desviado de la recta antes de dar una serie por supralineal
+MIN_FIT_POINTS = 4
+REMEASURES = 2
+WORDS = "hola mundo nota código valor clave índice rama It's isn't don't l'idea Bob's".split()
+
+# ---------------- Generadores adversarios ----------------
+# Cada generador: (random, nº aproximado de caracteres) → texto
+
+def _fill(rng: random.Random, size: int, piece: Callable[[random.Random], str]) -> str:
+    out, n = [], 0
+    while n < size:
+        p = piece(rng)
+        out.append(p)
+        n += len(p)
+    return "".join(out)
+
+def _note(payload: str) -> str:
+    return "---\ntitle: fuzz\ndate: 2024-01-01\n---\n\n### Tool\n" + payload
+
+def gen_unbalanced(rng: random.Random, size: int) -> str:
+    """Sobre todo '{' sin cerrar, con algo de texto y saltos de línea."""
+    return _note(_fill(rng, size, lambda r: r.choice(("{", "{", "{", "}", " a", "\n", "{'k': 1"))))
+
+def gen_deep(rng: random.Random, size: int) -> str:
+    """Anidación profunda: {'k': {'k': … } con la cola de cierres incompleta."""
+    depth = max(1, size // 14)
+    closes = depth - rng.randint(0, 3)
+    return _note("{'k': " * depth + "'v'" + "}" * closes + "\n")
+
+def _code_line(r: random.Random) -> str:
+    return r.choice((
+        "def f(x):\n",
+        "    return {'a': x, 'b': [i for i in range(3)], 'c': {'d': \"}{\"}}\n",
+        "    s = f\"{x!r} {{literal}} {y:>10}\"\n",
+        "    t = 'it\\'s a \\\\ path {'  # comentario con apóstrofo: don't\n",
+        "    js = \"{\\\"k\\\": \\\"v\\\"}\"\n",
+        "const o = { a: `tpl ${b}`, c: '}' };\n",
+        "    u = 'cadena sin cerrar {\n",
+        "    }\n",
+        "printf(\"%s}\\n\", \"{\");\n",
+    ))
+
+def gen_code_dump(rng: random.Random, size: int) -> str:
+    """Volcado de código: dicts, f-strings, escapes, cadenas sin cerrar, llaves en comentarios."""
+    return _note("```python\n" + _fill(rng, size, _code_line) + "```\n")
+
+def gen_long_line(rng: random.Random, size: int) -> str:
+    """Una única línea enorme (sin saltos) con apóstrofos, comillas, barras y llaves."""
+    return _note(_fill(rng, size, lambda r: r.choice(WORDS) + r.choice((" ", " ", "'", "\"", "\\", "{", "}", ": "))))
+
+def _prose_piece(r: random.Random) -> str:
+    return r.choice(WORDS) + r.choice((" ", " ", " ", ". ", ".\n", " {a: 1} ", " {k: {v: 2}} ", " {", "} "))
+
+def gen_prose(rng: random.Random, size: int) -> str:
+    """Prosa con apóstrofos (It's, isn't, l'idea) y {…} sin comillas en medio: nada tapa una llave."""
+    return _note(_fill(rng, size, _prose_piece))
+
+def gen_quote_soup(rng: random.Random, size: int) -> str:
+    """Sopa densa de los caracteres que cambian el estado de los escáneres."""
+    return _note("".join(rng.choice("{}'\"\\\n a:") for _ in range(size)))
+
+def _header_line(r: random.Random) -> str:
+    return r.choice(("### User\n", "### Assistant\n", "###   Tool  \n", "### Tool x\n", "###" + " " * 40 + "!\n",
+                     "###\n", "#### User\n", "texto\n", "\n"))
+
+def gen_role_headers(rng: random.Random, size: int) -> str:
+    """Miles de encabezados '### …', válidos y casi válidos, con cuerpos mínimos."""
+    return _note(_fill(rng, size, _header_line))
+
+def gen_frontmatter(rng: random.Random, size: int) -> str:
+    """Front-matter enorme y sin cierre: '---' al principio y claves hasta el final."""
+    return "---\n" + _fill(rng, size, lambda r: r.choice(("title: 'a: b'\n", "k: {x}\n", "sin dos puntos\n",
+                                                          "--- no cierra\n", "tags: #a #b\n")))
+
+def _tether(r: random.Random) -> str:
+    obj = {"content_type": "tether_quote", "url": "file-%06d" % r.randrange(10 ** 6),
+           "title": r.choice(WORDS), "text": " ".join(r.choice(WORDS) for _ in range(20))}
+    return (json.dumps(obj, ensure_ascii=False) if r.random() < 0.5 else repr(obj)) + "\n"
+
+def gen_tether(rng: random.Random, size: int) -> str:
+    """Caso normal pero grande: dicts tether_quote válidos (JSON y repr de Python)."""
+    return _note(_fill(rng, size, _tether))
+
+GENERATORS: Dict[str, Callable[[random.Random, int], str]] = {
+    "unbalanced": gen_unbalanced,
+    "deep": gen_deep,
+    "code_dump": gen_code_dump,
+    "long_line": gen_long_line,
+    "prose": gen_prose,
+    "quote_soup": gen_quote_soup,
+    "role_headers": gen_role_headers,
+    "frontmatter": gen_frontmatter,
+    "tether": gen_tether,
+}
+
+# ---------------- Invariantes ----------------
+# Cada comprobación: (texto, resultado) → mensaje de error o None
+
+# Comillas que abren cadena para brace_scanner: dobles, o simples detrás de : , [ { (
+OPENING_QUOTE_RE = re.compile(r'"|[' + re.escape(SINGLE_QUOTE_OPENERS) + r"]\s*'")
+
+def naive_spans(text: str, unclosed: str) -> List[tuple]:
+    """Contador de llaves sin cadenas, como los escáneres antiguos. Solo vale si ninguna comilla abre cadena."""
+    levels: List[List[tuple]] = [[]]
+    opened: List[int] = []
+    for i, c in enumerate(text):
+        if c == "{":
+            opened.append(i)
+            levels.append([])
+        elif c == "}" and opened:
+            levels.pop()
+            levels[-1].append((opened.pop(), i + 1))
+    if not opened or unclosed == "stop":
+        return levels[0]
+    if unclosed == "to_end":
+        return levels[0] + [(opened[0], len(text))]
+    return [span for level in levels for span in level]
+
+def spans_check(unclosed: str) -> Callable[[str, Any], Optional[str]]:
+    def check(text: str, spans: Any) -> Optional[str]:
+        last = 0
+        for k, (a, b) in enumerate(spans):
+            if not last <= a < b <= len(text):
+                return f"tramo fuera de orden o de rango: {(a, b)}"
+            open_end = unclosed == "to_end" and k == len(spans) - 1 and b == len(text)
+            if text[a] != "{" or (text[b - 1] != "}" and not open_end):
+                return f"tramo sin llaves en los extremos: {text[a:b][:40]!r}"
+            last = b
+        if not OPENING_QUOTE_RE.search(text):
+            got, expected = list(spans), naive_spans(text, unclosed)
+            if got != expected:
+                i = next((i for i, (x, y) in enumerate(zip(got, expected)) if x != y), min(len(got), len(expected)))
+                return f"distinto del contador ingenuo en el tramo {i}: {got[i:i + 2]} != {expected[i:i + 2]}"
+        return None
+    return check
+
+def check_front_messages(text: str, res: Any) -> Optional[str]:
+    front, messages = res
+    if not isinstance(front, dict) or not isinstance(messages, list):
+        return "no devuelve (dict, list)"
+    if any(not m["role"].isalpha() or m["role"] != m["role"].lower() for m in messages):
+        return "rol con caracteres no alfabéticos o en mayúsculas"
+    return None
+
+def check_dict(text: str, res: Any) -> Optional[str]:
+    return None if isinstance(res, dict) else f"no devuelve dict: {type(res).__name__}"
+
+def check_split_front(text: str, res: Any) -> Optional[str]:
+    fm_lines, body = res
+    if fm_lines is None:
+        return None if body == text else "sin front-matter pero el cuerpo no es el texto"
+    return None if len(body) < len(text) else "con front-matter pero el cuerpo no es más corto"
+
+def check_role_split(text: str, parts: Any) -> Optional[str]:
+    return None if len(parts) % 2 == 1 else f"nº de trozos par: {len(parts)}"
+
+def check_any(text: str, res: Any) -> Optional[str]:
+    return None
+
+# ---------------- Primitivas ----------------
+
+class Primitive(NamedTuple):
+    run: Callable[[str, str], Any]   # (texto, ruta del mismo texto en disco) → resultado
+    check: Callable[[str, Any], Optional[str]]
+    budget: float                    # segundos por MB
+    uses_file: bool = False
+
+PRIMITIVES: Dict[str, Primitive] = {
+    "read_front_matter": Primitive(lambda t, p: vault_cleaner.read_front_matter(p), check_front_messages, 1.0, True),
+    "parse_note_text": Primitive(lambda t, p: vault_cleaner.parse_note_text(t), check_front_messages, 1.0),
+    "tree_read_frontmatter": Primitive(lambda t, p: tree_index.read_frontmatter(Path(p)), check_dict, 1.0, True),
+    "split_front_matter": Primitive(lambda t, p: vault_catalog.split_front_matter(t), check_split_front, 1.0),
+    "role_split": Primitive(lambda t, p: vault_search.ROLE_SPLIT_RE.split(t), check_role_split, 0.5),
+    "find_dict_spans": Primitive(lambda t, p: RoleBlockExtractor.find_dict_spans(t), spans_check("inner"), 4.0),
+    "find_balanced_dicts": Primitive(lambda t, p: RenderTetherQuotes.find_balanced_dicts(t), spans_check("stop"), 4.0),
+    "find_balanced_blocks": Primitive(lambda t, p: CleanImageToolBlocks.find_balanced_blocks(t),
+                                      spans_check("to_end"), 4.0),
+    "parse_json_like": Primitive(lambda t, p: RenderTetherQuotes.parse_json_like(t), check_any, 4.0),
+    "parse_json_like_dicts": Primitive(
+        lambda t, p: [RenderTetherQuotes.parse_json_like(t[a:b]) for a, b in balanced_spans(t)], check_any, 8.0),
+}
+
+# ---------------- Fuzz ----------------
+
+def fuzz(names: List[str], gens: List[str], cases: int, seed: int, tmp: Path) -> List[str]:
+    """Entradas pequeñas (y variantes sin comillas, para el contador ingenuo): errores encontrados."""
+    rng = random.Random(seed)
+    path = tmp / "fuzz.md"
+    failures: List[str] = []
+    for gen in gens:
+        for case in range(cases):
+            text = GENERATORS[gen](rng, rng.randint(0, 400))
+            if case % 3 == 0:
+                text = text.replace("'", "").replace('"', "")
+            path.write_text(text, encoding="utf-8", newline="")
+            for name in names:
+                prim = PRIMITIVES[name]
+                try:
+                    error = prim.check(text, prim.run(text, str(path)))
+                except Exception as e:
+                    error = f"excepción {type(e).__name__}: {e}"
+                if error:
+                    failures.append(f"{name} / {gen}: {error} — entrada {text[:80]!r}")
+    return failures
+
+# ---------------- Medición ----------------
+
+def time_once(prim: Primitive, text: str, path: str, repeat: int) -> float:
+    """Mediana de `repeat` ejecuciones: un pico de la máquina no mueve la medida."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        prim.run(text, path)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+def fit_line(rows: List[Dict[str, Any]]) -> Optional[tuple]:
+    """(pendiente, ordenada) por mínimos cuadrados de log(segundos) frente a log(MB)."""
+    points = [(math.log(r["mb"]), math.log(r["seconds"])) for r in rows]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    if not sxx:
+        return None
+    slope = sum((x - mx) * (y - my) for x, y in points) / sxx
+    return slope, my - slope * mx
+
+def growth_exponent(rows: List[Dict[str, Any]]) -> Optional[float]:
+    """Pendiente de la serie. None con menos de MIN_FIT_POINTS puntos (no da para juzgar)."""
+    if len(rows) < MIN_FIT_POINTS:
+        return None
+    line = fit_line(rows)
+    return line[0] if line else None
+
+def worst_point(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """El punto más alejado de la recta ajustada (candidato a medida ruidosa)."""
+    slope, intercept = fit_line(rows)
+    return max(rows, key=lambda r: abs(math.log(r["seconds"]) - slope * math.log(r["mb"]) - intercept))
+
+def fill_row(row: Dict[str, Any], prev: Optional[Dict[str, Any]], min_time: float) -> None:
+    """Velocidad, s/MB y cociente al duplicar respecto al punto anterior."""
+    mb, seconds = row["mb"], row["seconds"]
+    row["mb_per_s"] = round(mb / seconds, 2) if seconds > 0 else None
+    row["s_per_mb"] = round(seconds / mb, 4)
+    row.pop("ratio", None)
+    if prev and prev["seconds"] > 0 and seconds >= min_time:
+        row["ratio"] = round(seconds / prev["seconds"] * prev["mb"] * 2 / mb, 2)
+
+def bench(name: str, gen: str, sizes_kb: List[int], budget: float, repeat: int, seed: int,
+          max_exponent: float, min_time: float, tmp: Path) -> Dict[str, Any]:
+    """Serie de tamaños crecientes de una primitiva con un generador."""
+    prim = PRIMITIVES[name]
+    path = tmp / f"{name}.md"
+    rows: List[Dict[str, Any]] = []
+    problems: List[str] = []
+
+    def measure(kb: int) -> tuple:
+        text = GENERATORS[gen](random.Random(seed), kb * 1024)
+        if prim.uses_file:
+            path.write_text(text, encoding="utf-8", newline="")
+        return len(text.encode("utf-8")) / 1e6, time_once(prim, text, str(path), repeat)
+
+    for kb in sizes_kb:
+        try:
+            mb, seconds = measure(kb)
+        except Exception as e:
+            problems.append(f"{kb} KB: excepción {type(e).__name__}: {e}")
+            break
+        row = {"kb": kb, "mb": round(mb, 3), "seconds": round(seconds, 5)}
+        fill_row(row, rows[-1] if rows else None, min_time)
+        rows.append(row)
+        if seconds >= min_time and seconds / mb > budget:
+            problems.append(f"{kb} KB: {seconds / mb:.2f} s/MB > presupuesto {budget} s/MB")
+            break
+
+    # Solo las medidas por encima del ruido del reloj cuentan para el exponente. Antes de dar
+    # la serie por supralineal se vuelve a medir el punto más desviado (se queda la menor).
+    exponent = growth_exponent([r for r in rows if r["seconds"] >= min_time])
+    for _ in range(REMEASURES):
+        if exponent is None or exponent <= max_exponent:
+            break
+        row = worst_point([r for r in rows if r["seconds"] >= min_time])
+        row["seconds"] = round(min(row["seconds"], measure(row["kb"])[1]), 5)
+        for i, r in enumerate(rows):
+            fill_row(r, rows[i - 1] if i else None, min_time)
+        exponent = growth_exponent([r for r in rows if r["seconds"] >= min_time])
+    if path.exists():
+        path.unlink()
+    if exponent is not None and exponent > max_exponent:
+        problems.append(f"supralineal (tiempo ∝ tamaño^{exponent:.2f})")
+    return {"primitive": name, "generator": gen, "budget_s_per_mb": budget,
+            "exponent": None if exponent is None else round(exponent, 2), "rows": rows, "problems": problems}
+
+def print_series(res: Dict[str, Any]) -> None:
+    cells = []
+    for r in res["rows"]:
+        speed = f"{r['mb_per_s']:.1f} MB/s" if r["mb_per_s"] else "∞"
+        cells.append(f"{r['kb']}K {speed}" + (f" x{r['ratio']}" if "ratio" in r else ""))
+    exponent = f"  ^{res['exponent']:.2f}" if res["exponent"] is not None else ""
+    mark = "  ⚠️ " + "; ".join(res["problems"]) if res["problems"] else ""
+    print(f"  {res['primitive']:<22} {res['generator']:<13} " + " · ".join(cells) + exponent + mark)
+
+# ---------------- CLI ----------------
+
+def parse_list(raw: Optional[str], valid: Dict[str, Any], what: str) -> List[str]:
+    if not raw:
+        return list(valid)
+    names = [s.strip() for s in raw.split(",") if s.strip()]
+    unknown = [n for n in names if n not in valid]
+    if unknown:
+        raise SystemExit(f"❌ {what} desconocidos: {', '.join(unknown)} (válidos: {', '.join(valid)})")
+    return names
+
+def parse_budgets(raw: List[str]) -> Dict[str, float]:
+    budgets = {name: prim.budget for name, prim in PRIMITIVES.items()}
+    for item in raw:
+        name, _, value = item.partition("=")
+        if name not in PRIMITIVES:
+            raise SystemExit(f"❌ --budget: primitiva desconocida {name!r}")
+        try:
+            budgets[name] = float(value)
+        except ValueError:
+            raise SystemExit(f"❌ --budget no válido: {item}")
+    return budgets
+
+def main():
+    ap = argparse.ArgumentParser(description="Microbenchmarks y fuzzing de los parsers con entradas adversarias.")
+    ap.add_argument("--sizes-kb", default=",".join(map(str, DEFAULT_SIZES_KB)),
+                    help="Tamaños de entrada en KB, separados por comas (mejor si se duplican)")
+    ap.add_argument("--only", default=None, help=f"Primitivas a probar (por defecto todas: {', '.join(PRIMITIVES)})")
+    ap.add_argument("--gens", default=None, help=f"Generadores (por defecto todos: {', '.join(GENERATORS)})")
+    ap.add_argument("--budget", action="append", default=[], metavar="PRIMITIVA=S_POR_MB",
+                    help="Cambia el presupuesto de una primitiva (repetible)")
+    ap.add_argument("--max-exponent", type=float, default=1.5,
+                    help="Exponente de crecimiento máximo (1 = lineal, 2 = cuadrático)")
+    ap.add_argument("--min-time", type=float, default=0.02,
+                    help="Por debajo de estos segundos no se juzga (ruido del reloj)")
+    ap.add_argument("--repeat", type=int, default=3, help="Repeticiones por medida (se queda la mediana)")
+    ap.add_argument("--cases", type=int, default=200, help="Entradas de fuzz por generador (0 = sin fuzz)")
+    ap.add_argument("--seed", type=int, default=1, help="Semilla de los generadores")
+    ap.add_argument("--out", default=None, help="JSON con todas las medidas")
+    args = ap.parse_args()
+
+    names = parse_list(args.only, PRIMITIVES, "Primitivas")
+    gens = parse_list(args.gens, GENERATORS, "Generadores")
+    budgets = parse_budgets(args.budget)
+    try:
+        sizes_kb = sorted(int(s) for s in args.sizes_kb.split(",") if s.strip())
+    except ValueError:
+        raise SystemExit(f"❌ --sizes-kb no válido: {args.sizes_kb}")
+
+    failures: List[str] = []
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="memoria_fuzz_") as tmp:
+        if args.cases > 0:
+            print(f"▶ Fuzz: {args.cases} entradas × {len(gens)} generadores × {len(names)} primitivas")
+            fuzz_failures = fuzz(names, gens, args.cases, args.seed, Path(tmp))
+            for f in fuzz_failures[:20]:
+                print("  ❌ " + f)
+            if len(fuzz_failures) > 20:
+                print(f"  … y {len(fuzz_failures) - 20} más")
+            failures.extend(fuzz_failures)
+
+        print(f"\n▶ Rendimiento ({', '.join(f'{kb} KB' for kb in sizes_kb)}):")
+        for name in names:
+            for gen in gens:
+                res = bench(name, gen, sizes_kb, budgets[name], args.repeat, args.seed,
+                            args.max_exponent, args.min_time, Path(tmp))
+                print_series(res)
+                results.append(res)
+                failures.extend(f"{name} / {gen}: {p}" for p in res["problems"])
+
+    if args.out:
+        report = {"python": sys.version.split()[0], "cpu_count": os.cpu_count(), "seed": args.seed,
+                  "sizes_kb": sizes_kb, "results": results, "failures": failures}
+        Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n✅ Resultados: {Path(args.out).resolve()}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} problema(s).")
+        sys.exit(1)
+    print("\n✅ Ninguna primitiva se sale de su presupuesto ni crece de forma supralineal.")
+
+if __name__ == "__main__":
+    main()
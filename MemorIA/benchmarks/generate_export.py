@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+generate_export.py — Exportación FALSA de ChatGPT, determinista, para medir el toolkit.
+
+Con la misma semilla y los mismos parámetros genera exactamente el mismo ZIP:
+- conversations.json con árboles `mapping` (parent/children, current_node)
+- ramas alternativas (regeneraciones) en una fracción de las conversaciones
+- gizmo_id de proyecto (g-p-<hex>) y su gizmo_map.json al lado del ZIP
+- referencias sediment://file_<id> con su imagen dentro del ZIP (algunas con bytes repetidos)
+- dicts tether_quote (JSON y estilo Python) y audio_transcription/audio_asset_pointer
+- conversaciones repetidas con un mensaje más, como en backups sucesivos
+
+Uso:
+  python generate_export.py /tmp/bench/export.zip --conversations 1000
+  python generate_export.py /tmp/bench/conversations.json --conversations 100 --seed 7   (sin imágenes)
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+WORDS = (
+    "memoria ritual vault obsidian python datos glitch kawaii nota proyecto idea código "
+    "función bucle índice imagen archivo luna sueño mapa árbol rama mensaje prueba tecnico "
+    "script carpeta limpieza etiqueta fecha resumen texto párrafo lista orden capa motor "
+    "hola mundo café viaje clave valor nodo grafo cola pila diccionario cadena número"
+).split()
+GENERIC_TITLES = ["New chat", "Conversación nueva", ""]
+BASE_EPOCH = 1672531200  # 2023-01-01
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+ZIP_DATE = (2024, 1, 1, 0, 0, 0)  # fecha fija en las entradas: mismo ZIP byte a byte
+
+DEFAULTS: Dict[str, Any] = {
+    "conversations": 1000,
+    "messages": 12,
+    "message_words": 80,
+    "branch_rate": 0.2,
+    "gizmos": 5,
+    "gizmo_rate": 0.4,
+    "image_rate": 0.05,
+    "image_bytes": 2048,
+    "image_dup_rate": 0.1,
+    "tether_rate": 0.05,
+    "audio_rate": 0.03,
+    "duplicate_rate": 0.1,
+    "seed": 1,
+}
+
+class ExportGenerator:
+    def __init__(self, **params):
+        self.p = dict(DEFAULTS, **{k: v for k, v in params.items() if v is not None})
+        self.rng = random.Random(self.p["seed"])
+        self.gizmo_ids = [f"g-p-{self.hex(32)}" for _ in range(self.p["gizmos"])]
+        self.images: List[str] = []
+        self.node_seq = 0
+
+    def hex(self, n: int) -> str:
+        return f"{self.rng.getrandbits(n * 4):0{n}x}"
+
+    def words(self, n: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(max(1, n)))
+
+    def paragraphs(self) -> str:
+        total = max(1, int(self.rng.gauss(self.p["message_words"], self.p["message_words"] / 3)))
+        paras = []
+        while total > 0:
+            n = min(total, self.rng.randint(10, 60))
+            paras.append(self.words(n))
+            total -= n
+        return "\n\n".join(paras)
+
+    # ---------------- Mensajes ----------------
+
+    def tether_dict(self) -> Dict[str, Any]:
+        return {"content_type": "tether_quote", "url": f"file-{self.hex(24)}",
+                "domain": f"{self.rng.choice(WORDS).capitalize()}.md",
+                "text": "\n".join(self.words(self.rng.randint(5, 25)) for _ in range(self.rng.randint(1, 4))),
+                "title": self.words(3)}
+
+    def content(self, role: str) -> Any:
+        r = self.rng.random()
+        p = self.p
+        if role == "tool" and r < p["tether_rate"] * 4:
+            # Como content directo sale como JSON; dentro de parts, como repr de Python
+            if self.rng.random() < 0.5:
+                return self.tether_dict()
+            return {"content_type": "multimodal_text", "parts": [self.tether_dict()]}
+        if role == "user" and r < p["audio_rate"]:
+            start = round(self.rng.uniform(0, 30), 2)
+            return {"content_type": "multimodal_text", "parts": [
+                {"content_type": "audio_transcription", "text": self.words(self.rng.randint(8, 40)),
+                 "metadata": {"start": start, "end": round(start + self.rng.uniform(1, 20), 2)}},
+                {"content_type": "audio_asset_pointer", "asset_pointer": f"sediment://file_{self.hex(32)}",
+                 "format": "wav", "size_bytes": self.rng.randint(10_000, 900_000),
+                 "metadata": {"start": start, "end": start + 2.5}},
+            ]}
+        if r < p["image_rate"]:
+            file_id = f"file_{self.hex(32)}"
+            self.images.append(file_id)
+            return {"content_type": "multimodal_text", "parts": [
+                {"content_type": "image_asset_pointer", "asset_pointer": f"sediment://{file_id}",
+                 "size_bytes": p["image_bytes"], "width": 512, "height": 512},
+                self.paragraphs(),
+            ]}
+        return {"content_type": "text", "parts": [self.paragraphs()]}
+
+    def node(self, mapping: Dict[str, Any], parent: str, role: str, t: float) -> str:
+        self.node_seq += 1
+        nid = f"{self.node_seq:x}-{self.hex(8)}"
+        mapping[nid] = {"id": nid, "parent": parent, "children": [], "message": {
+            "id": nid, "author": {"role": role}, "create_time": t, "content": self.content(role)}}
+        mapping[parent]["children"].append(nid)
+        return nid
+
+    # ---------------- Conversaciones ----------------
+
+    def conversation(self) -> Dict[str, Any]:
+        p = self.p
+        ct = BASE_EPOCH + self.rng.randint(0, 3 * 365 * 86400)
+        if self.rng.random() < 0.15:
+            title = self.rng.choice(GENERIC_TITLES)
+        else:
+            title = self.words(self.rng.randint(2, 6)).capitalize()
+        mapping: Dict[str, Any] = {"root": {"id": "root", "parent": None, "children": [], "message": None}}
+        n_msgs = max(2, int(self.rng.gauss(p["messages"], p["messages"] / 3)))
+        branchy = self.rng.random() < p["branch_rate"]
+        cur = "root"
+        t = float(ct)
+        for k in range(n_msgs):
+            role = "user" if k % 2 == 0 else ("tool" if self.rng.random() < 0.15 else "assistant")
+            if branchy and k > 1 and role != "user" and self.rng.random() < 0.3:
+                # Regeneración abandonada: rama hermana de 1–3 mensajes antes del hilo principal
+                alt = cur
+                for j in range(self.rng.randint(1, 3)):
+                    alt = self.node(mapping, alt, "assistant" if j % 2 == 0 else "user", t)
+            t += self.rng.uniform(5, 600)
+            cur = self.node(mapping, cur, role, t)
+        cid = self.hex(32)
+        conv = {"id": cid, "conversation_id": cid, "title": title,
+                "create_time": float(ct), "update_time": t, "mapping": mapping, "current_node": cur}
+        if self.rng.random() < p["gizmo_rate"]:
+            conv["gizmo_id"] = self.rng.choice(self.gizmo_ids)
+        return conv
+
+    def extended_copy(self, conv: Dict[str, Any]) -> Dict[str, Any]:
+        """La misma conversación en un backup posterior: un mensaje más al final."""
+        dup = json.loads(json.dumps(conv))
+        t = dup["update_time"] + self.rng.uniform(60, 86400)
+        dup["current_node"] = self.node(dup["mapping"], dup["current_node"], "user", t)
+        dup["update_time"] = t
+        return dup
+
+    def iter_conversations(self):
+        for _ in range(self.p["conversations"]):
+            conv = self.conversation()
+            yield conv
+            if self.rng.random() < self.p["duplicate_rate"]:
+                yield self.extended_copy(conv)
+
+    def image_bytes(self, prev: List[bytes]) -> bytes:
+        if prev and self.rng.random() < self.p["image_dup_rate"]:
+            return self.rng.choice(prev)
+        data = PNG_SIGNATURE + self.rng.getrandbits(8 * self.p["image_bytes"]).to_bytes(self.p["image_bytes"], "big")
+        prev.append(data)
+        del prev[:-64]
+        return data
+
+def write_conversations(gen: ExportGenerator, f: io.TextIOBase) -> int:
+    """Escribe el array JSON conversación a conversación (memoria ~una conversación)."""
+    count = 0
+    f.write("[")
+    for conv in gen.iter_conversations():
+        if count:
+            f.write(",\n")
+        f.write(json.dumps(conv, ensure_ascii=False))
+        count += 1
+    f.write("]")
+    return count
+
+def generate(out_path: Path, **params) -> Dict[str, Any]:
+    """Genera la exportación (ZIP o .json) y gizmo_map.json en la misma carpeta. Devuelve un resumen."""
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    gen = ExportGenerator(**params)
+
+    if out_path.suffix.lower() == ".json":
+        with open(out_path, "w", encoding="utf-8") as f:
+            count = write_conversations(gen, f)
+    else:
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            info = zipfile.ZipInfo("conversations.json", ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zf.open(info, "w") as raw, \
+                    io.TextIOWrapper(raw, encoding="utf-8") as f:
+                count = write_conversations(gen, f)
+            recent: List[bytes] = []
+            for file_id in gen.images:
+                zf.writestr(zipfile.ZipInfo(f"{file_id}-{gen.hex(8)}.png", ZIP_DATE), gen.image_bytes(recent))
+
+    gizmo_map = {gid: f"Proyecto {i + 1}" for i, gid in enumerate(gen.gizmo_ids)}
+    (out_path.parent / "gizmo_map.json").write_text(json.dumps(gizmo_map, indent=2), encoding="utf-8")
+    return {"path": str(out_path), "conversations": count, "images": len(gen.images),
+            "bytes": os.path.getsize(out_path), "params": gen.p}
+
+def main():
+    ap = argparse.ArgumentParser(description="Genera una exportación falsa y determinista de ChatGPT.")
+    ap.add_argument("out", help="Ruta de salida: .zip (con imágenes) o .json")
+    for key, value in DEFAULTS.items():
+        ap.add_argument("--" + key.replace("_", "-"), type=type(value), default=None,
+                        help=f"(por defecto {value})")
+    args = ap.parse_args()
+
+    params = {k: getattr(args, k) for k in DEFAULTS}
+    info = generate(Path(args.out).expanduser(), **params)
+    print(f"✅ {info['path']}")
+    print(f"   Conversaciones: {info['conversations']}  ·  imágenes: {info['images']}"
+          f"  ·  {info['bytes'] / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
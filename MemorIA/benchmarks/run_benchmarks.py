@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+run_benchmarks.py — Mide el toolkit de punta a punta sobre exportaciones sintéticas.
+
+Para cada tamaño (nº de conversaciones) genera una exportación con generate_export.py y
+ejecuta, cada script en su propio proceso y en el orden del pipeline:
+
+  split        split_chatgpt_export.py   ZIP → RAW_VAULT
+  images       extract_images_from_zips_dedup.py   ZIP → IMAGE_BANK
+  clean        vault_cleaner.py          RAW → MERGED + REVERSE (--merge)
+  inject, roleblock, tether, imageblocks, tidy   cada script suelto sobre MERGED
+  transform    vault_transform.py        las cinco etapas juntas sobre REVERSE
+  tree_index   tree_index.py             MERGED, sin caché
+  tree_index_warm                        MERGED, segunda pasada con la caché ya hecha
+
+Guarda un JSON con el tiempo real y de CPU de cada paso, y con --baseline compara contra
+otro JSON anterior: sale con código 1 si algún paso es más lento que la tolerancia.
+
+Uso:
+  python run_benchmarks.py --sizes 1000,10000 --out bench.json
+  python run_benchmarks.py --sizes 1000,10000 --out bench_new.json --baseline bench.json --tolerance 0.25
+  python run_benchmarks.py --sizes 1000 --steps split,clean --keep --workdir /tmp/memoria_bench
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from generate_export import DEFAULTS, generate
+
+HERE = Path(__file__).resolve().parent
+SCRIPTS = HERE.parent / "scripts"
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# ---------------- Pasos ----------------
+# Cada paso: contexto → argv del script (relativo a MemorIA/scripts)
+
+def _fix_step(script: str) -> Callable[[Dict[str, Any]], List[str]]:
+    return lambda c: [script, str(c["merged"]), "--in-place", "--no-backup", "--jobs", str(c["jobs"])]
+
+STEPS: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "split": lambda c: ["split_chatgpt_export.py", str(c["zip"]), str(c["raw"] / "Conversaciones"),
+                        "--by-year", "--by-month", "--make-index", "--tag-indexes", "--stream",
+                        "--tag-map", str(SCRIPTS / "sample_tag_map.json"), "--gizmo-map", str(c["gizmo_map"]),
+                        "--keep-versions", "--suffix-on-duplicate", "--no-dedupe", "--skip-identical",
+                        "--workers", str(c["workers"])],
+    "images": lambda c: ["extract_images_from_zips_dedup.py", str(c["zip"].parent), str(c["bank"])],
+    "clean": lambda c: ["vault_cleaner.py", str(c["raw"]), "--target", f"forward={c['merged']}",
+                        "--target", f"reverse={c['reverse']}", "--merge", "--by-year", "--by-month"],
+    "inject": lambda c: ["ImageLinkInjector.py", str(c["merged"]), str(c["bank"]),
+                         "--in-place", "--no-backup", "--jobs", str(c["jobs"])],
+    "roleblock": _fix_step("RoleBlockExtractor.py"),
+    "tether": _fix_step("RenderTetherQuotes.py"),
+    "imageblocks": _fix_step("CleanImageToolBlocks.py"),
+    "tidy": _fix_step("TidyBlankLines.py"),
+    "transform": lambda c: ["vault_transform.py", str(c["reverse"]), "--image-bank", str(c["bank"]),
+                            "--in-place", "--no-backup", "--jobs", str(c["jobs"])],
+    "tree_index": lambda c: ["tree_index.py", str(c["merged"])],
+    "tree_index_warm": lambda c: ["tree_index.py", str(c["merged"])],
+}
+
+def count_notes(root: Path) -> int:
+    return sum(1 for _ in root.rglob("*.md")) if root.is_dir() else 0
+
+def dir_bytes(root: Path) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file()) if root.is_dir() else 0
+
+def run_script(argv: List[str], log_path: Path) -> Dict[str, Any]:
+    """Ejecuta un script de MemorIA/scripts en un proceso nuevo; devuelve tiempos y código de salida."""
+    before = os.times()
+    t0 = time.perf_counter()
+    with open(log_path, "a", encoding="utf-8") as log:
+        log.write(f"\n$ {' '.join(argv)}\n")
+        log.flush()
+        proc = subprocess.run([sys.executable, *argv], cwd=SCRIPTS, stdout=log, stderr=subprocess.STDOUT,
+                              stdin=subprocess.DEVNULL, env=dict(os.environ, PYTHONIOENCODING="utf-8"))
+    wall = time.perf_counter() - t0
+    after = os.times()
+    cpu = (after.children_user - before.children_user) + (after.children_system - before.children_system)
+    return {"seconds": round(wall, 4), "cpu_seconds": round(cpu, 4), "returncode": proc.returncode}
+
+def bench_size(size: int, steps: List[str], workdir: Path, gen_params: Dict[str, Any],
+               jobs: int, workers: int) -> List[Dict[str, Any]]:
+    base = workdir / f"n{size}"
+    if base.exists():
+        shutil.rmtree(base)
+    ctx: Dict[str, Any] = {
+        "zip": base / "export" / "export.zip",
+        "gizmo_map": base / "export" / "gizmo_map.json",
+        "raw": base / "RAW_VAULT",
+        "merged": base / "MERGED_VAULT",
+        "reverse": base / "REVERSE_VAULT",
+        "bank": base / "IMAGE_BANK",
+        "jobs": jobs,
+        "workers": workers,
+    }
+    log_path = base / "bench.log"
+
+    t0 = time.perf_counter()
+    info = generate(ctx["zip"], **dict(gen_params, conversations=size))
+    results = [{"size": size, "step": "generate", "seconds": round(time.perf_counter() - t0, 4),
+                "conversations": info["conversations"], "images": info["images"], "bytes": info["bytes"]}]
+    print(f"\n▶ {size} conversaciones ({info['conversations']} con repetidas, {info['bytes'] / 1e6:.1f} MB)")
+
+    for name in steps:
+        res = run_script(STEPS[name](ctx), log_path)
+        row = {"size": size, "step": name, **res}
+        if name == "split":
+            row["notes"] = count_notes(ctx["raw"])
+        elif name == "clean":
+            row["notes"] = count_notes(ctx["merged"])
+            row["bytes"] = dir_bytes(ctx["merged"])
+        if row.get("notes") and res["seconds"] > 0:
+            row["notes_per_second"] = round(row["notes"] / res["seconds"], 1)
+        results.append(row)
+        status = "" if res["returncode"] == 0 else f"  ❌ código {res['returncode']} (ver {log_path})"
+        print(f"  {name:<16} {res['seconds']:>9.2f} s  (CPU {res['cpu_seconds']:.2f} s){status}")
+    return results
+
+# ---------------- Comparación ----------------
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float, min_delta: float) -> List[str]:
+    """Pasos más lentos que la línea base en más de `tolerance` (y de `min_delta` segundos)."""
+    base = {(r["size"], r["step"]): r for r in baseline}
+    regressions = []
+    print("\nComparación con la línea base:")
+    for r in results:
+        b = base.get((r["size"], r["step"]))
+        if not b or r["step"] == "generate" or not b.get("seconds"):
+            continue
+        ratio = r["seconds"] / b["seconds"]
+        slower = ratio > 1 + tolerance and r["seconds"] - b["seconds"] > min_delta
+        mark = "  ⚠️ más lento" if slower else ""
+        print(f"  {r['size']:>7} {r['step']:<16} {b['seconds']:>9.2f} s → {r['seconds']:>9.2f} s  (x{ratio:.2f}){mark}")
+        if slower:
+            regressions.append(f"{r['size']} {r['step']}: x{ratio:.2f}")
+        if r.get("returncode") and not b.get("returncode"):
+            regressions.append(f"{r['size']} {r['step']}: falla (código {r['returncode']})")
+    return regressions
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def parse_sizes(raw: str) -> List[int]:
+    try:
+        return [int(s) for s in raw.split(",") if s.strip()]
+    except ValueError:
+        raise SystemExit(f"❌ --sizes no válido: {raw}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks de punta a punta con exportaciones sintéticas.")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                    help="Nº de conversaciones por ronda, separados por comas")
+    ap.add_argument("--steps", default=None, help=f"Pasos a medir (por defecto todos: {', '.join(STEPS)})")
+    ap.add_argument("--out", default="bench_results.json", help="JSON de resultados")
+    ap.add_argument("--baseline", default=None, help="JSON de una ejecución anterior para comparar")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="Margen sobre la línea base (0.25 = +25 %%)")
+    ap.add_argument("--min-delta", type=float, default=0.25, help="Ignora diferencias menores (segundos)")
+    ap.add_argument("--workdir", default=None, help="Carpeta de trabajo (por defecto, una temporal)")
+    ap.add_argument("--keep", action="store_true", help="No borra la carpeta de trabajo al terminar")
+    ap.add_argument("--jobs", type=int, default=1, help="--jobs de los scripts de limpieza")
+    ap.add_argument("--workers", type=int, default=1, help="--workers del splitter")
+    for key in ("messages", "message_words", "branch_rate", "image_rate", "tether_rate", "seed"):
+        ap.add_argument("--" + key.replace("_", "-"), type=type(DEFAULTS[key]), default=DEFAULTS[key],
+                        help="Parámetro del generador")
+    args = ap.parse_args()
+
+    sizes = parse_sizes(args.sizes)
+    steps = [s.strip() for s in args.steps.split(",")] if args.steps else list(STEPS)
+    unknown = [s for s in steps if s not in STEPS]
+    if unknown:
+        raise SystemExit(f"❌ Pasos desconocidos: {', '.join(unknown)} (válidos: {', '.join(STEPS)})")
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")).get("results") or []
+
+    workdir = Path(args.workdir).expanduser().resolve() if args.workdir else Path(tempfile.mkdtemp(prefix="memoria_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    gen_params = {k: getattr(args, k) for k in ("messages", "message_words", "branch_rate",
+                                                 "image_rate", "tether_rate", "seed")}
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for size in sizes:
+            results.extend(bench_size(size, steps, workdir, gen_params, args.jobs, args.workers))
+            if not args.keep:
+                shutil.rmtree(workdir / f"n{size}", ignore_errors=True)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jobs": args.jobs,
+            "workers": args.workers,
+            "generator": gen_params,
+        },
+        "results": results,
+    }
+    out = Path(args.out)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n✅ Resultados: {out.resolve()}")
+
+    failed = [f"{r['size']} {r['step']}" for r in results if r.get("returncode")]
+    if failed:
+        print("❌ Pasos con error: " + ", ".join(failed))
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print("\n❌ Regresiones: " + "; ".join(regressions))
+            sys.exit(1)
+        print("\n✅ Sin regresiones frente a la línea base.")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
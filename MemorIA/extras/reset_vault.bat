@@ -1,19 +1,22 @@
-::reset_vault.bat "G:\obsidian\RAW_VAULT"
+::reset_vault.bat "G:\obsidian\RAW_VAULT" [OTRO_VAULT_LIMPIO ...]
 
 ::Borra y recrea la carpeta Conversaciones/.
-::Borra _index.md, la carpeta _tags/ y _import_manifest.json.
+::Borra _index.md, la carpeta _tags/, _import_manifest.json y .memoria_catalog.sqlite.
+::Borra el estado incremental de vault_cleaner (.cleaner_state.json), que vive en la raíz de los
+::vaults LIMPIOS (--target): el propio vault si lo es, MERGED_VAULT y REVERSE_VAULT junto a él
+::y cualquier otro LIMPIO que se pase detrás. Si no, el siguiente --incremental se saltaría notas.
 ::Deja limpio el vault, pero sin tocar Dashboard.md, Guia.md, etc.
 
 @echo off
 :: Resetear Conversaciones/ y archivos auxiliares en un Vault
 
 if "%~1"=="" (
-  echo Uso: reset_vault.bat RUTA_AL_VAULT
+  echo Uso: reset_vault.bat RUTA_AL_VAULT [OTRO_VAULT_LIMPIO ...]
   echo Ejemplo: reset_vault.bat "G:\obsidian\RAW_VAULT"
   exit /b 1
 )
 
-set VAULT=%~1
+set "VAULT=%~1"
 
 echo OJO  Esto va a BORRAR las notas en "%VAULT%\Conversaciones"
 echo.
@@ -29,6 +32,18 @@ rmdir /S /Q "%VAULT%\_tags" 2>nul
 
 echo Eliminando manifiestos antiguos...
 del "%VAULT%\_import_manifest.json" 2>nul
+del "%VAULT%\.memoria_catalog.sqlite" 2>nul
+
+echo Eliminando estado incremental de los vaults LIMPIOS...
+del "%VAULT%\.cleaner_state.json" 2>nul
+del "%VAULT%\..\MERGED_VAULT\.cleaner_state.json" 2>nul
+del "%VAULT%\..\REVERSE_VAULT\.cleaner_state.json" 2>nul
+:otros_limpios
+shift
+if "%~1"=="" goto fin_limpios
+del "%~1\.cleaner_state.json" 2>nul
+goto otros_limpios
+:fin_limpios
 
 echo HECHO Vault reseteado en: %VAULT%
 pause
\ No newline at end of file
@@ -5,11 +5,17 @@ ExtractInlineImageLinks_v4.py — versión robusta con parser de llaves anidadas
 Extrae los wikilinks ![[...]] de imagen de diccionarios {…} dentro de bloques
 ### User / Assistant / Tool, los coloca justo debajo del encabezado
 y elimina completamente el bloque {…}.
+Las llaves se buscan con brace_scanner: una sola pasada por la nota, respetando las cadenas.
 """
 
 import re, sys, shutil
 from pathlib import Path
 import argparse
+from functools import partial
+
+from brace_scanner import balanced_spans, spans_by_section
+from run_stats import add_stats_arguments, stats_from_args
+from vault_jobs import SKIP_DIRS, add_jobs_argument, run_jobs
 
 # Detecta encabezados de rol
 SECTION_RE = re.compile(r"(?m)^###\s+(User|Assistant|Tool)\s*$")
@@ -28,26 +34,9 @@ def find_sections(text: str):
     return sections
 
 def find_balanced_blocks(section_text: str):
-    """Encuentra bloques { ... } con llaves anidadas correctamente balanceadas."""
-    blocks = []
-    i = 0
-    n = len(section_text)
-    while i < n:
-        if section_text[i] == '{':
-            start = i
-            depth = 1
-            i += 1
-            while i < n and depth > 0:
-                if section_text[i] == '{':
-                    depth += 1
-                elif section_text[i] == '}':
-                    depth -= 1
-                i += 1
-            end = i
-            blocks.append((start, end))
-        else:
-            i += 1
-    return blocks
+    """Encuentra bloques { ... } con llaves anidadas correctamente balanceadas.
+    Uno sin cerrar llega hasta el final de la sección."""
+    return balanced_spans(section_text, unclosed="to_end")
 
 def extract_wikilinks(block_text: str):
     """Extrae wikilinks de imagen dentro del bloque."""
@@ -63,17 +52,21 @@ def extract_wikilinks(block_text: str):
             uniq.append(l)
     return uniq
 
-def process_file(path: Path, in_place: bool, make_backup: bool):
-    text = path.read_text(encoding="utf-8", errors="ignore")
+def transform_text(text: str):
+    """Extrae los wikilinks de imagen de los bloques {…}. Devuelve (texto, enlaces, bloques)."""
     modified = False
     total_links, total_blocks = 0, 0
+    if "![[" not in text:
+        return text, 0, 0
     sections = find_sections(text)
-    for s_start, s_end in reversed(sections):
-        section = text[s_start:s_end]
-        # Buscar bloques { ... } balanceados
-        blocks = find_balanced_blocks(section)
-        if not blocks:
+    # Bloques { ... } balanceados de todas las secciones en una pasada; de atrás hacia
+    # delante, las posiciones de las secciones aún no tocadas siguen valiendo
+    all_blocks = spans_by_section(text, sections, unclosed="to_end")
+    for (s_start, s_end), spans in zip(reversed(sections), reversed(all_blocks)):
+        if not spans:
             continue
+        section = text[s_start:s_end]
+        blocks = [(a - s_start, b - s_start) for a, b in spans]
         # Posición donde insertar: debajo del encabezado
         header_end = section.find("\n")
         insert_pos = header_end + 1 if header_end != -1 else 0
@@ -98,6 +91,12 @@ def process_file(path: Path, in_place: bool, make_backup: bool):
         modified = True
         total_links += len(links_to_add)
         total_blocks += len(cuts)
+    return text, total_links, total_blocks
+
+def process_file(path: Path, in_place: bool, make_backup: bool):
+    original = path.read_text(encoding="utf-8", errors="ignore")
+    text, total_links, total_blocks = transform_text(original)
+    modified = total_links > 0
     if in_place and modified:
         if make_backup:
             bak = path.with_suffix(path.suffix + ".bak")
@@ -108,7 +107,7 @@ def process_file(path: Path, in_place: bool, make_backup: bool):
 
 def walk_md(root: Path):
     for p in root.rglob("*.md"):
-        if any(x in p.parts for x in (".obsidian", ".git")):
+        if SKIP_DIRS.intersection(p.parts):
             continue
         yield p
 
@@ -117,17 +116,26 @@ def main():
     ap.add_argument("vault", help="Carpeta raíz del Vault")
     ap.add_argument("--in-place", action="store_true", help="Aplica cambios en los archivos")
     ap.add_argument("--no-backup", action="store_true", help="No crear .bak")
+    add_jobs_argument(ap)
+    add_stats_arguments(ap)
     args = ap.parse_args()
+    stats = stats_from_args("CleanImageToolBlocks", args)
 
     vault = Path(args.vault).expanduser().resolve()
     total_links = total_blocks = 0
-    for md in walk_md(vault):
-        l, b = process_file(md, args.in_place, not args.no_backup)
-        total_links += l
-        total_blocks += b
+    files = list(walk_md(vault))
+    job = partial(process_file, in_place=args.in_place, make_backup=not args.no_backup)
+    with stats.stage("process", notes=len(files)):
+        stats.read_files(files)
+        for md, (l, b) in zip(files, run_jobs(job, files, args.jobs, stats=stats)):
+            total_links += l
+            total_blocks += b
+            if l and args.in_place:
+                stats.wrote(md)
     print(f"Insertados {total_links} enlaces | Bloques eliminados {total_blocks}")
     if not args.in_place:
         print("(Dry-run: sin escribir cambios, usa --in-place para aplicarlos)")
+    stats.finish()
 
 if __name__ == "__main__":
     main()
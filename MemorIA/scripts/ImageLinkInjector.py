@@ -14,10 +14,16 @@ Ejemplo:
 import os
 import re
 import sys
+import json
+import bisect
 import shutil
 from pathlib import Path
 import argparse
-from typing import Optional, List
+from functools import partial
+from typing import Dict, Optional, List, Tuple
+
+from run_stats import add_stats_arguments, stats_from_args
+from vault_jobs import SKIP_DIRS, add_jobs_argument, run_jobs
 
 # Captura IDs tipo file_ + hex largo (no nos importan los sufijos)
 SEDIMENT_RE = re.compile(r"sediment://(file_[0-9a-f]{16,})\b", re.IGNORECASE)
@@ -28,7 +34,7 @@ EXT_PRIORITY = [".png", ".jpg", ".jpeg", ".webp"]
 def find_candidates(file_id: str, img_dir: Path) -> List[Path]:
     """
     Busca recursivamente cualquier archivo que EMPIECE por file_id y tenga
-    una extensión de imagen admitida.
+    una extensión de imagen admitida. (Recorre el disco: para lotes usa ImageBankIndex.)
     """
     hits = []
     for ext in EXT_PRIORITY:
@@ -37,14 +43,17 @@ def find_candidates(file_id: str, img_dir: Path) -> List[Path]:
         hits.extend(img_dir.rglob(pattern))
     return hits
 
-def pick_best(candidates: List[Path]) -> Optional[Path]:
+def pick_best(candidates: List[Path], mtime=None) -> Optional[Path]:
     """
     De una lista de candidatos, elige:
       1) por prioridad de extensión (png > jpg > jpeg > webp),
       2) a igualdad, el más reciente por mtime.
+    `mtime` permite pasar una función con mtimes ya conocidos (sin stat).
     """
     if not candidates:
         return None
+    if mtime is None:
+        mtime = lambda p: p.stat().st_mtime
     # agrupa por extensión prioridad
     by_ext = {ext: [] for ext in EXT_PRIORITY}
     for c in candidates:
@@ -53,11 +62,94 @@ def pick_best(candidates: List[Path]) -> Optional[Path]:
         group = by_ext.get(ext) or []
         if group:
             # más reciente primero
-            group.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            group.sort(key=mtime, reverse=True)
             return group[0]
     # si nada coincide, devuelve el primero
     return candidates[0]
 
+class ImageBankIndex:
+    """
+    Índice ordenado del IMAGE_BANK: un único recorrido del banco guarda
+    (nombre, ruta relativa, mtime) de cada imagen ordenado por nombre, y las
+    búsquedas por prefijo file_<id> son O(log n) con bisect.
+
+    Se guarda junto al banco (.<banco>.index.json) con el mtime de cada carpeta;
+    si ninguna carpeta ha cambiado, las siguientes ejecuciones lo reutilizan sin recorrer nada.
+    """
+
+    VERSION = 1
+
+    def __init__(self, root: Path, files: List[Tuple[str, str, float]], dir_mtimes: Dict[str, int]):
+        self.root = root
+        self.files = files          # [(clave normcase del nombre, ruta relativa posix, mtime)] ordenado
+        self.dir_mtimes = dir_mtimes
+        self._keys = [f[0] for f in files]
+        self.from_cache = False
+
+    @staticmethod
+    def cache_path(root: Path) -> Path:
+        return root.parent / f".{root.name}.index.json"
+
+    @classmethod
+    def scan(cls, root: Path) -> "ImageBankIndex":
+        files: List[Tuple[str, str, float]] = []
+        dir_mtimes: Dict[str, int] = {}
+        stack = [root]
+        while stack:
+            d = stack.pop()
+            rel_dir = d.relative_to(root).as_posix()
+            dir_mtimes[rel_dir] = os.stat(d).st_mtime_ns
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(Path(e.path))
+                    elif os.path.splitext(e.name)[1].lower() in EXT_PRIORITY:
+                        rel = e.name if rel_dir == "." else f"{rel_dir}/{e.name}"
+                        files.append((os.path.normcase(e.name), rel, e.stat().st_mtime))
+        files.sort()
+        return cls(root, files, dir_mtimes)
+
+    @classmethod
+    def load(cls, root: Path, rebuild: bool = False) -> "ImageBankIndex":
+        """Carga el índice guardado si sigue vigente; si no, recorre el banco y lo guarda."""
+        cache = cls.cache_path(root)
+        if not rebuild and cache.exists():
+            try:
+                data = json.loads(cache.read_text(encoding="utf-8"))
+                if data.get("version") == cls.VERSION and data.get("root") == str(root):
+                    dir_mtimes = data["dirs"]
+                    if all(os.stat(root / rel).st_mtime_ns == mt for rel, mt in dir_mtimes.items()):
+                        idx = cls(root, [tuple(f) for f in data["files"]], dir_mtimes)
+                        idx.from_cache = True
+                        return idx
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        idx = cls.scan(root)
+        try:
+            cache.write_text(json.dumps({"version": cls.VERSION, "root": str(root),
+                                         "dirs": idx.dir_mtimes, "files": idx.files}), encoding="utf-8")
+        except OSError as e:
+            print(f"⚠ No pude guardar el índice del banco ({cache}): {e}")
+        return idx
+
+    def _matches(self, file_id: str) -> List[Tuple[str, str, float]]:
+        key = os.path.normcase(file_id)
+        lo = bisect.bisect_left(self._keys, key)
+        hi = lo
+        while hi < len(self._keys) and self._keys[hi].startswith(key):
+            hi += 1
+        return self.files[lo:hi]
+
+    def candidates(self, file_id: str) -> List[Path]:
+        return [self.root / rel for _, rel, _ in self._matches(file_id)]
+
+    def best(self, file_id: str) -> Optional[Path]:
+        mtimes = {self.root / rel: mt for _, rel, mt in self._matches(file_id)}
+        return pick_best(list(mtimes), mtime=mtimes.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
 def build_wikilink(target: Path, wiki_prefix: str) -> str:
     """
     Construye un wikilink [[PREFIX/filename.ext]]
@@ -69,16 +161,14 @@ def build_wikilink(target: Path, wiki_prefix: str) -> str:
         rel = target.name
     return f"![[{rel}]]"
 
-def process_file(md_path: Path, img_dir: Path, wiki_prefix: str,
-                 in_place: bool, make_backup: bool) -> tuple[int, int]:
+def transform_text(text: str, bank: ImageBankIndex, wiki_prefix: str) -> tuple[str, int, int]:
     """
     Reemplaza todas las ocurrencias de sediment://file_<id> por ![[<prefix>/<name>]]
-    Retorna (sustituciones, faltantes)
+    Retorna (texto, sustituciones, faltantes)
     """
-    text = md_path.read_text(encoding="utf-8", errors="ignore")
     matches = list(SEDIMENT_RE.finditer(text))
     if not matches:
-        return (0, 0)
+        return (text, 0, 0)
 
     substitutions, missing = 0, 0
     new_text = text
@@ -93,8 +183,7 @@ def process_file(md_path: Path, img_dir: Path, wiki_prefix: str,
         span_start = m.start() + offset
         span_end = m.end() + offset
 
-        candidates = find_candidates(file_id, img_dir)
-        best = pick_best(candidates)
+        best = bank.best(file_id)
 
         if best:
             wikilink = build_wikilink(best, wiki_prefix)
@@ -105,6 +194,14 @@ def process_file(md_path: Path, img_dir: Path, wiki_prefix: str,
         else:
             missing += 1
 
+    return (new_text, substitutions, missing)
+
+def process_file(md_path: Path, bank: ImageBankIndex, wiki_prefix: str,
+                 in_place: bool, make_backup: bool) -> tuple[int, int]:
+    """Aplica transform_text a una nota. Retorna (sustituciones, faltantes)"""
+    text = md_path.read_text(encoding="utf-8", errors="ignore")
+    new_text, substitutions, missing = transform_text(text, bank, wiki_prefix)
+
     if in_place and substitutions:
         if make_backup:
             bak = md_path.with_suffix(md_path.suffix + ".bak")
@@ -114,12 +211,20 @@ def process_file(md_path: Path, img_dir: Path, wiki_prefix: str,
 
     return (substitutions, missing)
 
+# Índice del banco por proceso: se envía una vez con el initializer, no con cada nota
+_JOB_BANK: Optional[ImageBankIndex] = None
+
+def _init_job_bank(bank: ImageBankIndex):
+    global _JOB_BANK
+    _JOB_BANK = bank
+
+def _process_file_job(md_path: Path, wiki_prefix: str, in_place: bool, make_backup: bool) -> tuple[int, int]:
+    return process_file(md_path, _JOB_BANK, wiki_prefix, in_place, make_backup)
+
 def walk_md(root: Path):
     # evita carpetas ocultas del sistema y de Obsidian
-    skip_dirs = {".obsidian", ".git", ".trash"}
     for p in root.rglob("*.md"):
-        parts = set(p.parts)
-        if parts & skip_dirs:
+        if SKIP_DIRS.intersection(p.parts):
             continue
         yield p
 
@@ -131,7 +236,11 @@ def main():
     ap.add_argument("--no-backup", action="store_true", help="No crear .bak")
     ap.add_argument("--wiki-prefix", default="IMAGE_BANK",
                     help="Prefijo de ruta para el wikilink dentro del Vault (por defecto 'IMAGE_BANK')")
+    ap.add_argument("--rebuild-index", action="store_true", help="Ignora el índice guardado del banco y lo regenera")
+    add_jobs_argument(ap)
+    add_stats_arguments(ap)
     args = ap.parse_args()
+    stats = stats_from_args("ImageLinkInjector", args)
 
     vault = Path(args.vault).expanduser().resolve()
     img_dir = Path(args.image_bank).expanduser().resolve()
@@ -141,27 +250,37 @@ def main():
     if not img_dir.is_dir():
         sys.exit(f"❌ Carpeta de imágenes no válida: {img_dir}")
 
+    with stats.stage("bank_index"):
+        bank = ImageBankIndex.load(img_dir, rebuild=args.rebuild_index)
+    stats.cache("bank_index", hits=int(bank.from_cache), misses=int(not bank.from_cache))
+    print(f"🗂️  Banco de imágenes: {len(bank)} archivos ({'índice en caché' if bank.from_cache else 'índice regenerado'})")
+
     md_files = list(walk_md(vault))
     print(f"📘 Escaneando {len(md_files)} notas Markdown...\n")
 
     total_subs, total_missing, touched = 0, 0, 0
 
-    for md in md_files:
-        subs, miss = process_file(
-            md, img_dir,
-            wiki_prefix=args.wiki_prefix,
-            in_place=args.in_place,
-            make_backup=not args.no_backup
-        )
-        if subs or miss:
-            touched += 1
-            if subs:
-                print(f"✔ {md.relative_to(vault)}: {subs} enlace(s)")
-            if miss:
-                print(f"⚠ {md.relative_to(vault)}: {miss} referencia(s) sin imagen")
-
-        total_subs += subs
-        total_missing += miss
+    job = partial(
+        _process_file_job,
+        wiki_prefix=args.wiki_prefix,
+        in_place=args.in_place,
+        make_backup=not args.no_backup
+    )
+    with stats.stage("process", notes=len(md_files)):
+        stats.read_files(md_files)
+        results = run_jobs(job, md_files, args.jobs, initializer=_init_job_bank, initargs=(bank,), stats=stats)
+        for md, (subs, miss) in zip(md_files, results):
+            if subs or miss:
+                touched += 1
+                if subs:
+                    print(f"✔ {md.relative_to(vault)}: {subs} enlace(s)")
+                    if args.in_place:
+                        stats.wrote(md)
+                if miss:
+                    print(f"⚠ {md.relative_to(vault)}: {miss} referencia(s) sin imagen")
+
+            total_subs += subs
+            total_missing += miss
 
     print("\nResumen:")
     print(f"- Archivos con referencias: {touched}")
@@ -169,6 +288,7 @@ def main():
     print(f"- Referencias sin imagen: {total_missing}")
     if not args.in_place:
         print("\n(Dry-run: sin escribir cambios, usa --in-place para aplicarlos)")
+    stats.finish()
 
 if __name__ == "__main__":
     main()
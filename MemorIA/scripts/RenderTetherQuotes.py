@@ -3,6 +3,7 @@
 """
 RenderTetherQuotes_v2.py — convierte bloques tether_quote en fragmentos legibles,
 usando parser de llaves balanceadas (nada de regex frágiles) y soportando comillas simples.
+Las llaves se buscan con brace_scanner: una sola pasada por la nota, respetando las cadenas.
 
 Convierte:
 ### Tool
@@ -15,6 +16,11 @@ en:
 import re, json, ast, sys, shutil
 from pathlib import Path
 import argparse
+from functools import partial
+
+from brace_scanner import balanced_spans, spans_by_section
+from run_stats import add_stats_arguments, stats_from_args
+from vault_jobs import SKIP_DIRS, add_jobs_argument, run_jobs
 
 # Detecta encabezados ### User/Assistant/Tool para no tocar fuera de secciones
 SECTION_RE = re.compile(r"(?m)^###\s+(User|Assistant|Tool)\s*$")
@@ -31,26 +37,8 @@ def find_sections(text: str):
         yield (start, end)
 
 def find_balanced_dicts(s: str):
-    """Devuelve (start, end) de TODOS los bloques {…} balanceados en s."""
-    i, n = 0, len(s)
-    res = []
-    while i < n:
-        if s[i] == '{':
-            depth, j = 1, i + 1
-            while j < n and depth > 0:
-                c = s[j]
-                if c == '{': depth += 1
-                elif c == '}': depth -= 1
-                j += 1
-            # j es posición después de la '}' final si se cerró bien
-            if depth == 0:
-                res.append((i, j))
-                i = j
-                continue
-            else:
-                break
-        i += 1
-    return res
+    """Devuelve (start, end) de TODOS los bloques {…} balanceados en s (se para en el primero sin cerrar)."""
+    return balanced_spans(s, unclosed="stop")
 
 def parse_json_like(txt: str):
     """Intenta JSON y luego dict estilo Python."""
@@ -71,18 +59,22 @@ def render_quote(obj: dict) -> str:
     quoted = "\n".join("> " + ln for ln in lines) if lines else "> (sin contenido)"
     return f"📄 Archivo cargado: **{domain}**\n\n{quoted}\n"
 
-def process_file(path: Path, in_place: bool, make_backup: bool):
-    text = path.read_text(encoding="utf-8", errors="ignore")
+def transform_text(text: str):
+    """Convierte los tether_quote de una nota. Devuelve (texto, nº convertidos)."""
     modified = False
     total_conv = 0
+    if not IS_TETHER_RE.search(text):
+        return text, 0
 
     sections = list(find_sections(text))
-    # trabajamos de atrás hacia delante
-    for s_start, s_end in reversed(sections):
-        sec = text[s_start:s_end]
-        dicts = find_balanced_dicts(sec)
-        if not dicts:
+    # Llaves de todas las secciones en una pasada sobre el texto original: como se trabaja
+    # de atrás hacia delante, las posiciones de las secciones aún no tocadas siguen valiendo
+    all_dicts = spans_by_section(text, sections, unclosed="stop")
+    for (s_start, s_end), spans in zip(reversed(sections), reversed(all_dicts)):
+        if not spans:
             continue
+        sec = text[s_start:s_end]
+        dicts = [(a - s_start, b - s_start) for a, b in spans]
 
         # Vamos a sustituir solo los bloques que sean tether_quote
         new_sec = sec
@@ -112,6 +104,13 @@ def process_file(path: Path, in_place: bool, make_backup: bool):
         if modified:
             text = text[:s_start] + new_sec + text[s_end:]
 
+    return text, total_conv
+
+def process_file(path: Path, in_place: bool, make_backup: bool):
+    original = path.read_text(encoding="utf-8", errors="ignore")
+    text, total_conv = transform_text(original)
+    modified = total_conv > 0
+
     if in_place and modified:
         if make_backup:
             bak = path.with_suffix(path.suffix + ".bak")
@@ -122,7 +121,7 @@ def process_file(path: Path, in_place: bool, make_backup: bool):
 
 def walk_md(root: Path):
     for p in root.rglob("*.md"):
-        if any(x in p.parts for x in (".obsidian", ".git")):
+        if SKIP_DIRS.intersection(p.parts):
             continue
         yield p
 
@@ -131,18 +130,27 @@ def main():
     ap.add_argument("vault", help="Carpeta raíz del Vault")
     ap.add_argument("--in-place", action="store_true", help="Escribir cambios")
     ap.add_argument("--no-backup", action="store_true", help="No crear .bak")
+    add_jobs_argument(ap)
+    add_stats_arguments(ap)
     args = ap.parse_args()
+    stats = stats_from_args("RenderTetherQuotes", args)
 
     vault = Path(args.vault).expanduser().resolve()
     total = 0
-    for md in walk_md(vault):
-        conv = process_file(md, args.in_place, not args.no_backup)
-        if conv:
-            print(f"✔ {md.relative_to(vault)} — {conv} tether_quote convertido(s)")
-            total += conv
+    files = list(walk_md(vault))
+    job = partial(process_file, in_place=args.in_place, make_backup=not args.no_backup)
+    with stats.stage("process", notes=len(files)):
+        stats.read_files(files)
+        for md, conv in zip(files, run_jobs(job, files, args.jobs, stats=stats)):
+            if conv:
+                print(f"✔ {md.relative_to(vault)} — {conv} tether_quote convertido(s)")
+                total += conv
+                if args.in_place:
+                    stats.wrote(md)
     print(f"\nTotal convertidos: {total}")
     if not args.in_place:
         print("(Dry-run: sin escribir cambios, añade --in-place)")
+    stats.finish()
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,8 @@
 """
 RoleBlockExtractor — Limpia dicts estilo Python dentro de bloques ### User/### Assistant/### Tool.
 Convierte 'audio_transcription' en texto legible y resume pointers.
+Los {...} se localizan en una sola pasada que respeta anidación y cadenas, así que
+los dicts con 'metadata': {...} anidado se leen enteros.
 
 Uso:
   python RoleBlockExtractor.py /ruta/al/vault --in-place --keep-json
@@ -17,13 +19,16 @@ Opciones:
 
 import argparse, os, re, sys, shutil, ast, json
 from pathlib import Path
+from functools import partial
 from typing import List, Tuple, Optional
 
+from brace_scanner import balanced_spans
+from run_stats import add_stats_arguments, stats_from_args
+from vault_jobs import SKIP_DIRS, add_jobs_argument, run_jobs
+
 # Encabezados de rol (User, Assistant, Tool, etc.)
 ROLE_HDR_RE = re.compile(r"(?m)^###\s+(User|Assistant|Tool)\s*$")
 NEXT_HDR_RE  = re.compile(r"(?m)^(?=###\s+[^ \n]+)")
-# Cachos {...} incluso multilínea; no codiciosos para catch múltiple
-DICT_RE = re.compile(r"\{.*?\}", re.DOTALL)
 
 def normalize_newlines(s: str) -> str:
     return s.replace("\r\n","\n").replace("\r","\n")
@@ -37,38 +42,53 @@ def find_role_blocks(text: str) -> List[Tuple[int,int,str]]:
         out.append((start, end, text[start:end]))
     return out
 
-def parse_dicts_from_block(body: str) -> List[dict]:
+def find_dict_spans(body: str) -> List[Tuple[int, int]]:
     """
-    Devuelve lista de dicts parseados:
-    - Busca TODOS los {...} en el body
-    - Intenta ast.literal_eval (comillas simples) y si no, json.loads
-    - Filtra a solo dicts
+    (inicio, fin) de cada {...} de primer nivel del body, en una sola pasada (brace_scanner).
+    Respeta anidación y cadenas: una llave dentro de un texto no abre ni cierra nada. De un
+    '{' que nunca se cierra no se pierde lo de dentro: se devuelven los {...} completos que contenga.
     """
-    objs = []
-    for m in DICT_RE.finditer(body):
-        chunk = m.group(0).strip()
-        # Primero literal_eval, porque tu input viene con 'comillas simples'
-        try:
-            val = ast.literal_eval(chunk)
-            if isinstance(val, dict):
-                objs.append(val)
-                continue
-            if isinstance(val, (list, tuple)):
-                for x in val:
-                    if isinstance(x, dict):
-                        objs.append(x)
-                continue
-        except Exception:
-            pass
-        # Luego JSON normal por si acaso
+    return balanced_spans(body, unclosed="inner")
+
+def parse_dict_chunk(chunk: str) -> List[dict]:
+    """Dicts de un {...}: JSON primero (rápido y estricto), si no literal de Python."""
+    if chunk[1:].lstrip()[:1] in ('"', "}"):
         try:
             val = json.loads(chunk)
             if isinstance(val, dict):
-                objs.append(val)
+                return [val]
         except Exception:
             pass
+    try:
+        # Lo habitual en las notas: repr de Python con 'comillas simples'
+        val = ast.literal_eval(chunk)
+    except Exception:
+        return []
+    return [val] if isinstance(val, dict) else []
+
+def parse_dicts_from_block(body: str, spans: Optional[List[Tuple[int, int]]] = None) -> List[dict]:
+    """
+    Devuelve lista de dicts parseados:
+    - Toma TODOS los {...} balanceados del body (o los `spans` ya encontrados)
+    - Intenta json.loads si parece JSON y si no, ast.literal_eval
+    - Filtra a solo dicts
+    """
+    if spans is None:
+        spans = find_dict_spans(body)
+    objs = []
+    for start, end in spans:
+        objs.extend(parse_dict_chunk(body[start:end]))
     return objs
 
+def remove_spans(body: str, spans: List[Tuple[int, int]]) -> str:
+    """El body sin los tramos indicados (ordenados y sin solaparse)."""
+    pieces, last = [], 0
+    for start, end in spans:
+        pieces.append(body[last:start])
+        last = end
+    pieces.append(body[last:])
+    return "".join(pieces)
+
 def render_audio_transcription(obj: dict) -> Optional[str]:
     if str(obj.get("content_type") or "").lower() != "audio_transcription":
         return None
@@ -145,14 +165,15 @@ def transform_role_block(raw_block: str, keep_json: bool) -> str:
     header = parts[0].strip()  # ej. "### User"
     body   = "\n".join(parts[1:])
 
-    objs = parse_dicts_from_block(body)
+    spans = find_dict_spans(body)
+    objs = parse_dicts_from_block(body, spans)
     if not objs:
         # nada que transformar
         return raw_block
 
     # Vamos a construir un bloque “limpio”:
-    # 1) Quitamos todos los dicts del body original
-    body_clean = DICT_RE.sub("", body).strip()
+    # 1) Quitamos todos los {...} del body original (los tramos ya localizados)
+    body_clean = remove_spans(body, spans).strip()
     # 2) Añadimos rendereos legibles por cada dict
     rendered_chunks = []
     for obj in objs:
@@ -177,11 +198,11 @@ def transform_role_block(raw_block: str, keep_json: bool) -> str:
         lines.append("")
     return "\n".join(lines)
 
-def process_file(path: Path, in_place: bool, keep_json: bool, make_backup: bool) -> Tuple[bool,int]:
-    text = path.read_text(encoding="utf-8", errors="ignore")
+def transform_text(text: str, keep_json: bool) -> Tuple[str, bool, int]:
+    """Aplica la limpieza al texto de una nota. Devuelve (texto, cambió, bloques reescritos)."""
     blocks = find_role_blocks(text)
     if not blocks:
-        return False, 0
+        return text, False, 0
 
     changed_text = text
     changed_any = False
@@ -195,6 +216,12 @@ def process_file(path: Path, in_place: bool, keep_json: bool, make_backup: bool)
             changed_any = True
             count += 1
 
+    return changed_text, changed_any, count
+
+def process_file(path: Path, in_place: bool, keep_json: bool, make_backup: bool) -> Tuple[bool,int]:
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    changed_text, changed_any, count = transform_text(text, keep_json)
+
     if in_place and changed_any:
         if make_backup:
             bak = path.with_suffix(path.suffix + ".bak")
@@ -205,7 +232,8 @@ def process_file(path: Path, in_place: bool, keep_json: bool, make_backup: bool)
     return changed_any, count
 
 def walk_md(root: Path, ext: str) -> list[Path]:
-    return [p for p in root.rglob("*") if p.is_file() and p.suffix.lower() == ext.lower()]
+    return [p for p in root.rglob("*") if p.is_file() and p.suffix.lower() == ext.lower()
+            and not SKIP_DIRS.intersection(p.parts)]
 
 def main():
     ap = argparse.ArgumentParser(description="Limpia dicts en bloques ### User/Assistant/Tool (audio_transcription, pointers, etc.)")
@@ -215,7 +243,10 @@ def main():
     ap.add_argument("--in-place", action="store_true", help="Escribe cambios en los .md")
     ap.add_argument("--no-backup", action="store_true", help="No crear .bak")
     ap.add_argument("--keep-json", action="store_true", help="Añadir dict original colapsado")
+    add_jobs_argument(ap)
+    add_stats_arguments(ap)
     args = ap.parse_args()
+    stats = stats_from_args("RoleBlockExtractor", args)
 
     root = Path(args.root).expanduser().resolve()
     if not root.is_dir():
@@ -230,26 +261,31 @@ def main():
     total_blocks = 0
     changed_files = 0
 
-    for md in files:
-        changed, count = process_file(
-            md,
-            in_place=args.in_place and not args.dry_run,
-            keep_json=args.keep_json,
-            make_backup=not args.no_backup,
-        )
-        if count:
-            total_blocks += count
-            if changed:
-                changed_files += 1
-                print(f"✔ {md} — {count} bloque(s) reescrito(s)")
-            else:
-                print(f"· {md} — {count} bloque(s) detectado(s) (sin cambios)")
+    job = partial(
+        process_file,
+        in_place=args.in_place and not args.dry_run,
+        keep_json=args.keep_json,
+        make_backup=not args.no_backup,
+    )
+    with stats.stage("process", notes=len(files)):
+        stats.read_files(files)
+        for md, (changed, count) in zip(files, run_jobs(job, files, args.jobs, stats=stats)):
+            if count:
+                total_blocks += count
+                if changed:
+                    changed_files += 1
+                    print(f"✔ {md} — {count} bloque(s) reescrito(s)")
+                    if args.in_place and not args.dry_run:
+                        stats.wrote(md)
+                else:
+                    print(f"· {md} — {count} bloque(s) detectado(s) (sin cambios)")
 
     print("\nResumen:")
     print(f"- Archivos con cambios: {changed_files}")
     print(f"- Bloques de rol reescritos: {total_blocks}")
     if args.dry_run:
         print("(Dry-run: no se escribieron cambios)")
+    stats.finish()
 
 if __name__ == "__main__":
     main()
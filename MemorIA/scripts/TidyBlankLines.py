@@ -11,12 +11,19 @@ Uso:
 import re, sys, shutil
 from pathlib import Path
 import argparse
+from functools import partial
+
+from run_stats import add_stats_arguments, stats_from_args
+from vault_jobs import SKIP_DIRS, add_jobs_argument, run_jobs
 
 MULTIBLANK_RE = re.compile(r"\n{3,}")  # tres o más saltos seguidos
 
+def tidy_text(text: str) -> str:
+    return MULTIBLANK_RE.sub("\n\n", text.strip()) + "\n"
+
 def tidy_file(path: Path, in_place: bool, make_backup: bool):
     text = path.read_text(encoding="utf-8", errors="ignore")
-    cleaned = MULTIBLANK_RE.sub("\n\n", text.strip()) + "\n"
+    cleaned = tidy_text(text)
     if cleaned != text:
         if in_place:
             if make_backup:
@@ -29,7 +36,7 @@ def tidy_file(path: Path, in_place: bool, make_backup: bool):
 
 def walk_md(root: Path):
     for p in root.rglob("*.md"):
-        if any(x in p.parts for x in (".obsidian", ".git")):
+        if SKIP_DIRS.intersection(p.parts):
             continue
         yield p
 
@@ -38,17 +45,27 @@ def main():
     ap.add_argument("vault", help="Carpeta raíz del Vault con notas .md")
     ap.add_argument("--in-place", action="store_true", help="Aplica cambios en los archivos")
     ap.add_argument("--no-backup", action="store_true", help="No crear .bak")
+    add_jobs_argument(ap)
+    add_stats_arguments(ap)
     args = ap.parse_args()
+    stats = stats_from_args("TidyBlankLines", args)
 
     vault = Path(args.vault).expanduser().resolve()
     total = 0
-    for md in walk_md(vault):
-        if tidy_file(md, args.in_place, not args.no_backup):
-            total += 1
-            print(f"✔ Limpio: {md.relative_to(vault)}")
+    files = list(walk_md(vault))
+    job = partial(tidy_file, in_place=args.in_place, make_backup=not args.no_backup)
+    with stats.stage("process", notes=len(files)):
+        stats.read_files(files)
+        for md, cleaned in zip(files, run_jobs(job, files, args.jobs, stats=stats)):
+            if cleaned:
+                total += 1
+                print(f"✔ Limpio: {md.relative_to(vault)}")
+                if args.in_place:
+                    stats.wrote(md)
     print(f"\nArchivos ajustados: {total}")
     if not args.in_place:
         print("(Dry-run: sin escribir cambios, usa --in-place para aplicarlos)")
+    stats.finish()
 
 if __name__ == "__main__":
     main()
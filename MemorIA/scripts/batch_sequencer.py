@@ -7,11 +7,37 @@ Robusto con gizmo_map:
 - Si no se da, busca gizmo_map.json junto al script
 - Si no existe, pregunta; ENTER omite de verdad
 - Imprime la ruta final elegida o 'none'
+
+El splitter y el cleaner se llaman como librería en este mismo proceso: el tag-map
+(su autómata) y el gizmo_map se cargan una sola vez para todas las exportaciones.
+Con --workers N cada exportación renderiza sus conversaciones en N procesos.
+
+Modo desatendido: --config pipeline.json (ver sample_pipeline.json) no pregunta nada y
+ejecuta las etapas listadas. Cada etapa guarda en <base_dir>/.pipeline_state.json una huella
+de sus entradas encadenada con la de la etapa anterior; al repetir, las etapas terminadas
+se saltan y se reanuda en la primera que haya cambiado (o que no llegó a terminar). La huella
+incluye si siguen ahí el manifest de RAW y el estado del cleaner en los LIMPIOS: tras un
+reset_vault.bat o al borrar un vault, la importación y la limpieza se repiten. Las etapas de
+arreglo seguidas (inject…tidy) pendientes van en una sola pasada de vault_transform por vault.
+
+Con --stats / --stats-json RUTA cada paso guarda su informe (run_stats.py) y al final se
+juntan en uno solo: etapas como 'script/etapa', totales de E/S, cachés y notas más lentas.
 """
 
-import os, sys, json, shutil, subprocess, argparse
+import os, sys, json, shutil, argparse, hashlib, tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import extract_images_from_zips_dedup
+import split_chatgpt_export
+import tree_index
+import vault_cleaner
+import vault_search
+import vault_transform
+from keyword_tagger import KeywordTagger
+from run_stats import RunStats, add_stats_arguments, merge_reports, print_report, write_report
+
+EXPORT_EXTS = {".zip", ".json", ".html", ".htm"}
 
 def say(msg: str = ""): print(msg, flush=True)
 
@@ -50,26 +76,382 @@ def copy_template(dst_root: Path, template_dir: Path | None):
         (dst_root / "_index.md").write_text("# Índice\n", encoding="utf-8")
 
 
-def run_cmd(args: List[str], cwd: Path | None = None):
-    say("→ " + " ".join([str(a) for a in args]))
-    subprocess.check_call(args, cwd=str(cwd) if cwd else None)
+class RunReports:
+    """Informes de --stats-json de cada paso, para juntarlos al final del lote."""
+
+    def __init__(self):
+        self.enabled = False
+        self.show = False
+        self.json_path: Optional[str] = None
+        self.reports: List[Dict[str, Any]] = []
+        self._tmp_dir: Optional[str] = None
+
+    def configure(self, show: bool, json_path: Optional[str]):
+        self.show, self.json_path = show, json_path
+        self.enabled = show or bool(json_path)
+
+    def step_json(self) -> Optional[str]:
+        """Ruta temporal para el --stats-json de un paso (None si no se piden estadísticas)."""
+        if not self.enabled:
+            return None
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix="memoria_stats_")
+        return os.path.join(self._tmp_dir, f"step_{len(self.reports):03d}.json")
+
+    def collect(self, path: Optional[str]):
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.reports.append(json.load(f))
+            os.remove(path)
+
+    def stats_for(self, script: str) -> RunStats:
+        """Para los pasos que se llaman como función (sin argv): se recoge con add()."""
+        return RunStats(script, enabled=self.enabled)
+
+    def add(self, stats: RunStats):
+        if self.enabled:
+            self.reports.append(stats.report())
+
+    def finish(self):
+        if not self.enabled:
+            return
+        merged = merge_reports("batch_sequencer", self.reports)
+        if self.show:
+            print_report(merged)
+        if self.json_path:
+            write_report(merged, self.json_path)
+            say(f"📊 Estadísticas: {self.json_path}")
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+REPORTS = RunReports()
+
+def run_step(name: str, fn: Callable[[List[str]], object], argv: List[str]):
+    """Ejecuta un paso en este proceso; si termina con sys.exit(código != 0), para el lote."""
+    say(f"→ {name} " + " ".join([str(a) for a in argv]))
+    stats_json = REPORTS.step_json()
+    if stats_json:
+        argv = [*argv, "--stats-json", stats_json]
+    try:
+        fn(argv)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            say(f"❌ {name} terminó con código {e.code}")
+            sys.exit(e.code if isinstance(e.code, int) else 1)
+    REPORTS.collect(stats_json)
+
+def collect_exports(root: Path) -> List[Path]:
+    return [p for p in sorted(root.rglob("*")) if p.is_file() and p.suffix.lower() in EXPORT_EXTS]
+
+def load_tagger(tagmap: Optional[Path]) -> Tuple[List[str], Optional[KeywordTagger]]:
+    """(argumentos --tag-map para el splitter, autómata ya construido) si el tag-map es JSON válido."""
+    if tagmap is None or not tagmap.exists():
+        return [], None
+    try:
+        tag_map = json.loads(tagmap.read_text(encoding="utf-8"))
+        return ["--tag-map", str(tagmap)], (KeywordTagger(tag_map) if tag_map else None)
+    except Exception:
+        return [], None
+
+def load_gizmo(gm_path: Optional[Path]) -> Tuple[List[str], dict]:
+    """(argumentos --gizmo-map para el splitter, mapa expandido). Avisa si no se usa."""
+    if gm_path is not None:
+        try:
+            json.loads(gm_path.read_text(encoding="utf-8"))
+            say(f"ℹ️  Usando gizmo_map: {gm_path}")
+            return ["--gizmo-map", str(gm_path)], split_chatgpt_export.load_gizmo_map(str(gm_path))
+        except Exception:
+            say("⚠️  gizmo_map no es JSON válido; sigo sin él.")
+    say("ℹ️  Sin gizmo_map. Project_name saldrá 'none' cuando no haya match.")
+    return [], {}
+
+def import_exports(export_paths: List[Path], raw_vault: Path, template: Optional[Path],
+                   tagmap_arg: List[str], tagger: Optional[KeywordTagger],
+                   gizmo_arg: List[str], gizmo_map: dict, date_field: str, workers: int,
+                   catalog: bool = False):
+    say("\n▶ Preparando RAW_VAULT…")
+    copy_template(raw_vault, template)
+
+    splitter = "split_chatgpt_export.py"
+    for i, exp in enumerate(export_paths, 1):
+        say(f"\n[{i}/{len(export_paths)}] Importando: {exp}")
+        splitter_argv = [
+            str(exp),
+            str((raw_vault / "Conversaciones").resolve()),
+            *tagmap_arg, *gizmo_arg,
+            "--make-index", "--tag-indexes", "--by-year", "--by-month",
+            "--keep-versions", "--suffix-on-duplicate", "--no-dedupe", "--skip-identical",
+            "--date-field", date_field, "--include-both-dates", "--stream",
+            "--manifest", str((raw_vault / "_import_manifest.json").resolve()),
+            "--workers", str(workers),
+        ]
+        if catalog:
+            splitter_argv.append("--catalog")
+        # argv se parsea dentro: run_step puede añadir --stats-json
+        run_step(splitter, lambda argv: split_chatgpt_export.run_split(
+            split_chatgpt_export.build_arg_parser().parse_args(argv), tagger, gizmo_map), splitter_argv)
+
+def clean_vaults(raw_vault: Path, merged_vault: Path, reverse_vault: Path, template: Optional[Path],
+                 catalog: bool = False):
+    # MERGED + REVERSE en una sola lectura de RAW_VAULT
+    say("\n▶ Creando MERGED_VAULT y REVERSE_VAULT…")
+    copy_template(merged_vault, template)
+    copy_template(reverse_vault, template)
+    run_step("vault_cleaner.py", vault_cleaner.main,
+             [str(raw_vault), "--target", f"forward={merged_vault}", "--target", f"reverse={reverse_vault}",
+              "--by-year", "--by-month", "--merge", "--incremental", "--verbose",
+              *(["--catalog"] if catalog else [])])
+
+# ---------------- Pipeline declarativo (--config) ----------------
+
+PIPELINE_STAGES = ["import", "clean", "images", "inject", "roleblock", "tether", "imageblocks", "tidy", "tree_index",
+                   "search"]
+FIX_STAGES = {"inject", "roleblock", "tether", "imageblocks", "tidy"}
+PIPELINE_STATE_NAME = ".pipeline_state.json"
+
+def file_signature(paths: List[Path]) -> List[List[Any]]:
+    """[ruta, tamaño, mtime_ns] de cada archivo (None si no existe)."""
+    sig = []
+    for p in paths:
+        try:
+            st = p.stat()
+            sig.append([str(p), st.st_size, st.st_mtime_ns])
+        except OSError:
+            sig.append([str(p), None, None])
+    return sig
+
+def stage_fingerprint(prev: str, name: str, params: Any) -> str:
+    blob = json.dumps([prev, name, params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+class PipelineState:
+    """Huella de la última ejecución completa de cada etapa; se guarda tras cada etapa."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.stages: Dict[str, str] = {}
+        if path.exists():
+            try:
+                self.stages = json.loads(path.read_text(encoding="utf-8")).get("stages") or {}
+            except Exception as e:
+                say(f"⚠️  Estado del pipeline ilegible, se empieza de cero: {e}")
+
+    def mark(self, name: str, fp: str):
+        self.stages[name] = fp
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"stages": self.stages}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+def load_pipeline(config_path: Path, here: Path) -> Dict[str, Any]:
+    """Lee el JSON del pipeline y resuelve rutas relativas respecto a su carpeta."""
+    cfg = json.loads(config_path.read_text(encoding="utf-8"))
+    base = config_path.parent
+
+    def path_of(value) -> Optional[Path]:
+        if not value:
+            return None
+        p = Path(value).expanduser()
+        return p if p.is_absolute() else (base / p).resolve()
+
+    if not cfg.get("base_dir"):
+        raise SystemExit("❌ El pipeline necesita base_dir")
+    base_dir = path_of(cfg["base_dir"])
+    stages = cfg.get("stages") or ["import", "clean"]
+    unknown = [s for s in stages if s not in PIPELINE_STAGES]
+    if unknown:
+        raise SystemExit(f"❌ Etapas desconocidas: {', '.join(unknown)} (válidas: {', '.join(PIPELINE_STAGES)})")
+
+    vaults = {
+        "raw": path_of(cfg.get("raw_vault")) or base_dir / "RAW_VAULT",
+        "merged": path_of(cfg.get("merged_vault")) or base_dir / "MERGED_VAULT",
+        "reverse": path_of(cfg.get("reverse_vault")) or base_dir / "REVERSE_VAULT",
+    }
+    fix_vaults = cfg.get("fix_vaults") or ["merged", "reverse"]
+    index_vaults = cfg.get("index_vaults") or fix_vaults
+    for v in [*fix_vaults, *index_vaults]:
+        if v not in vaults:
+            raise SystemExit(f"❌ Vault desconocido en fix_vaults/index_vaults: {v} (válidos: {', '.join(vaults)})")
+
+    exports: List[Path] = []
+    for raw in cfg.get("inputs") or []:
+        p = path_of(raw)
+        if p is not None and p.is_dir():
+            exports.extend(collect_exports(p))
+        elif p is not None and p.is_file():
+            exports.append(p)
+        else:
+            say(f"⚠️  Ignoro (no existe): {p}")
+
+    image_bank = path_of(cfg.get("image_bank"))
+    if image_bank is None and ({"images", "inject"} & set(stages)):
+        raise SystemExit("❌ Las etapas images/inject necesitan image_bank")
+    template = here / "obsidian_vault_template"
+    return {
+        "base_dir": base_dir,
+        "stages": stages,
+        "vaults": vaults,
+        "fix_vaults": fix_vaults,
+        "index_vaults": index_vaults,
+        "exports": exports,
+        "image_bank": image_bank,
+        "wiki_prefix": cfg.get("wiki_prefix") or "IMAGE_BANK",
+        "tag_map": path_of(cfg.get("tag_map")),
+        "gizmo_map": path_of(cfg.get("gizmo_map")),
+        "date_field": cfg.get("date_field") or "create",
+        "workers": int(cfg.get("workers") or 1),
+        "jobs": int(cfg.get("jobs") or 1),
+        "backup": bool(cfg.get("backup", True)),
+        "catalog": bool(cfg.get("catalog", False)),
+        "template": template if template.exists() else None,
+    }
+
+def vault_markers(name: str, cfg: Dict[str, Any]) -> Dict[str, bool]:
+    """
+    ¿Siguen ahí los ficheros de estado que deja la etapa en sus vaults? Solo su presencia (el
+    contenido cambia en cada ejecución): si reset_vault.bat los borra o se elimina el vault,
+    la huella cambia y la etapa se repite aunque las exportaciones sean las mismas.
+    """
+    vaults = cfg["vaults"]
+    if name == "import":
+        paths = [vaults["raw"] / "_import_manifest.json"]
+    elif name == "clean":
+        paths = [vaults[v] / vault_cleaner.STATE_NAME for v in ("merged", "reverse")]
+    else:
+        return {}
+    return {str(p): p.exists() for p in paths}
+
+def stage_params(name: str, cfg: Dict[str, Any]) -> Any:
+    """Entradas de cada etapa que, si cambian, obligan a repetirla."""
+    if name == "import":
+        extra = [p for p in (cfg["tag_map"], cfg["gizmo_map"]) if p is not None]
+        return {"exports": file_signature(cfg["exports"]), "maps": file_signature(extra),
+                "date_field": cfg["date_field"], "vault": vault_markers(name, cfg)}
+    if name == "clean":
+        return {"vault": vault_markers(name, cfg)}
+    if name == "images":
+        zips = [p for p in cfg["exports"] if p.suffix.lower() == ".zip"]
+        return {"zips": file_signature(zips), "bank": str(cfg["image_bank"])}
+    if name in FIX_STAGES:
+        return {"vaults": cfg["fix_vaults"], "backup": cfg["backup"],
+                "bank": str(cfg["image_bank"]) if name == "inject" else None, "wiki_prefix": cfg["wiki_prefix"]}
+    if name in ("tree_index", "search"):
+        return {"vaults": cfg["index_vaults"]}
+    return {}
+
+def run_stage(name: str, cfg: Dict[str, Any], loaded: Dict[str, Any]):
+    vaults = cfg["vaults"]
+    if name == "import":
+        if not cfg["exports"]:
+            raise SystemExit("❌ No encontré archivos válidos que importar.")
+        if "maps" not in loaded:
+            loaded["maps"] = (*load_tagger(cfg["tag_map"]), *load_gizmo(cfg["gizmo_map"]))
+        tagmap_arg, tagger, gizmo_arg, gizmo_map = loaded["maps"]
+        import_exports(cfg["exports"], vaults["raw"], cfg["template"], tagmap_arg, tagger,
+                       gizmo_arg, gizmo_map, cfg["date_field"], cfg["workers"], cfg["catalog"])
+    elif name == "clean":
+        clean_vaults(vaults["raw"], vaults["merged"], vaults["reverse"], cfg["template"], cfg["catalog"])
+    elif name == "images":
+        zips = [p for p in cfg["exports"] if p.suffix.lower() == ".zip"]
+        cfg["image_bank"].mkdir(parents=True, exist_ok=True)
+        if zips:
+            stats = REPORTS.stats_for("extract_images_from_zips_dedup")
+            extract_images_from_zips_dedup.extract_bank(zips, cfg["image_bank"], run_stats=stats)
+            REPORTS.add(stats)
+        else:
+            say("ℹ️  No hay ZIPs entre las entradas; nada que extraer.")
+    elif name in FIX_STAGES:
+        run_fix_stages([name], cfg)
+    elif name == "tree_index":
+        for v in cfg["index_vaults"]:
+            run_step("tree_index.py", tree_index.main, [str(vaults[v]), *(["--catalog"] if cfg["catalog"] else [])])
+    elif name == "search":
+        for v in cfg["index_vaults"]:
+            run_step("vault_search.py", vault_search.main, ["index", str(vaults[v])])
+
+def run_fix_stages(names: List[str], cfg: Dict[str, Any]):
+    """Varias etapas de arreglo seguidas en UNA pasada de vault_transform por vault."""
+    vaults = cfg["vaults"]
+    for v in cfg["fix_vaults"]:
+        argv = [str(vaults[v]), "--stages", ",".join(names), "--in-place", "--jobs", str(cfg["jobs"])]
+        if not cfg["backup"]:
+            argv.append("--no-backup")
+        if cfg["catalog"]:
+            argv.append("--catalog")
+        if "inject" in names:
+            argv += ["--image-bank", str(cfg["image_bank"]), "--wiki-prefix", cfg["wiki_prefix"]]
+        run_step("vault_transform.py", vault_transform.main, argv)
+
+def run_pipeline(config_path: Path, force: bool = False):
+    here = Path(__file__).resolve().parent
+    cfg = load_pipeline(config_path, here)
+    cfg["base_dir"].mkdir(parents=True, exist_ok=True)
+    state = PipelineState(cfg["base_dir"] / PIPELINE_STATE_NAME)
+
+    say(f"=== ChatGPT → Obsidian (pipeline {config_path.name}) ===")
+    root = {k: str(v) for k, v in cfg["vaults"].items()}
+    if cfg["catalog"]:
+        # Activar el catálogo repite el pipeline para que registre todas las notas
+        root["catalog"] = True
+    fp = stage_fingerprint("", "vaults", root)
+    stale = force
+    loaded: Dict[str, Any] = {}
+    stages = cfg["stages"]
+    i = 0
+    while i < len(stages):
+        name = stages[i]
+        prev = fp
+        fp = stage_fingerprint(prev, name, stage_params(name, cfg))
+        if not stale and state.stages.get(name) == fp:
+            say(f"\n⏭  {name}: sin cambios desde la última ejecución")
+            i += 1
+            continue
+        # A partir de la primera etapa que se repite, todas las siguientes se repiten
+        stale = True
+        if name in FIX_STAGES:
+            # Las etapas de arreglo seguidas van juntas: cada vault se lee y se escribe una vez
+            group = [name]
+            while i + len(group) < len(stages) and stages[i + len(group)] in FIX_STAGES:
+                group.append(stages[i + len(group)])
+            say(f"\n▶ Etapas {', '.join(group)}")
+            run_fix_stages(group, cfg)
+            state.mark(name, fp)
+            for other in group[1:]:
+                fp = stage_fingerprint(fp, other, stage_params(other, cfg))
+                state.mark(other, fp)
+            i += len(group)
+            continue
+        say(f"\n▶ Etapa {name}")
+        run_stage(name, cfg, loaded)
+        # Se guarda la huella de DESPUÉS de la etapa: sus ficheros de estado ya existen
+        fp = stage_fingerprint(prev, name, stage_params(name, cfg))
+        state.mark(name, fp)
+        i += 1
+
+    say("\n✅ Hecho.")
+    for k, v in cfg["vaults"].items():
+        say(f"{k.upper() + '_VAULT':<13} → {v}")
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--gizmo-map", dest="gizmo_map", default=None, help="Ruta a gizmo_map.json (opcional)")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Procesos para renderizar cada exportación (0 = todos los núcleos)")
+    ap.add_argument("--config", default=None,
+                    help="Pipeline JSON desatendido (ver sample_pipeline.json); no hace preguntas")
+    ap.add_argument("--force", action="store_true", help="Con --config: repite todas las etapas")
+    add_stats_arguments(ap)
     args = ap.parse_args()
+    REPORTS.configure(args.stats, args.stats_json)
+
+    if args.config:
+        run_pipeline(Path(args.config).expanduser().resolve(), force=args.force)
+        REPORTS.finish()
+        return
 
     here = Path(__file__).resolve().parent
-    splitter = here / "split_chatgpt_export.py"
-    cleaner  = here / "vault_cleaner.py"
     tagmap   = here / "sample_tag_map.json"
     template = here / "obsidian_vault_template"
 
-    for p in [splitter, cleaner]:
-        if not p.exists():
-            say(f"❌ Falta: {p}")
-            sys.exit(2)
-
     say("=== ChatGPT → Obsidian (Batch Sequencer) ===\n")
 
     # Recolectar entradas
@@ -80,10 +462,7 @@ def main():
         root = Path(input("Arrastra la carpeta con los exports y ENTER: ").strip().strip('"').strip("'"))
         if not root.exists() or not root.is_dir():
             say("❌ Carpeta no válida."); sys.exit(2)
-        exts = {".zip", ".json", ".html", ".htm"}
-        for p in sorted(root.rglob("*")):
-            if p.is_file() and p.suffix.lower() in exts:
-                export_paths.append(p)
+        export_paths = collect_exports(root)
     else:
         say("Pega rutas de archivos (ZIP/JSON/HTML), una por línea. Línea vacía para terminar:")
         while True:
@@ -115,16 +494,9 @@ def main():
     include_both = True
 
     # tag-map si existe
-    tagmap_arg: List[str] = []
-    if tagmap.exists():
-        try:
-            json.loads(tagmap.read_text(encoding="utf-8"))
-            tagmap_arg = ["--tag-map", str(tagmap)]
-        except Exception:
-            pass
+    tagmap_arg, tagger = load_tagger(tagmap)
 
     # Resolver gizmo-map
-    gizmo_arg: List[str] = []
     gm_path: Optional[Path] = None
     if args.gizmo_map:
         p = Path(args.gizmo_map).expanduser()
@@ -136,48 +508,18 @@ def main():
             gm_path = default_map
     if gm_path is None:
         gm_path = ask_path_optional("Ruta a gizmo_map.json (ENTER para omitir): ")
-    if gm_path is not None:
-        try:
-            json.loads(gm_path.read_text(encoding="utf-8"))
-            gizmo_arg = ["--gizmo-map", str(gm_path)]
-            say(f"ℹ️  Usando gizmo_map: {gm_path}")
-        except Exception:
-            say("⚠️  gizmo_map no es JSON válido; sigo sin él.")
-            gm_path = None
-    if gm_path is None:
-        say("ℹ️  Sin gizmo_map. Project_name saldrá 'none' cuando no haya match.")
-
-    # RAW
-    say("\n▶ Preparando RAW_VAULT…")
-    copy_template(raw_vault, template if template.exists() else None)
-
-    for i, exp in enumerate(export_paths, 1):
-        say(f"\n[{i}/{len(export_paths)}] Importando: {exp}")
-        splitter_cmd = [
-            sys.executable, str(splitter),
-            str(exp),
-            str((raw_vault / "Conversaciones").resolve()),
-            *tagmap_arg, *gizmo_arg,
-            "--make-index", "--tag-indexes", "--by-year", "--by-month",
-            "--keep-versions", "--suffix-on-duplicate", "--no-dedupe", "--skip-identical",
-            "--date-field", date_field, "--include-both-dates",
-        ]
-        run_cmd(splitter_cmd)
-
-    # MERGED
-    say("\n▶ Creando MERGED_VAULT…")
-    copy_template(merged_vault, template if template.exists() else None)
-    run_cmd([sys.executable, str(cleaner), str(raw_vault), str(merged_vault), "--by-year", "--by-month", "--merge", "--verbose"])
+    gizmo_arg, gizmo_map = load_gizmo(gm_path)
 
-    # REVERSE
-    say("\n▶ Creando REVERSE_VAULT…")
-    copy_template(reverse_vault, template if template.exists() else None)
-    run_cmd([sys.executable, str(cleaner), str(raw_vault), str(reverse_vault), "--by-year", "--by-month", "--merge", "--reverse-blocks", "--verbose"])
+    template_dir = template if template.exists() else None
+    import_exports(export_paths, raw_vault, template_dir, tagmap_arg, tagger,
+                   gizmo_arg, gizmo_map, date_field, args.workers)
+    clean_vaults(raw_vault, merged_vault, reverse_vault, template_dir)
 
     say("\n✅ Hecho.")
     say(f"RAW_VAULT     → {raw_vault}")
     say(f"MERGED_VAULT  → {merged_vault}")
     say(f"REVERSE_VAULT → {reverse_vault}")
+    REPORTS.finish()
 
 if __name__ == "__main__":
     main()
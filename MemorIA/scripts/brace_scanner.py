@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+brace_scanner.py — Localiza bloques {…} balanceados sin recorrer el texto carácter a carácter.
+
+Una regex compilada salta de token en token (llave, cadena o comilla suelta) con finditer,
+sin pasar por Python en el texto de en medio. Las cadenas '…' y "…" (de una línea, con
+escapes \\x, como las de repr() o JSON) se saltan enteras: una llave dentro de un texto no
+abre ni cierra nada. Una comilla simple solo abre cadena donde la pondría un repr() o un
+JSON, detrás de ':', ',', '[', '{' o '(' (con espacios en medio o no): los apóstrofos de la
+prosa ("It's … {…} … isn't") no se emparejan entre sí ni tapan llaves. Una comilla sin pareja en su línea (un apóstrofo en prosa) no
+cuenta como cadena, y las de su tipo pasan a ser texto normal hasta el final de esa línea:
+así cada línea se reintenta a lo sumo dos veces y el coste es lineal incluso en el peor caso.
+Fuera de un bloque las comillas no cuentan: se salta con str.find hasta el siguiente '{'.
+
+Se trabaja sobre la nota entera: cada sección se escanea con límites [inicio, fin) dentro del
+mismo texto, sin copiarla, y un '{' sin cerrar nunca se sale de su sección.
+
+Qué hacer con un '{' que no se cierra antes del final de la sección (`unclosed`):
+  "stop"    se descarta y no se busca más en la sección (RenderTetherQuotes)
+  "to_end"  el bloque llega hasta el final de la sección (CleanImageToolBlocks)
+  "inner"   se descarta, pero se devuelven los {…} completos que contenga (RoleBlockExtractor)
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+Span = Tuple[int, int]
+
+UNCLOSED_MODES = ("stop", "to_end", "inner")
+
+QUOTES = "'\""
+SINGLE_QUOTE_OPENERS = ":,[{("  # lo que puede ir (salvo espacios) antes de una cadena '…'
+
+def _token_re(plain: str) -> "re.Pattern[str]":
+    """Llaves, cadenas completas y comillas sueltas. Las comillas de `plain` cuentan como texto."""
+    alts = ["[{}]"]
+    for q in QUOTES:
+        if q in plain:
+            continue
+        # comilla, texto sin comilla/barra/salto de línea o \\x escapado, comilla (sin retroceso);
+        # y si no cierra, la comilla suelta
+        opener = q if q == '"' else r"(?<=[" + re.escape(SINGLE_QUOTE_OPENERS) + r"])\s*'"
+        alts.append(opener + "[^" + q + r"\\\n]*(?:\\.[^" + q + r"\\\n]*)*" + q)
+        alts.append(opener)
+    return re.compile("|".join(alts))
+
+TOKEN_RES = {plain: _token_re(plain) for plain in ("", "'", '"', QUOTES)}
+
+def balanced_spans(text: str, start: int = 0, end: Optional[int] = None, unclosed: str = "stop") -> List[Span]:
+    """(inicio, fin) de cada {…} de primer nivel en text[start:end], en posiciones de `text`."""
+    if unclosed not in UNCLOSED_MODES:
+        raise ValueError(f"unclosed debe ser uno de {UNCLOSED_MODES}: {unclosed!r}")
+    end = len(text) if end is None else end
+    levels: List[List[Span]] = [[]]  # levels[k]: bloques cerrados dentro del k-ésimo '{' abierto
+    opened: List[int] = []
+    plain, plain_until = "", end  # comillas sin pareja en la línea actual y fin de esa línea
+    pos = start
+    while pos < end:
+        if not opened:
+            # Fuera de un bloque solo importa el siguiente '{' (la prosa lleva apóstrofos)
+            pos = text.find("{", pos, end)
+            if pos < 0:
+                break
+        if plain and pos >= plain_until:
+            plain = ""
+        limit = plain_until if plain else end
+        for m in TOKEN_RES[plain].finditer(text, pos, limit):
+            token = m.group().lstrip()
+            c = token[0]
+            if c == "{":
+                opened.append(m.start())
+                levels.append([])
+            elif c == "}":
+                if opened:
+                    begin = opened.pop()
+                    levels.pop()
+                    levels[-1].append((begin, m.end()))
+            elif not opened:
+                pos = m.start() + 1
+                break
+            elif len(token) == 1:
+                # Comilla que no cierra en su línea: las de su tipo son texto hasta el salto de línea
+                if not plain:
+                    eol = text.find("\n", m.end(), end)
+                    plain_until = end if eol < 0 else eol
+                plain = "".join(q for q in QUOTES if q in plain or q == c)
+                pos = m.end()
+                break
+        else:
+            if not plain or limit >= end:
+                break
+            pos, plain = limit, ""
+    if not opened or unclosed == "stop":
+        return levels[0]
+    if unclosed == "to_end":
+        return levels[0] + [(opened[0], end)]
+    return [span for level in levels for span in level]
+
+def spans_by_section(text: str, sections: Sequence[Span], unclosed: str = "stop") -> List[List[Span]]:
+    """balanced_spans de cada sección (inicio, fin) de la nota, en posiciones de `text`."""
+    return [balanced_spans(text, s, e, unclosed) for s, e in sections]
@@ -4,8 +4,13 @@
 extract_images_from_zips.py — Extrae todas las imágenes (.png, .jpg, .jpeg, .webp)
 de múltiples archivos ZIP de backup a una carpeta única elegida por el usuario.
 
+Los ZIPs se descomprimen en paralelo (hilos: zlib y hashlib sueltan el GIL) a temporales
+dentro de la carpeta de salida; después el hilo principal les pone nombre definitivo ZIP a ZIP
+en orden alfabético, así que el resultado es el mismo sea cual sea el orden en que acaben los hilos.
+Si un nombre ya existe se usa nombre_1, nombre_2… a partir del nombre original.
+
 Uso:
-  python extract_images_from_zips.py /ruta/con/backups /ruta/de/salida
+  python extract_images_from_zips.py /ruta/con/backups /ruta/de/salida [--threads N]
 
 Ejemplo:
   python extract_images_from_zips.py ~/Backups ~/VaultAssets/img
@@ -14,58 +19,182 @@ Ejemplo:
 import zipfile
 import os
 import sys
+import hashlib
+import argparse
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-import shutil
+from typing import Deque, Dict, List, NamedTuple, Optional, Set
 
 IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
 
-def extract_images_from_zip(zip_path: Path, out_dir: Path):
+class NameAllocator:
     """
-    Extrae imágenes de un zip a out_dir.
-    Retorna lista de nombres extraídos.
+    Coordinador de nombres del banco: un único listado inicial de la carpeta y un set
+    en memoria de los nombres usados. Para cada nombre base recuerda el último sufijo
+    probado, así que resolver k colisiones del mismo nombre no vuelve a empezar desde _1.
     """
-    extracted = []
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self._used: Set[str] = {os.path.normcase(n) for n in os.listdir(out_dir)}
+        self._next: Dict[str, int] = {}
+
+    def claim(self, base: str) -> Path:
+        if os.path.normcase(base) not in self._used:
+            self._used.add(os.path.normcase(base))
+            return self.out_dir / base
+        stem, suffix = os.path.splitext(base)
+        key = os.path.normcase(base)
+        counter = self._next.get(key, 1)
+        while True:
+            name = f"{stem}_{counter}{suffix}"
+            counter += 1
+            if os.path.normcase(name) not in self._used:
+                break
+        self._next[key] = counter
+        self._used.add(os.path.normcase(name))
+        return self.out_dir / name
+
+class ExtractedImage(NamedTuple):
+    base: str                # nombre original dentro del ZIP
+    tmp: Path                # temporal en la carpeta de salida
+    sha256: Optional[str]    # solo si se pidió hash
+    size: int
+
+class ZipExtraction(NamedTuple):
+    zip_path: Path
+    images: List[ExtractedImage]
+    errors: List[str]
+    fingerprint: Optional[str] = None
+    skipped: bool = False    # el ZIP ya estaba procesado (ver extract_images_from_zips_dedup.py)
+
+def copy_to_temp(src, out_dir: Path, with_hash: bool, chunk_size=1 << 20):
+    """Copia src a un temporal de out_dir por bloques, con SHA256 opcional. Devuelve (ruta, hash, bytes)."""
+    h = hashlib.sha256() if with_hash else None
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=out_dir, prefix=".extract-", suffix=".part", delete=False) as dst:
+        try:
+            for chunk in iter(lambda: src.read(chunk_size), b""):
+                if h is not None:
+                    h.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            dst.close()
+            os.unlink(dst.name)
+            raise
+    return Path(dst.name), (h.hexdigest() if h is not None else None), size
+
+def extract_zip_to_temp(zip_path: Path, out_dir: Path, with_hash: bool = False,
+                        fingerprint_fn=None, known_fingerprints=frozenset()) -> ZipExtraction:
+    """
+    Descomprime las imágenes de un ZIP a temporales (en el orden del ZIP), sin decidir nombres.
+    Se puede ejecutar en varios hilos a la vez.
+    """
+    images: List[ExtractedImage] = []
+    errors: List[str] = []
+    fp = None
     try:
         with zipfile.ZipFile(zip_path, "r") as zf:
+            if fingerprint_fn is not None:
+                fp = fingerprint_fn(zf)
+                if fp in known_fingerprints:
+                    return ZipExtraction(zip_path, [], [], fp, skipped=True)
             for name in zf.namelist():
-                ext = Path(name).suffix.lower()
-                if ext in IMAGE_EXTS:
-                    # Normalizamos nombre
-                    base = Path(name).name
-                    dest = out_dir / base
-                    # Si ya existe, genera variante única
-                    counter = 1
-                    while dest.exists():
-                        dest = out_dir / f"{dest.stem}_{counter}{dest.suffix}"
-                        counter += 1
-                    with zf.open(name) as src, open(dest, "wb") as dst:
-                        shutil.copyfileobj(src, dst)
-                    extracted.append(dest.name)
+                if Path(name).suffix.lower() not in IMAGE_EXTS:
+                    continue
+                try:
+                    with zf.open(name) as src:
+                        tmp, digest, size = copy_to_temp(src, out_dir, with_hash)
+                    images.append(ExtractedImage(Path(name).name, tmp, digest, size))
+                except Exception as e:
+                    errors.append(f"[!] Error al leer {name} en {zip_path.name}: {e}")
     except Exception as e:
-        print(f"[x] Error procesando {zip_path}: {e}")
+        errors.append(f"[x] Error procesando {zip_path}: {e}")
+    return ZipExtraction(zip_path, images, errors, fp)
+
+def iter_extractions(zips: List[Path], out_dir: Path, threads: int, **kwargs):
+    """
+    Extrae los ZIPs en paralelo y los devuelve en el orden de `zips` para confirmarlos en serie.
+    Solo hay `threads` ZIPs en vuelo: el siguiente se encarga al entregar uno, así los temporales
+    no crecen hasta el tamaño de todos los backups (casi todo duplicados que luego se borran).
+    """
+    threads = max(1, min(threads or (os.cpu_count() or 1), len(zips)))
+    todo = iter(zips)
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        window: Deque[Future] = deque()
+
+        def submit_next() -> None:
+            zp = next(todo, None)
+            if zp is not None:
+                window.append(ex.submit(extract_zip_to_temp, zp, out_dir, **kwargs))
+
+        for _ in range(threads):
+            submit_next()
+        try:
+            while window:
+                result = window[0].result()
+                window.popleft()
+                submit_next()
+                yield result
+        finally:
+            # Si se interrumpe, no dejes temporales de los ZIPs de la ventana sin confirmar
+            pending = list(window)
+            for fut in pending:
+                fut.cancel()
+            for fut in pending:
+                if fut.cancelled() or fut.exception() is not None:
+                    continue
+                for img in fut.result().images:
+                    if img.tmp.exists():
+                        img.tmp.unlink()
+
+def extract_images_from_zip(zip_path: Path, out_dir: Path, names: Optional[NameAllocator] = None):
+    """
+    Extrae imágenes de un zip a out_dir.
+    Retorna lista de nombres extraídos.
+    """
+    names = names or NameAllocator(out_dir)
+    return commit_extraction(extract_zip_to_temp(zip_path, out_dir), names)
+
+def commit_extraction(result: ZipExtraction, names: NameAllocator) -> List[str]:
+    """Da nombre definitivo a los temporales de un ZIP (siempre desde el hilo principal)."""
+    for err in result.errors:
+        print(err)
+    extracted = []
+    for img in result.images:
+        dest = names.claim(img.base)
+        os.replace(img.tmp, dest)
+        extracted.append(dest.name)
     return extracted
 
 def main():
-    if len(sys.argv) < 3:
-        print("Uso: python extract_images_from_zips.py <carpeta_zips> <carpeta_salida>")
-        sys.exit(1)
+    ap = argparse.ArgumentParser(description="Extrae todas las imágenes de varios ZIPs de backup a una carpeta.")
+    ap.add_argument("zips_dir", help="Carpeta con los ZIPs")
+    ap.add_argument("out_dir", help="Carpeta de salida")
+    ap.add_argument("--threads", type=int, default=0, help="Hilos de descompresión (0 = núcleos disponibles)")
+    args = ap.parse_args()
 
-    zips_dir = Path(sys.argv[1]).expanduser().resolve()
-    out_dir = Path(sys.argv[2]).expanduser().resolve()
+    zips_dir = Path(args.zips_dir).expanduser().resolve()
+    out_dir = Path(args.out_dir).expanduser().resolve()
 
     if not zips_dir.is_dir():
         sys.exit(f"❌ Carpeta no válida: {zips_dir}")
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    zips = list(zips_dir.glob("*.zip"))
+    zips = sorted(zips_dir.glob("*.zip"))
     if not zips:
         sys.exit("No se encontraron archivos .zip en la carpeta indicada.")
 
     total_imgs = 0
     print(f"🗜️  Procesando {len(zips)} archivos ZIP...\n")
 
-    for zp in zips:
-        extracted = extract_images_from_zip(zp, out_dir)
+    names = NameAllocator(out_dir)
+    for result in iter_extractions(zips, out_dir, args.threads):
+        extracted = commit_extraction(result, names)
+        zp = result.zip_path
         if extracted:
             total_imgs += len(extracted)
             print(f"✔ {zp.name}: {len(extracted)} imágenes extraídas.")
@@ -4,18 +4,35 @@
 extract_images_from_zips_dedup.py — Extrae imágenes únicas de varios ZIPs de backup,
 deduplicando por hash SHA256 y manteniendo el nombre base original.
 
+Los hashes se guardan en <carpeta_salida>/.image_hashes.json (hash → archivo del banco,
+ZIP de origen y tamaño), junto con la huella (CRC + tamaño de cada imagen) de los ZIPs ya
+procesados. Así, un backup nuevo solo cuesta sus propios bytes y los ZIPs ya vistos se saltan.
+Si la base no existe, se siembra con las imágenes que ya haya en la carpeta de salida.
+Para forzar un recálculo completo basta con borrar .image_hashes.json.
+Un ZIP con alguna imagen ilegible no se anota como procesado: se reintenta en la siguiente
+ejecución, y las imágenes que sí se leyeron se saltan entonces por hash.
+
+Los ZIPs se descomprimen y hashean en paralelo y se confirman en orden alfabético
+(ver extract_images_from_zips.py), así que qué copia se queda y con qué nombre no
+depende del orden en que terminen los hilos.
+
 Uso:
-  python extract_images_from_zips_dedup.py /ruta/con/backups /ruta/de/salida
+  python extract_images_from_zips_dedup.py /ruta/con/backups /ruta/de/salida [--threads N]
 """
 
 import zipfile
 import os
 import sys
+import json
 import hashlib
+import argparse
 from pathlib import Path
-import shutil
+from typing import Dict, List, Optional
 
-IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+from extract_images_from_zips import IMAGE_EXTS, NameAllocator, ZipExtraction, extract_zip_to_temp, iter_extractions
+from run_stats import RunStats, add_stats_arguments, stats_from_args
+
+HASH_DB_NAME = ".image_hashes.json"
 
 def sha256_filelike(f, chunk_size=65536):
     """Calcula SHA256 de un objeto file-like abierto en modo binario."""
@@ -24,76 +41,186 @@ def sha256_filelike(f, chunk_size=65536):
         h.update(chunk)
     return h.hexdigest()
 
-def extract_unique_images(zip_path: Path, out_dir: Path, seen_hashes: set):
+def zip_fingerprint(zf: zipfile.ZipFile) -> str:
+    """Huella del contenido de imágenes de un ZIP a partir de su directorio central (CRC y tamaño)."""
+    h = hashlib.sha1()
+    for info in sorted(zf.infolist(), key=lambda i: i.filename):
+        if Path(info.filename).suffix.lower() in IMAGE_EXTS:
+            h.update(f"{info.filename}\0{info.CRC:08x}\0{info.file_size}\n".encode("utf-8"))
+    return h.hexdigest()
+
+class HashDB:
+    """
+    Base de hashes persistente del banco de imágenes.
+
+    hashes: {sha256: {"name": archivo en el banco, "zip": ZIP de origen, "size": bytes}}
+    zips:   {huella del ZIP: {"name": nombre del ZIP, "images": nº de imágenes}}
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hashes = {}
+        self.zips = {}
+        self.seeded = 0
+
+    @classmethod
+    def load(cls, out_dir: Path) -> "HashDB":
+        db = cls(out_dir / HASH_DB_NAME)
+        data = None
+        if db.path.exists():
+            try:
+                data = json.loads(db.path.read_text(encoding="utf-8"))
+                if data.get("version") != cls.VERSION:
+                    data = None
+            except (OSError, ValueError):
+                data = None
+        if data is None:
+            db.seed(out_dir)
+            return db
+        db.hashes = data.get("hashes", {})
+        db.zips = data.get("zips", {})
+        # Si alguien borró imágenes del banco, olvida sus hashes y los ZIPs de donde salieron
+        present = set(os.listdir(out_dir))
+        gone = [h for h, e in db.hashes.items() if e.get("name") not in present]
+        if gone:
+            lost_zips = {db.hashes[h].get("zip") for h in gone}
+            for h in gone:
+                del db.hashes[h]
+            db.zips = {fp: z for fp, z in db.zips.items() if z.get("name") not in lost_zips}
+        return db
+
+    def seed(self, out_dir: Path):
+        """Hashea las imágenes que ya están en el banco (primera ejecución con la base)."""
+        for p in sorted(out_dir.iterdir()):
+            if p.is_file() and p.suffix.lower() in IMAGE_EXTS:
+                with open(p, "rb") as f:
+                    h = sha256_filelike(f)
+                self.hashes.setdefault(h, {"name": p.name, "zip": None, "size": p.stat().st_size})
+                self.seeded += 1
+
+    def save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": self.VERSION, "hashes": self.hashes, "zips": self.zips},
+                                  ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+def discard(result: ZipExtraction):
+    for img in result.images:
+        if img.tmp.exists():
+            img.tmp.unlink()
+
+def commit_unique_images(result: ZipExtraction, names: NameAllocator, db: HashDB):
     """
-    Extrae imágenes únicas de un zip a out_dir.
-    Evita duplicados por hash.
-    Devuelve (extraídas, saltadas).
+    Confirma las imágenes de un ZIP ya extraído a temporales: las de hash conocido se descartan
+    y el resto recibe nombre definitivo. Devuelve (extraídas, saltadas), o None si el ZIP ya
+    estaba procesado (en una ejecución anterior o antes en esta misma).
     """
+    for err in result.errors:
+        print(err)
+    if result.skipped or result.fingerprint in db.zips:
+        discard(result)
+        return None
     extracted, skipped = 0, 0
-    try:
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            for name in zf.namelist():
-                ext = Path(name).suffix.lower()
-                if ext not in IMAGE_EXTS:
-                    continue
-                base = Path(name).name
-                try:
-                    with zf.open(name) as src:
-                        data = src.read()
-                        h = hashlib.sha256(data).hexdigest()
-                        if h in seen_hashes:
-                            skipped += 1
-                            continue
-                        seen_hashes.add(h)
-                        dest = out_dir / base
-                        # Si el archivo base ya existe (mismo nombre, distinto hash),
-                        # añadimos sufijo para evitar colisión de distinto contenido
-                        counter = 1
-                        while dest.exists():
-                            dest = out_dir / f"{dest.stem}_{counter}{dest.suffix}"
-                            counter += 1
-                        with open(dest, "wb") as dst:
-                            dst.write(data)
-                        extracted += 1
-                except Exception as e:
-                    print(f"[!] Error al leer {name} en {zip_path.name}: {e}")
-    except Exception as e:
-        print(f"[x] Error procesando {zip_path}: {e}")
+    for img in result.images:
+        if img.sha256 in db.hashes:
+            img.tmp.unlink()
+            skipped += 1
+            continue
+        # Si el archivo base ya existe (mismo nombre, distinto hash),
+        # el coordinador añade sufijo para evitar colisión de distinto contenido
+        dest = names.claim(img.base)
+        os.replace(img.tmp, dest)
+        db.hashes[img.sha256] = {"name": dest.name, "zip": result.zip_path.name, "size": img.size}
+        extracted += 1
+    # Un ZIP con errores de lectura no se marca como procesado: se reintenta la próxima vez
+    if result.fingerprint and not result.errors:
+        db.zips[result.fingerprint] = {"name": result.zip_path.name, "images": extracted + skipped}
     return extracted, skipped
 
+def extract_unique_images(zip_path: Path, out_dir: Path, db: HashDB, names: NameAllocator = None):
+    """
+    Extrae imágenes únicas de un zip a out_dir (versión en serie, para usar como librería).
+    Devuelve (extraídas, saltadas), o None si el ZIP ya estaba procesado.
+    """
+    result = extract_zip_to_temp(zip_path, out_dir, with_hash=True,
+                                 fingerprint_fn=zip_fingerprint, known_fingerprints=set(db.zips))
+    return commit_unique_images(result, names or NameAllocator(out_dir), db)
+
+def extract_bank(zips: List[Path], out_dir: Path, threads: int = 0,
+                 run_stats: Optional[RunStats] = None) -> Dict[str, int]:
+    """Extrae al banco las imágenes nuevas de `zips` (en ese orden) y devuelve los totales."""
+    run_stats = run_stats or RunStats("extract_images_from_zips_dedup")
+    with run_stats.stage("hash_db"):
+        db = HashDB.load(out_dir)
+    if db.seeded:
+        print(f"🔑 Base de hashes sembrada con {db.seeded} imágenes ya presentes en el banco.\n")
+    total_extracted, total_skipped, total_known, total_failed = 0, 0, 0, 0
+    known_hashes = set(db.hashes) if run_stats.enabled else set()
+
+    names = NameAllocator(out_dir)
+    extractions = iter_extractions(zips, out_dir, threads, with_hash=True,
+                                   fingerprint_fn=zip_fingerprint, known_fingerprints=set(db.zips))
+    with run_stats.stage("extract"):
+        run_stats.read_files(zips)
+        for extraction in extractions:
+            zp = extraction.zip_path
+            result = commit_unique_images(extraction, names, db)
+            if result is None:
+                total_known += 1
+                print(f"· {zp.name}: ya procesado (mismo CRC y tamaño), se salta.")
+                continue
+            extracted, skipped = result
+            total_extracted += extracted
+            total_skipped += skipped
+            db.save()
+            if extraction.errors:
+                total_failed += 1
+                print(f"⚠ {zp.name}: {extracted} nuevas, {skipped} duplicadas; con errores, se reintentará.")
+            else:
+                print(f"✔ {zp.name}: {extracted} nuevas, {skipped} duplicadas.")
+        db.save()
+    if run_stats.enabled:
+        new = [h for k, h in db.hashes.items() if k not in known_hashes]
+        run_stats.add("extract", files_written=len(new), bytes_written=sum(h.get("size") or 0 for h in new))
+        run_stats.cache("zips", hits=total_known, misses=len(zips) - total_known)
+        run_stats.cache("hashes", hits=total_skipped, misses=total_extracted)
+
+    print("\nResumen final:")
+    print(f"- Carpeta salida: {out_dir}")
+    print(f"- Imágenes únicas extraídas: {total_extracted}")
+    print(f"- Duplicados omitidos: {total_skipped}")
+    print(f"- ZIPs ya procesados saltados: {total_known}")
+    if total_failed:
+        print(f"- ZIPs con errores (se reintentarán): {total_failed}")
+    print(f"- Total único: {len(db.hashes)}\n")
+    return {"extracted": total_extracted, "skipped": total_skipped, "known_zips": total_known,
+            "failed_zips": total_failed, "unique": len(db.hashes)}
+
 def main():
-    if len(sys.argv) < 3:
-        print("Uso: python extract_images_from_zips_dedup.py <carpeta_zips> <carpeta_salida>")
-        sys.exit(1)
+    ap = argparse.ArgumentParser(description="Extrae imágenes únicas (por SHA256) de varios ZIPs de backup a un banco común.")
+    ap.add_argument("zips_dir", help="Carpeta con los ZIPs")
+    ap.add_argument("out_dir", help="Carpeta de salida (IMAGE_BANK)")
+    ap.add_argument("--threads", type=int, default=0, help="Hilos de descompresión y hash (0 = núcleos disponibles)")
+    add_stats_arguments(ap)
+    args = ap.parse_args()
 
-    zips_dir = Path(sys.argv[1]).expanduser().resolve()
-    out_dir = Path(sys.argv[2]).expanduser().resolve()
+    zips_dir = Path(args.zips_dir).expanduser().resolve()
+    out_dir = Path(args.out_dir).expanduser().resolve()
 
     if not zips_dir.is_dir():
         sys.exit(f"❌ Carpeta no válida: {zips_dir}")
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    zips = list(zips_dir.glob("*.zip"))
+    zips = sorted(zips_dir.glob("*.zip"))
     if not zips:
         sys.exit("No se encontraron archivos .zip en la carpeta indicada.")
 
     print(f"🗜️  Procesando {len(zips)} ZIPs...\n")
-
-    seen_hashes = set()
-    total_extracted, total_skipped = 0, 0
-
-    for zp in sorted(zips):
-        extracted, skipped = extract_unique_images(zp, out_dir, seen_hashes)
-        total_extracted += extracted
-        total_skipped += skipped
-        print(f"✔ {zp.name}: {extracted} nuevas, {skipped} duplicadas.")
-
-    print("\nResumen final:")
-    print(f"- Carpeta salida: {out_dir}")
-    print(f"- Imágenes únicas extraídas: {total_extracted}")
-    print(f"- Duplicados omitidos: {total_skipped}")
-    print(f"- Total único: {len(seen_hashes)}\n")
+    stats = stats_from_args("extract_images_from_zips_dedup", args)
+    extract_bank(zips, out_dir, args.threads, run_stats=stats)
+    stats.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+keyword_tagger.py — Etiquetado por palabras clave con autómata Aho-Corasick.
+
+Se construye UNA vez a partir del tag-map ({palabra_clave: tag}) y encuentra todas
+las palabras clave en una sola pasada sobre el texto, sea cual sea el tamaño del mapa.
+
+Uso como librería:
+  tagger = KeywordTagger(tag_map, whole_word=False)
+  tagger.tags(texto)        → ["#ritual", "#tecnico", ...] (mismo orden que el tag-map)
+  tagger.tag_counts(texto)  → {"#ritual": 3, "#tecnico": 1}
+"""
+
+from typing import Dict, List, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def normalize_tag(tg) -> str:
+    return tg if str(tg).startswith("#") else f"#{tg}"
+
+
+class KeywordTagger:
+    """Autómata Aho-Corasick sobre las claves (en minúsculas) de un tag-map.
+
+    - Sin whole_word se comporta como `kw.lower() in texto.lower()` para cada clave.
+    - Con whole_word solo cuenta apariciones no pegadas a otra letra/dígito/_
+      (el límite solo se exige en los extremos de la clave que sean alfanuméricos).
+    """
+
+    def __init__(self, tag_map: Dict[str, str], whole_word: bool = False):
+        self.whole_word = whole_word
+        # Entradas en el orden del tag-map: (clave en minúsculas, tag normalizado)
+        self.entries: List[Tuple[str, str]] = [((kw or "").lower(), normalize_tag(tg)) for kw, tg in tag_map.items()]
+
+        # Estado 0 = raíz. goto[s] = {carácter: estado}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]  # índices de entradas que terminan en cada estado
+        self._lengths: List[int] = []
+        for idx, (kw, _) in enumerate(self.entries):
+            self._lengths.append(len(kw))
+            if not kw:
+                continue
+            s = 0
+            for ch in kw:
+                nxt = self._goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[s][ch] = nxt
+                s = nxt
+            self._out[s].append(idx)
+
+        # Enlaces de fallo por BFS; out[s] hereda las salidas de su sufijo más largo
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            s = queue[head]
+            head += 1
+            for ch, t in self._goto[s].items():
+                queue.append(t)
+                f = self._fail[s]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[t] = cand if cand != t else 0
+                self._out[t] = self._out[t] + self._out[self._fail[t]]
+
+    def entry_counts(self, text: str) -> List[int]:
+        """Nº de apariciones de cada entrada del tag-map en `text` (una pasada)."""
+        counts = [0] * len(self.entries)
+        for idx, (kw, _) in enumerate(self.entries):
+            if not kw:
+                counts[idx] = 1  # '' in texto siempre es True
+        goto, fail, out = self._goto, self._fail, self._out
+        low = (text or "").lower()
+        n = len(low)
+        whole_word = self.whole_word
+        s = 0
+        for i, ch in enumerate(low):
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if not out[s]:
+                continue
+            for idx in out[s]:
+                if whole_word:
+                    kw = self.entries[idx][0]
+                    start = i - self._lengths[idx] + 1
+                    if _is_word_char(kw[0]) and start > 0 and _is_word_char(low[start - 1]):
+                        continue
+                    if _is_word_char(kw[-1]) and i + 1 < n and _is_word_char(low[i + 1]):
+                        continue
+                counts[idx] += 1
+        return counts
+
+    def matches(self, text: str, min_count: int = 1) -> List[Tuple[str, int]]:
+        """[(tag, apariciones)] de las entradas con al menos `min_count` apariciones, en orden del mapa."""
+        return [(self.entries[idx][1], c) for idx, c in enumerate(self.entry_counts(text)) if c and c >= min_count]
+
+    def tags(self, text: str, min_count: int = 1) -> List[str]:
+        return [tg for tg, _ in self.matches(text, min_count)]
+
+    def tag_counts(self, text: str, min_count: int = 1) -> Dict[str, int]:
+        """Apariciones por tag (suma de todas sus palabras clave), para ponderar etiquetas."""
+        weights: Dict[str, int] = {}
+        for tg, c in self.matches(text, min_count):
+            weights[tg] = weights.get(tg, 0) + c
+        return weights
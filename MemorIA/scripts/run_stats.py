@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+run_stats.py — Instrumentación común: --stats y --stats-json en todos los scripts.
+
+Cada script crea un RunStats con stats_from_args() y mide sus etapas:
+
+    stats = stats_from_args("RoleBlockExtractor", args)
+    with stats.stage("process", notes=len(files)):
+        stats.read_files(files)
+        for md, res in zip(files, run_jobs(job, files, args.jobs, stats=stats)):
+            ...
+    stats.finish()
+
+Por etapa se guardan tiempo real y de CPU (la de los procesos de --jobs la suma run_jobs),
+archivos y bytes leídos/escritos y notas por segundo. Aparte, los aciertos de cada caché
+y las N notas más lentas (run_jobs las cronometra una a una cuando recibe `stats`).
+
+Sin --stats ni --stats-json el objeto existe pero no hace nada (ni stat de archivos).
+batch_sequencer junta los informes de cada paso con merge_reports().
+"""
+
+import argparse
+import datetime
+import heapq
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+COUNTERS = ("files_read", "bytes_read", "files_written", "bytes_written", "notes")
+
+
+def add_stats_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--stats", action="store_true", help="Muestra tiempos por etapa, E/S, cachés y notas más lentas")
+    ap.add_argument("--stats-json", default=None, metavar="RUTA", help="Guarda esas estadísticas en un JSON")
+
+
+def _cpu_now() -> float:
+    return time.process_time()
+
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n} B"
+
+
+class RunStats:
+    def __init__(self, script: str, enabled: bool = False, print_summary: bool = False,
+                 json_path: Optional[str] = None, slowest: int = 10):
+        self.script = script
+        self.enabled = enabled
+        self.print_summary = print_summary
+        self.json_path = json_path
+        self.slowest_n = slowest
+        self.started = datetime.datetime.now().isoformat(timespec="seconds")
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self._slowest: List[tuple] = []  # montículo de (segundos, ruta)
+        self._t0 = time.perf_counter()
+        self._cpu0 = _cpu_now()
+        self._worker_cpu = 0.0  # CPU de los procesos de --jobs (process_time no la incluye)
+        self._current: Optional[str] = None
+
+    def _stage(self, name: Optional[str]) -> Dict[str, float]:
+        name = name or self._current or "total"
+        if name not in self.stages:
+            self.stages[name] = {"wall_s": 0.0, "cpu_s": 0.0, **{k: 0 for k in COUNTERS}}
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str, **counts) -> Iterator[None]:
+        """Mide un bloque; los contadores que se sumen dentro van a esta etapa."""
+        if not self.enabled:
+            yield
+            return
+        prev, self._current = self._current, name
+        rec = self._stage(name)
+        t0, c0 = time.perf_counter(), _cpu_now()
+        try:
+            yield
+        finally:
+            rec["wall_s"] += time.perf_counter() - t0
+            rec["cpu_s"] += _cpu_now() - c0
+            self._current = prev
+            self.add(name, **counts)
+
+    def add(self, stage: Optional[str] = None, **counts) -> None:
+        if not self.enabled:
+            return
+        rec = self._stage(stage)
+        for k, v in counts.items():
+            rec[k] = rec.get(k, 0) + v
+
+    def add_time(self, stage: str, wall_s: float) -> None:
+        """Tiempo medido en otro sitio (p.ej. dentro de los procesos de --jobs)."""
+        if self.enabled:
+            self._stage(stage)["wall_s"] += wall_s
+
+    def add_worker_cpu(self, cpu_s: float) -> None:
+        if self.enabled:
+            self._worker_cpu += cpu_s
+            self._stage(None)["cpu_s"] += cpu_s
+
+    def timed_iter(self, items: Iterable[Any], stage: str) -> Iterator[Any]:
+        """Itera `items` sumando a `stage` el tiempo que tarda en producir cada uno (p.ej. parseo en streaming)."""
+        if not self.enabled:
+            yield from items
+            return
+        it = iter(items)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add_time(stage, time.perf_counter() - t0)
+                return
+            self.add_time(stage, time.perf_counter() - t0)
+            yield item
+
+    def read_files(self, paths: Iterable[Path], stage: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        n = size = 0
+        for p in paths:
+            n += 1
+            try:
+                size += os.path.getsize(p)
+            except OSError:
+                pass
+        self.add(stage, files_read=n, bytes_read=size)
+
+    def wrote(self, path: Path, stage: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        self.add(stage, files_written=1, bytes_written=size)
+
+    def cache(self, name: str, hits: int = 0, misses: int = 0) -> None:
+        if not self.enabled:
+            return
+        rec = self.caches.setdefault(name, {"hits": 0, "misses": 0})
+        rec["hits"] += hits
+        rec["misses"] += misses
+
+    def file_time(self, path: Any, seconds: float) -> None:
+        if not self.enabled:
+            return
+        item = (seconds, str(path))
+        if len(self._slowest) < self.slowest_n:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    # ---------------- Informe ----------------
+
+    def report(self) -> Dict[str, Any]:
+        stages = []
+        for name, rec in self.stages.items():
+            row = {"name": name, **{k: round(v, 4) if isinstance(v, float) else v for k, v in rec.items()}}
+            if rec.get("notes") and rec["wall_s"] > 0:
+                row["notes_per_s"] = round(rec["notes"] / rec["wall_s"], 1)
+            stages.append(row)
+        caches = {}
+        for name, rec in self.caches.items():
+            total = rec["hits"] + rec["misses"]
+            caches[name] = {**rec, "hit_rate": round(rec["hits"] / total, 4) if total else None}
+        return {
+            "script": self.script,
+            "started": self.started,
+            "wall_s": round(time.perf_counter() - self._t0, 4),
+            "cpu_s": round(_cpu_now() - self._cpu0 + self._worker_cpu, 4),
+            "stages": stages,
+            "caches": caches,
+            "slowest": [{"path": p, "seconds": round(s, 4)} for s, p in sorted(self._slowest, reverse=True)],
+        }
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Imprime (--stats) y/o guarda (--stats-json) el informe."""
+        if not self.enabled:
+            return None
+        rep = self.report()
+        if self.print_summary:
+            print_report(rep)
+        if self.json_path:
+            write_report(rep, self.json_path)
+        return rep
+
+
+def stats_from_args(script: str, args: argparse.Namespace) -> RunStats:
+    show = bool(getattr(args, "stats", False))
+    json_path = getattr(args, "stats_json", None)
+    return RunStats(script, enabled=show or bool(json_path), print_summary=show, json_path=json_path)
+
+
+def write_report(rep: Dict[str, Any], path: str) -> None:
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.write_text(json.dumps(rep, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, out)
+
+
+def _io_parts(rec: Dict[str, Any]) -> List[str]:
+    parts = []
+    for key, label in (("read", "leídos"), ("written", "escritos")):
+        if rec.get("files_" + key):
+            size = rec.get("bytes_" + key)
+            parts.append(f"{rec['files_' + key]} {label}" + (f" ({_fmt_bytes(size)})" if size else ""))
+    return parts
+
+
+def print_report(rep: Dict[str, Any]) -> None:
+    print(f"\n⏱  Estadísticas · {rep['script']}: {rep['wall_s']:.2f} s (CPU {rep['cpu_s']:.2f} s)")
+    if rep.get("totals") and _io_parts(rep["totals"]):
+        print("- Total: " + " · ".join(_io_parts(rep["totals"])))
+    for st in rep["stages"]:
+        # Las etapas medidas dentro de otras (add_time) solo tienen tiempo real
+        parts = [f"{st['wall_s']:.2f} s" + (f" (CPU {st['cpu_s']:.2f} s)" if st["cpu_s"] else "")]
+        parts += _io_parts(st)
+        if st.get("notes_per_s"):
+            parts.append(f"{st['notes_per_s']:.0f} notas/s")
+        print(f"- {st['name']}: " + " · ".join(parts))
+    for name, c in rep["caches"].items():
+        rate = f"{c['hit_rate'] * 100:.0f} %" if c["hit_rate"] is not None else "—"
+        print(f"- caché {name}: {c['hits']} aciertos / {c['misses']} fallos ({rate})")
+    if rep["slowest"]:
+        print("- Más lentas:")
+        for s in rep["slowest"]:
+            where = f"[{s['script']}] " if "script" in s else ""
+            print(f"    {s['seconds']:.3f} s  {where}{s['path']}")
+
+
+def merge_reports(script: str, reports: List[Dict[str, Any]], slowest: int = 10) -> Dict[str, Any]:
+    """Un informe de ejecución a partir de los de cada paso. Las etapas se suman como 'script/etapa'
+    (un script que corre sobre varios vaults queda en una sola fila); el detalle sigue en 'steps'."""
+    stages: Dict[str, Dict[str, Any]] = {}
+    caches: Dict[str, Dict[str, Any]] = {}
+    slow: List[Dict[str, Any]] = []
+    for rep in reports:
+        for st in rep.get("stages", []):
+            row = stages.setdefault(f"{rep['script']}/{st['name']}", {"wall_s": 0.0, "cpu_s": 0.0,
+                                                                      **{k: 0 for k in COUNTERS}})
+            for k in ("wall_s", "cpu_s", *COUNTERS):
+                row[k] += st.get(k, 0)
+        for name, c in rep.get("caches", {}).items():
+            row = caches.setdefault(f"{rep['script']}/{name}", {"hits": 0, "misses": 0})
+            row["hits"] += c["hits"]
+            row["misses"] += c["misses"]
+        slow.extend({**s, "script": rep["script"]} for s in rep.get("slowest", []))
+    stage_rows = []
+    for name, row in stages.items():
+        row = {"name": name, **{k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()}}
+        if row["notes"] and row["wall_s"] > 0:
+            row["notes_per_s"] = round(row["notes"] / row["wall_s"], 1)
+        stage_rows.append(row)
+    for c in caches.values():
+        total = c["hits"] + c["misses"]
+        c["hit_rate"] = round(c["hits"] / total, 4) if total else None
+    slow.sort(key=lambda s: s["seconds"], reverse=True)
+    return {
+        "script": script,
+        "started": reports[0]["started"] if reports else datetime.datetime.now().isoformat(timespec="seconds"),
+        "wall_s": round(sum(r.get("wall_s", 0) for r in reports), 4),
+        "cpu_s": round(sum(r.get("cpu_s", 0) for r in reports), 4),
+        "totals": {k: sum(st[k] for st in stage_rows) for k in COUNTERS},
+        "stages": stage_rows,
+        "caches": caches,
+        "slowest": slow[:slowest],
+        "steps": reports,
+    }
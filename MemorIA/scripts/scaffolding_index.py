@@ -5,6 +5,8 @@ BuildScaffoldingIndex.py — crea un índice de archivos de andamiaje ("📄 Arc
 encontrados en las conversaciones del Vault.
 
 Genera scaffolding_index.md con formato Markdown y enlaces wikilink.
+Con --catalog los andamiajes salen del catálogo SQLite del vault (vault_catalog.py), que solo
+relee las notas cambiadas.
 """
 
 import re
@@ -12,27 +14,45 @@ from pathlib import Path
 import argparse
 from collections import defaultdict
 
+from run_stats import RunStats, add_stats_arguments, stats_from_args
+from vault_jobs import SKIP_DIRS, add_jobs_argument, run_jobs
+
 # Detecta líneas del tipo: 📄 Archivo cargado: **Koru.md**
 SCAFFOLD_RE = re.compile(r"^📄\s*Archivo\s+cargado:\s*\*\*(.+?)\*\*", re.MULTILINE)
 
-def scan_vault(vault_path: Path):
+def scan_file(md: Path) -> list:
+    """Nombres de andamiaje citados en una nota, en orden de aparición."""
+    try:
+        text = md.read_text(encoding="utf-8", errors="ignore")
+    except Exception:
+        return []
+    return [m.group(1).strip() for m in SCAFFOLD_RE.finditer(text)]
+
+def scan_vault(vault_path: Path, jobs: int = 1, run_stats: RunStats | None = None):
     """
     Recorre el vault buscando líneas '📄 Archivo cargado: **nombre**'
     y devuelve {nombre: [ruta1, ruta2, ...]}.
+    Con jobs > 1 las notas se leen en paralelo; el resultado es el mismo que en serie.
     """
     scaffolds = defaultdict(list)
-    for md in vault_path.rglob("*.md"):
-        if any(x in md.parts for x in (".obsidian", ".git")):
-            continue
-        try:
-            text = md.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            continue
-        for m in SCAFFOLD_RE.finditer(text):
-            name = m.group(1).strip()
+    files = [md for md in vault_path.rglob("*.md")
+             if not SKIP_DIRS.intersection(md.parts)]
+    if run_stats is not None:
+        run_stats.read_files(files)
+        run_stats.add(notes=len(files))
+    for md, names in zip(files, run_jobs(scan_file, files, jobs, stats=run_stats)):
+        for name in names:
             scaffolds[name].append(md.relative_to(vault_path))
     return scaffolds
 
+def scan_catalog(vault_path: Path):
+    """Como scan_vault, pero desde el catálogo del vault (puesto al día antes de consultar)."""
+    from vault_catalog import VaultCatalog  # import local: vault_catalog importa este módulo
+
+    with VaultCatalog.for_vault(vault_path) as cat:
+        cat.sync()
+        return {name: [Path(p) for p in paths] for name, paths in cat.scaffolds().items()}
+
 def build_index_text(scaffolds: dict) -> str:
     """Genera el texto Markdown del índice."""
     lines = ["# Índice de Andamiajes\n"]
@@ -47,25 +67,34 @@ def build_index_text(scaffolds: dict) -> str:
 def main():
     ap = argparse.ArgumentParser(description="Crea scaffolding_index.md con el listado de andamiajes usados.")
     ap.add_argument("vault", help="Carpeta raíz del Vault con notas .md")
+    ap.add_argument("--catalog", action="store_true", help="Lee los andamiajes del catálogo SQLite del vault")
+    add_jobs_argument(ap)
+    add_stats_arguments(ap)
     args = ap.parse_args()
 
     vault = Path(args.vault).expanduser().resolve()
     if not vault.is_dir():
         raise SystemExit(f"❌ Carpeta no válida: {vault}")
 
-    scaffolds = scan_vault(vault)
+    stats = stats_from_args("scaffolding_index", args)
+    with stats.stage("scan"):
+        scaffolds = scan_catalog(vault) if args.catalog else scan_vault(vault, args.jobs, run_stats=stats)
     if not scaffolds:
         print("No se encontraron archivos de andamiaje (líneas 📄 Archivo cargado: **...**).")
+        stats.finish()
         return
 
-    index_text = build_index_text(scaffolds)
-    out_path = vault / "scaffolding_index.md"
-    out_path.write_text(index_text, encoding="utf-8")
+    with stats.stage("write"):
+        index_text = build_index_text(scaffolds)
+        out_path = vault / "scaffolding_index.md"
+        out_path.write_text(index_text, encoding="utf-8")
+        stats.wrote(out_path)
 
     print(f"✅ Índice generado: {out_path}")
     print(f"Andamiajes detectados: {len(scaffolds)}")
     total_refs = sum(len(v) for v in scaffolds.values())
     print(f"Conversaciones indexadas: {total_refs}")
+    stats.finish()
 
 if __name__ == "__main__":
     main()
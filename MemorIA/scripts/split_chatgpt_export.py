@@ -8,6 +8,7 @@ Incluye:
 - --date-field create|update y --include-both-dates
 - --force-project-id / --force-project y --project-tag
 - Siempre escribe Project_name: "<nombre>" o "none"
+- --catalog [RUTA] registra las notas escritas en el catálogo SQLite del vault (vault_catalog.py)
 
 Evita statements en una sola línea con ';' para máxima compatibilidad.
 """
@@ -18,8 +19,18 @@ import os
 import re
 import sys
 import zipfile
+import zlib
 import hashlib
-from typing import Any, Dict, List, Tuple
+import io
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, Set, Tuple
+
+from keyword_tagger import KeywordTagger
+from run_stats import RunStats, add_stats_arguments, stats_from_args
+from vault_catalog import VaultCatalog
 
 GENERIC_TITLES = {
     "", "conversación", "conversation", "new chat", "conversación nueva",
@@ -73,25 +84,65 @@ def content_hash(s: str, n: int = 8) -> str:
 def short_ts(dt: datetime.datetime) -> str:
     return dt.strftime("%Y%m%d%H%M")
 
+class OutputLayout:
+    """Caché en memoria de los nombres de cada carpeta de salida.
+
+    Cada carpeta se crea y se lista UNA vez por ejecución; después, las comprobaciones
+    de colisión de write_md son consultas a un set en vez de os.path.exists en disco.
+    """
+
+    def __init__(self):
+        self._dirs: Dict[str, set] = {}
+
+    def _names(self, d: str) -> set:
+        names = self._dirs.get(d)
+        if names is None:
+            ensure_dir(d)
+            names = {os.path.normcase(n) for n in os.listdir(d)}
+            self._dirs[d] = names
+        return names
+
+    def ensure_dir(self, d: str) -> None:
+        self._names(d)
+
+    def exists(self, path: str) -> bool:
+        d, name = os.path.split(path)
+        return os.path.normcase(name) in self._names(d)
+
+    def claim(self, path: str) -> None:
+        d, name = os.path.split(path)
+        self._names(d).add(os.path.normcase(name))
+
 def write_md(base_out_dir: str, title: str, date_str: str,
              messages: List[Dict[str, str]], tags: List[str],
              by_year: bool = False, by_month: bool = False,
              existing_policy: Dict[str, Any] | None = None,
-             extra_front: Dict[str, Any] | None = None) -> Tuple[str, str]:
+             extra_front: Dict[str, Any] | None = None,
+             layout: OutputLayout | None = None,
+             branches: List[Dict[str, Any]] | None = None,
+             name_suffix: str = "", front_title: str | None = None) -> Tuple[str, str]:
+    """Escribe la nota y devuelve (ruta, ruta relativa). El nombre sale de `title`; `name_suffix`
+    va detrás del slug ya recortado (p. ej. -rama-N), así nunca se pierde aunque el título sea
+    largo. `front_title` sustituye a `title` en el YAML."""
     y, m, _ = date_str.split("-")
     out_dir = base_out_dir
     if by_year:
         out_dir = os.path.join(out_dir, y)
     if by_month:
         out_dir = os.path.join(out_dir, m if by_year else f"{y}-{m}")
-    ensure_dir(out_dir)
+    if layout:
+        layout.ensure_dir(out_dir)
+        exists = layout.exists
+    else:
+        ensure_dir(out_dir)
+        exists = os.path.exists
 
-    fname = f"{date_str}_{slugify(title)[:80]}.md"
+    fname = f"{date_str}_{slugify(title)[:80]}{name_suffix}.md"
     path = os.path.join(out_dir, fname)
 
     lines: List[str] = []
     lines.append("---")
-    safe_title = (title or "").replace('"', "'")
+    safe_title = (front_title if front_title is not None else title or "").replace('"', "'")
     lines.append(f'title: "{safe_title}"')
     lines.append(f"date: {date_str}")
     if tags:
@@ -109,12 +160,19 @@ def write_md(base_out_dir: str, title: str, date_str: str,
         content = (msg.get("content", "") or "").rstrip()
         lines.append(f"### {role}\n")
         lines.append(content + "\n")
+    for i, br in enumerate(branches or [], 1):
+        lines.append(f"## 🌿 Rama alternativa {i} (tras el mensaje {br['after']})\n")
+        for msg in br.get("messages") or []:
+            role = (msg.get("role", "unknown") or "unknown").capitalize()
+            content = (msg.get("content", "") or "").rstrip()
+            lines.append(f"### {role}\n")
+            lines.append(content + "\n")
     content_text = "\n".join(lines)
 
     policy = existing_policy or {}
     write_path = path
 
-    if os.path.exists(write_path) and policy.get("skip_identical"):
+    if exists(write_path) and policy.get("skip_identical"):
         try:
             with open(write_path, "r", encoding="utf-8", errors="ignore") as f:
                 before = f.read().strip()
@@ -124,14 +182,14 @@ def write_md(base_out_dir: str, title: str, date_str: str,
         except Exception:
             pass
 
-    if os.path.exists(write_path) and policy.get("keep_versions"):
+    if exists(write_path) and policy.get("keep_versions"):
         scheme = policy.get("version_scheme", "hash")
         if scheme == "timestamp":
             dt = policy.get("conv_dt") or datetime.datetime.now()
             base, ext = os.path.splitext(path)
             write_path = f"{base}-t{short_ts(dt)}{ext}"
             i = 2
-            while os.path.exists(write_path):
+            while exists(write_path):
                 write_path = f"{base}-t{short_ts(dt)}-{i}{ext}"
                 i += 1
         elif scheme == "hash":
@@ -139,20 +197,21 @@ def write_md(base_out_dir: str, title: str, date_str: str,
             base, ext = os.path.splitext(path)
             write_path = f"{base}-h{h}{ext}"
             i = 2
-            while os.path.exists(write_path):
+            while exists(write_path):
                 write_path = f"{base}-h{h}-{i}{ext}"
                 i += 1
         else:
             if policy.get("suffix_on_duplicate"):
                 base, ext = os.path.splitext(path)
                 i = 2
-                while os.path.exists(write_path):
+                while exists(write_path):
                     write_path = f"{base}-v{i}{ext}"
                     i += 1
 
-    ensure_dir(os.path.dirname(write_path))
     with open(write_path, "w", encoding="utf-8") as f:
         f.write(content_text)
+    if layout:
+        layout.claim(write_path)
 
     rel = os.path.relpath(write_path, base_out_dir).replace("\\", "/")
     return write_path, rel
@@ -166,107 +225,435 @@ def norm_hex_id(s: str):
     m = re.search(r'(?:^g(?:-p)?-)?([0-9a-f]{32})$', s)
     return m.group(1) if m else None
 
-def parse_json_conversations(obj: Any) -> List[Dict[str, Any]]:
-    conversations: List[Dict[str, Any]] = []
-
+def _raw_conversation_list(obj: Any) -> List[Any]:
     if isinstance(obj, dict) and "conversations" in obj and isinstance(obj["conversations"], list):
-        raw = obj["conversations"]
-    elif isinstance(obj, list):
-        raw = obj
+        return obj["conversations"]
+    if isinstance(obj, list):
+        return obj
+    return obj.get("items", []) if isinstance(obj, dict) else []
+
+def _node_message(node: Dict[str, Any]) -> Dict[str, str] | None:
+    msg = node.get("message")
+    if not msg:
+        return None
+    author = (msg.get("author") or {}).get("role") or msg.get("role") or "unknown"
+    c = msg.get("content")
+    if isinstance(c, dict) and "parts" in c:
+        content = "\n".join(str(p) for p in c.get("parts") or [])
+    elif isinstance(c, list):
+        content = "\n".join(str(p) for p in c)
+    elif isinstance(c, str):
+        content = c
     else:
-        raw = obj.get("items", []) if isinstance(obj, dict) else []
-
-    for conv in raw:
-        title = conv.get("title") or "Conversación"
-        ct = conv.get("create_time") or conv.get("createTime")
-        ut = conv.get("update_time") or conv.get("updateTime")
-        gid = conv.get("gizmo_id") or conv.get("gizmoId")
-        mapping = conv.get("mapping")
-        messages: List[Dict[str, str]] = []
-
-        if isinstance(mapping, dict):
-            def node_time(n: Dict[str, Any]) -> float:
-                try:
-                    return float(n.get("message", {}).get("create_time") or 0)
-                except Exception:
-                    return 0.0
-
-            nodes = [n for n in mapping.values() if isinstance(n, dict)]
-            nodes.sort(key=node_time)
-            for node in nodes:
-                msg = node.get("message")
-                if not msg:
+        content = json.dumps(c, ensure_ascii=False)
+    if (content or "").strip():
+        return {"role": author, "content": content}
+    return None
+
+def _child_ids(nodes: Dict[str, Dict[str, Any]], nid: str) -> List[str]:
+    return [c for c in nodes[nid].get("children") or [] if c in nodes]
+
+def _descend(nodes: Dict[str, Dict[str, Any]], nid: str, seen: set) -> List[str]:
+    """Camino desde `nid` hasta una hoja siguiendo siempre el ÚLTIMO hijo (la regeneración más reciente)."""
+    path: List[str] = []
+    while nid in nodes and nid not in seen:
+        seen.add(nid)
+        path.append(nid)
+        kids = _child_ids(nodes, nid)
+        if not kids:
+            break
+        nid = kids[-1]
+    return path
+
+def walk_mapping(mapping: Dict[str, Any], current_node: str | None = None,
+                 with_branches: bool = False) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]]]:
+    """Recorre el grafo parent/children del `mapping` en tiempo lineal.
+
+    El hilo principal es el camino raíz → current_node (si falta, raíz → último hijo).
+    Con with_branches, devuelve además cada rama alternativa (regeneraciones, ediciones
+    abandonadas) como {"after": nº de mensajes previos en su linaje, "messages": [...],
+    "context": linaje + rama}. Cada nodo se visita una sola vez.
+    """
+    nodes = {nid: n for nid, n in mapping.items() if isinstance(n, dict)}
+
+    if not any(n.get("parent") or n.get("children") for n in nodes.values()):
+        # Export sin estructura de árbol: orden cronológico como antes
+        def node_time(n: Dict[str, Any]) -> float:
+            try:
+                return float(n.get("message", {}).get("create_time") or 0)
+            except Exception:
+                return 0.0
+
+        flat = [m for m in (_node_message(n) for n in sorted(nodes.values(), key=node_time)) if m]
+        return flat, []
+
+    seen: set = set()
+    if current_node in nodes:
+        main: List[str] = []
+        nid = current_node
+        while nid in nodes and nid not in seen:
+            seen.add(nid)
+            main.append(nid)
+            nid = nodes[nid].get("parent")
+        main.reverse()
+    else:
+        roots = [nid for nid, n in nodes.items() if n.get("parent") not in nodes]
+        main = _descend(nodes, roots[0], seen) if roots else []
+
+    def to_messages(path: List[str]) -> Tuple[List[Dict[str, str]], List[int]]:
+        # msgs + nº de mensajes acumulados tras cada nodo del camino
+        msgs: List[Dict[str, str]] = []
+        upto: List[int] = []
+        for nid in path:
+            m = _node_message(nodes[nid])
+            if m:
+                msgs.append(m)
+            upto.append(len(msgs))
+        return msgs, upto
+
+    messages, main_upto = to_messages(main)
+    branches: List[Dict[str, Any]] = []
+    if not with_branches:
+        return messages, branches
+
+    work = [(main, main_upto, messages)]
+    head = 0
+    while head < len(work):
+        path, upto, context = work[head]
+        head += 1
+        for pos, nid in enumerate(path):
+            for child in _child_ids(nodes, nid):
+                if child in seen:
                     continue
-                author = (msg.get("author") or {}).get("role") or msg.get("role") or "unknown"
-                c = msg.get("content")
-                if isinstance(c, dict) and "parts" in c:
-                    content = "\n".join(str(p) for p in c.get("parts") or [])
-                elif isinstance(c, list):
-                    content = "\n".join(str(p) for p in c)
-                elif isinstance(c, str):
-                    content = c
-                else:
-                    content = json.dumps(c, ensure_ascii=False)
-                if (content or "").strip():
-                    messages.append({"role": author, "content": content})
+                sub = _descend(nodes, child, seen)
+                sub_msgs, sub_upto = to_messages(sub)
+                after = upto[pos]
+                sub_context = context[:after] + sub_msgs
+                if sub_msgs:
+                    branches.append({"after": after, "messages": sub_msgs, "context": sub_context})
+                work.append((sub, [after + k for k in sub_upto], sub_context))
+    return messages, branches
+
+def parse_json_conversation(conv: Dict[str, Any], branches: str = "none") -> Dict[str, Any]:
+    """Normaliza UNA conversación cruda del export a {title, create_time, update_time, messages, gizmo_id}.
+
+    branches: "none" (solo hilo principal) o "sections"/"notes" (añade "branches" con las ramas alternativas).
+    """
+    title = conv.get("title") or "Conversación"
+    ct = conv.get("create_time") or conv.get("createTime")
+    ut = conv.get("update_time") or conv.get("updateTime")
+    gid = conv.get("gizmo_id") or conv.get("gizmoId")
+    mapping = conv.get("mapping")
+    messages: List[Dict[str, str]] = []
+    alt: List[Dict[str, Any]] = []
+
+    if isinstance(mapping, dict):
+        messages, alt = walk_mapping(mapping, conv.get("current_node"), with_branches=branches != "none")
+    else:
+        msgs = conv.get("messages") or conv.get("items") or []
+        for m in msgs:
+            role = (m.get("author") or {}).get("role") or m.get("role") or "unknown"
+            content = m.get("content") or ""
+            if isinstance(content, dict) and "parts" in content:
+                content = "\n".join(content["parts"])
+            messages.append({"role": role, "content": content})
+
+    out = {
+        "id": conv.get("id") or conv.get("conversation_id"),
+        "title": title,
+        "create_time": ct,
+        "update_time": ut,
+        "messages": messages,
+        "gizmo_id": gid,
+    }
+    if alt:
+        out["branches"] = alt
+    return out
+
+def parse_json_conversations(obj: Any, branches: str = "none") -> List[Dict[str, Any]]:
+    return [parse_json_conversation(conv, branches) for conv in _raw_conversation_list(obj)]
+
+_JSON_SEP_RE = re.compile(r"[\s,]*")
+
+def iter_json_array(f: IO[str], chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """Recorre el array JSON de nivel superior de `f` elemento a elemento.
+
+    Solo mantiene en memoria el trozo leído y el elemento en curso. Si el documento
+    no es un array (p.ej. {"conversations": [...]}) se carga entero y se delega en
+    _raw_conversation_list.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_size)
+    eof = not buf
+    pos = _JSON_SEP_RE.match(buf).end()
+    while pos >= len(buf) and not eof:
+        more = f.read(chunk_size)
+        eof = not more
+        buf = buf[pos:] + more
+        pos = _JSON_SEP_RE.match(buf).end()
+    if pos >= len(buf):
+        return
+    if buf[pos] != "[":
+        yield from _raw_conversation_list(json.loads(buf[pos:] + f.read()))
+        return
+    pos += 1
+
+    while True:
+        pos = _JSON_SEP_RE.match(buf, pos).end()
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("JSON truncado: falta el cierre ']' del array")
+            more = f.read(chunk_size)
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+            # Un número/literal pegado al final del buffer podría seguir en el próximo trozo
+            if end == len(buf) and not eof:
+                raise ValueError("elemento posiblemente incompleto")
+        except ValueError:
+            if eof:
+                raise
+            # Elemento más grande que el buffer: leer al menos lo mismo que ya hay (crecimiento geométrico)
+            more = f.read(max(chunk_size, len(buf) - pos))
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        yield obj
+        pos = end
+        if pos >= chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+# Una cadena JSON completa o un corchete/llave; las cadenas se saltan enteras (incluidas sus llaves)
+_JSON_SCAN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+_JSON_DATA_RE = re.compile(r"\bjsonData\s*=\s*(?=[\[{])")
+HTML_CHUNK = 1 << 20  # caracteres por lectura al recorrer un chat.html
+_SCRIPT_OPEN_RE = re.compile(r"<script\b[^>]*>", re.IGNORECASE)
+_SCRIPT_CLOSE_RE = re.compile(r"</script\s*>", re.IGNORECASE)
+
+def balanced_json_end(text: str, start: int) -> int:
+    """Posición tras el cierre del [..]/{..} que abre en text[start]; -1 si no cierra.
+
+    Un solo recorrido: la regex salta de token en token y las cadenas (con escapes)
+    se consumen de una vez, así que las llaves dentro de textos no cuentan.
+    """
+    depth = 0
+    for m in _JSON_SCAN_RE.finditer(text, start):
+        ch = text[m.start()]
+        if ch == '"':
+            continue
+        if ch in "[{":
+            depth += 1
         else:
-            msgs = conv.get("messages") or conv.get("items") or []
-            for m in msgs:
-                role = (m.get("author") or {}).get("role") or m.get("role") or "unknown"
-                content = m.get("content") or ""
-                if isinstance(content, dict) and "parts" in content:
-                    content = "\n".join(content["parts"])
-                messages.append({"role": role, "content": content})
-
-        conversations.append({
-            "title": title,
-            "create_time": ct,
-            "update_time": ut,
-            "messages": messages,
-            "gizmo_id": gid,
-        })
-
-    return conversations
-
-def parse_html_export(html_text: str) -> List[Dict[str, Any]]:
-    m = re.search(r'(\{.*?"conversations".*?\})', html_text, flags=re.DOTALL)
+            depth -= 1
+            if depth == 0:
+                return m.end()
+    return -1
+
+def find_embedded_conversations(html_text: str) -> Any | None:
+    """Localiza el JSON de conversaciones incrustado en chat.html sin regex no codiciosas.
+
+    Prueba primero el valor de una clave "conversations": [...] y después la asignación
+    `jsonData = [...]` que usa el chat.html oficial. Si un candidato no llega a cerrar no
+    se prueban los siguientes: cada intento recorrería otra vez hasta el final del texto.
+    """
+    pos = html_text.find('"conversations"')
+    while pos != -1:
+        i = pos + len('"conversations"')
+        while i < len(html_text) and html_text[i].isspace():
+            i += 1
+        if i < len(html_text) and html_text[i] == ":":
+            i += 1
+            while i < len(html_text) and html_text[i].isspace():
+                i += 1
+            if i < len(html_text) and html_text[i] == "[":
+                end = balanced_json_end(html_text, i)
+                if end == -1:
+                    break
+                try:
+                    return json.loads(html_text[i:end])
+                except ValueError:
+                    pass
+        pos = html_text.find('"conversations"', pos + 1)
+
+    m = _JSON_DATA_RE.search(html_text)
     if m:
-        try:
-            data = json.loads(m.group(1))
-            return parse_json_conversations(data)
-        except Exception:
-            pass
+        end = balanced_json_end(html_text, m.end())
+        if end != -1:
+            try:
+                return json.loads(html_text[m.end():end])
+            except ValueError:
+                pass
+    return None
+
+class _HtmlSections(HTMLParser):
+    """Recorre el HTML una sola vez: cada h2/h3 abre sección y cada p/pre/code (el más
+    externo) aporta un bloque de texto hasta el siguiente encabezado.
+
+    Se alimenta por trozos con push(). El texto de los <script> (ahí va el JSON incrustado
+    del chat.html oficial) no pasa por HTMLParser, que lo acumularía y lo volvería a
+    recorrer con cada trozo: se guarda aparte en `scripts`.
+
+    Como en HTML, un <p> (o un encabezado) sin cerrar termina donde empieza otro bloque
+    (h1–h6, div, pre, p): no se traga los encabezados y secciones que vengan detrás."""
+
+    HEADERS = ("h2", "h3")
+    BLOCKS = ("p", "pre", "code")
+    SKIP = ("script", "style")
+    # Bloques cuya apertura cierra un <p> o un encabezado que se quedó abierto
+    CLOSES_OPEN = ("h1", "h2", "h3", "h4", "h5", "h6", "div", "pre", "p")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections: List[Tuple[str, List[str]]] = []
+        self.all_text: List[str] = []
+        self._tag: str | None = None   # h2/h3/p/pre/code que se está capturando
+        self._depth = 0
+        self._buf: List[str] = []
+        self._skip = 0
+        self._pending = ""
+        self._in_script = False
+        self._text: List[str] = []     # trozos del nodo de texto en curso
+        self.scripts: List[str] = []
 
+    def push(self, chunk: str):
+        buf = self._pending + chunk
+        while buf:
+            if self._in_script:
+                m = _SCRIPT_CLOSE_RE.search(buf)
+                if m is None:
+                    # Se guarda una cola por si el trozo corta un "</script" a medias
+                    cut = max(0, len(buf) - 16)
+                    self.scripts.append(buf[:cut])
+                    self._pending = buf[cut:]
+                    return
+                self.scripts.append(buf[:m.start()])
+                self._in_script = False
+                buf = buf[m.start():]
+                continue
+            m = _SCRIPT_OPEN_RE.search(buf)
+            if m is None:
+                lt = buf.rfind("<")
+                cut = lt if lt != -1 and ">" not in buf[lt:] else len(buf)
+                self.feed(buf[:cut])
+                self._pending = buf[cut:]
+                return
+            self.feed(buf[:m.end()])
+            buf = buf[m.end():]
+            # Solo si HTMLParser también ve ahí un <script> (no dentro de un comentario…)
+            self._in_script = self.cdata_elem == "script"
+        self._pending = ""
+
+    def close(self):
+        if self._in_script:
+            self.scripts.append(self._pending)
+        else:
+            self.feed(self._pending)
+        self._pending = ""
+        super().close()
+        self._flush_text()
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in self.SKIP:
+            self._skip += 1
+            return
+        if self._tag in ("p", *self.HEADERS) and tag in self.CLOSES_OPEN:
+            self._finish()
+        if self._tag is not None:
+            if tag == self._tag:
+                self._depth += 1
+            return
+        if tag in self.HEADERS or (tag in self.BLOCKS and self.sections):
+            self._tag, self._depth, self._buf = tag, 1, []
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._tag is None or tag != self._tag:
+            return
+        self._depth -= 1
+        if not self._depth:
+            self._finish()
+
+    def _finish(self):
+        """Cierra el bloque que se está capturando (por su etiqueta de cierre o por otro bloque)."""
+        if self._tag in self.HEADERS:
+            self.sections.append(("".join(self._buf) or "Conversación", []))
+        else:
+            self.sections[-1][1].append("\n".join(self._buf))
+        self._tag = None
+
+    def handle_data(self, data):
+        # HTMLParser puede entregar un mismo texto en varios trozos (p. ej. donde se
+        # cortó la lectura): se junta hasta la siguiente etiqueta
+        if not self._skip:
+            self._text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def _flush_text(self):
+        t = "".join(self._text).strip()
+        self._text = []
+        if not t:
+            return
+        self.all_text.append(t)
+        if self._tag is not None:
+            self._buf.append(t)
+
+def parse_html_export(html_text: str, branches: str = "none") -> List[Dict[str, Any]]:
+    return parse_html_stream(io.StringIO(html_text), branches)
+
+def parse_html_stream(f: IO[str], branches: str = "none") -> List[Dict[str, Any]]:
+    """Una sola pasada por el HTML, leído en trozos de HTML_CHUNK: nunca está entero en memoria.
+
+    El JSON de conversaciones se busca en el texto de los <script>; si no hay, cada h2/h3
+    es una conversación con los bloques que le siguen.
+    """
+    parser = _HtmlSections()
     try:
-        from bs4 import BeautifulSoup  # type: ignore
-        soup = BeautifulSoup(html_text, "htmlparser") if False else BeautifulSoup(html_text, "html.parser")
-        convs: List[Dict[str, Any]] = []
-        headers = soup.find_all(["h2", "h3"])
-        for h in headers:
-            title = h.get_text(strip=True) or "Conversación"
-            body: List[str] = []
-            for sib in h.find_all_next(["p", "pre", "code"]):
-                if sib.name in ("h2", "h3"):
-                    break
-                body.append(sib.get_text("\n", strip=True))
-            if body:
-                alt = ["user", "assistant"]
-                msgs = [{"role": alt[i % 2], "content": t} for i, t in enumerate(body)]
-                convs.append({"title": title, "create_time": None, "update_time": None, "messages": msgs, "gizmo_id": None})
-        if convs:
-            return convs
-
-        text = soup.get_text("\n", strip=True)
-        parts = [p for p in text.splitlines() if p.strip()]
-        alt = ["user", "assistant"]
-        msgs = [{"role": alt[i % 2], "content": t} for i, t in enumerate(parts)]
-        return [{"title": "Conversación", "create_time": None, "update_time": None, "messages": msgs, "gizmo_id": None}]
+        for chunk in iter(lambda: f.read(HTML_CHUNK), ""):
+            parser.push(chunk)
+        parser.close()
     except Exception:
-        pass
+        parser.sections = []
+        parser.all_text = []
+
+    data = find_embedded_conversations("".join(parser.scripts))
+    parser.scripts = []
+    if data is not None:
+        return parse_json_conversations(data, branches)
+
+    alt = ["user", "assistant"]
+    convs: List[Dict[str, Any]] = []
+    for title, body in parser.sections:
+        if body:
+            msgs = [{"role": alt[i % 2], "content": t} for i, t in enumerate(body)]
+            convs.append({"title": title, "create_time": None, "update_time": None, "messages": msgs, "gizmo_id": None})
+    if convs:
+        return convs
 
-    return []
+    parts = [p for p in "\n".join(parser.all_text).splitlines() if p.strip()]
+    if not parts:
+        return []
+    msgs = [{"role": alt[i % 2], "content": t} for i, t in enumerate(parts)]
+    return [{"title": "Conversación", "create_time": None, "update_time": None, "messages": msgs, "gizmo_id": None}]
 
-def load_conversations(input_path: str) -> List[Dict[str, Any]]:
+def iter_conversations(input_path: str, branches: str = "none") -> Iterator[Dict[str, Any]]:
+    """Como load_conversations, pero entrega las conversaciones una a una.
+
+    Para conversations.json (suelto o dentro del ZIP) lee el array en streaming,
+    así la memoria pico es ~una conversación, sea cual sea el tamaño del export.
+    """
     p = os.path.abspath(input_path)
     if not os.path.exists(p):
         raise FileNotFoundError(f"No existe: {input_path}")
@@ -281,33 +668,396 @@ def load_conversations(input_path: str) -> List[Dict[str, Any]]:
                     json_name = name
                     break
             if json_name:
-                with z.open(json_name) as f:
-                    data = json.load(f)
-                return parse_json_conversations(data)
+                with z.open(json_name) as raw, io.TextIOWrapper(raw, encoding="utf-8-sig") as f:
+                    for conv in iter_json_array(f):
+                        yield parse_json_conversation(conv, branches)
+                return
             for name in z.namelist():
                 if name.lower().endswith(".html"):
-                    with z.open(name) as f:
-                        html = f.read().decode("utf-8", errors="ignore")
-                    return parse_html_export(html)
+                    with z.open(name) as raw, io.TextIOWrapper(raw, encoding="utf-8", errors="ignore") as f:
+                        yield from parse_html_stream(f, branches)
+                    return
             raise RuntimeError("No se encontró conversations.json ni HTML dentro del ZIP.")
 
     if ext == ".json":
-        with open(p, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return parse_json_conversations(data)
+        with open(p, "r", encoding="utf-8-sig") as f:
+            for conv in iter_json_array(f):
+                yield parse_json_conversation(conv, branches)
+        return
 
     if ext in (".html", ".htm"):
         with open(p, "r", encoding="utf-8") as f:
-            html = f.read()
-        return parse_html_export(html)
+            yield from parse_html_stream(f, branches)
+        return
 
     raise RuntimeError("Formato no soportado. Usa .zip, .json o .html")
 
-def main():
+def load_conversations(input_path: str, branches: str = "none") -> List[Dict[str, Any]]:
+    return list(iter_conversations(input_path, branches))
+
+# ---------- manifest de importación ----------
+
+def options_fingerprint(args: argparse.Namespace, tagger: KeywordTagger | None, gizmo_map: Dict[str, str]) -> str:
+    """Huella de todo lo que cambia el Markdown generado (si cambia, no se reaprovecha nada)."""
+    relevant = {k: getattr(args, k, None) for k in (
+        "by_year", "by_month", "date_field", "include_both_dates", "force_project_id",
+        "force_project", "project_tag", "tag_whole_word", "tag_min_count", "tag_weights", "branches")}
+    relevant["tags"] = tagger.entries if tagger else []
+    relevant["gizmo_map"] = sorted(gizmo_map.items())
+    blob = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+class ImportManifest:
+    """Manifest persistente en el vault: id de conversación → {hash: update_time y registro}.
+
+    Permite saltar conversaciones sin cambios ANTES de renderizar o leer nada del disco,
+    reutilizando su registro para _index.md y _tags/. Se guarda cada versión (hash) vista de
+    un mismo id: si el id aparece con contenidos distintos en varias exportaciones solapadas,
+    ninguna pisa a la otra y reimportar el mismo conjunto no vuelve a renderizar nada.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str, options_fp: str):
+        self.path = path
+        self.options_fp = options_fp
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.known: Set[str] = set()  # ids del manifest anterior (con otras opciones solo cuentan como cambiadas)
+        self.options_changed = False
+        self.counts = {"new": 0, "changed": 0, "unchanged": 0}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self.entries = data.get("conversations") or {}
+                    self.options_changed = data.get("options") != options_fp
+                    self.known = set(self.entries)
+                    if self.options_changed:
+                        # Nada de lo renderizado con otras opciones vale ya
+                        self.entries = {}
+            except Exception as e:
+                print("Advertencia: manifest ilegible, se reconstruye:", e)
+
+    @staticmethod
+    def conversation_hash(conv: Dict[str, Any]) -> str:
+        blob = json.dumps(conv, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(blob.encode("utf-8", errors="ignore")).hexdigest()
+
+    def lookup(self, conv: Dict[str, Any]) -> Tuple[Tuple[str, Any, str] | None, Dict[str, Any] | None]:
+        """Devuelve (token, registro_cacheado). registro_cacheado es None si hay que renderizar."""
+        cid = conv.get("id")
+        if not cid:
+            self.counts["new"] += 1
+            return None, None
+        ut = conv.get("update_time")
+        h = self.conversation_hash(conv)
+        token = (str(cid), ut, h)
+        versions = self.entries.get(str(cid), {})
+        prev = versions.get(h)
+        if prev is not None and prev.get("update_time") == ut and prev.get("record"):
+            self.counts["unchanged"] += 1
+            return token, prev["record"]
+        self.counts["changed" if versions or str(cid) in self.known else "new"] += 1
+        return token, None
+
+    def remember(self, token: Tuple[str, Any, str] | None, record: Dict[str, Any]) -> None:
+        if token is None:
+            return
+        cid, ut, h = token
+        self.entries.setdefault(cid, {})[h] = {"update_time": ut, "record": record}
+
+    def save(self) -> None:
+        ensure_dir(os.path.dirname(os.path.abspath(self.path)))
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "options": self.options_fp, "conversations": self.entries},
+                      f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def summary(self) -> str:
+        c = self.counts
+        return f"Manifest: {c['new']} nuevas, {c['changed']} cambiadas, {c['unchanged']} sin cambios"
+
+# ---------- render ----------
+
+def render_conversation(conv: Dict[str, Any], args: argparse.Namespace,
+                        tagger: KeywordTagger | None, gizmo_map: Dict[str, str],
+                        layout: OutputLayout | None = None) -> Dict[str, Any]:
+    """Escribe la nota de una conversación y devuelve su registro para _index.md/_tags."""
+    title = smart_title(conv.get("title"), conv.get("messages") or [])
+    ct_raw = conv.get("create_time")
+    ut_raw = conv.get("update_time")
+    date_primary = iso_date(ct_raw)
+    if args.date_field == "update" and ut_raw is not None:
+        date_primary = iso_date(ut_raw)
+
+    msgs = conv.get("messages") or []
+    timed = bool(getattr(args, "stats", False) or getattr(args, "stats_json", None))
+    t_start = time.perf_counter()
+
+    full_text = (title or "") + "\n" + "\n".join(m.get("content", "") for m in msgs)
+    tags: List[str] = []
+    tag_weights: Dict[str, int] = {}
+    if tagger:
+        matched = tagger.matches(full_text, min_count=args.tag_min_count)
+        tags = [tg for tg, _ in matched]
+        for tg, c in matched:
+            tag_weights[tg] = tag_weights.get(tg, 0) + c
+    t_tag = time.perf_counter() - t_start
+
+    # Resolver nombre de proyecto (si existe)
+    gid = conv.get("gizmo_id") or conv.get("gizmoId")
+    name_from_map = None
+    if gid:
+        hx = norm_hex_id(gid)
+        name_from_map = gizmo_map.get(gid) or gizmo_map.get("g-" + (hx or "")) or gizmo_map.get("g-p-" + (hx or "")) or gizmo_map.get(hx or "")
+
+    extra_front: Dict[str, Any] = {}
+    # Añadir Project_name siempre
+    extra_front["Project_name"] = name_from_map if name_from_map else "none"
+
+    if args.force_project_id:
+        extra_front["source_project_id"] = args.force_project_id
+    elif gid:
+        extra_front["source_project_id"] = gid
+
+    if args.force_project:
+        extra_front["source_project"] = args.force_project
+    elif name_from_map:
+        extra_front["source_project"] = name_from_map
+
+    if args.include_both_dates:
+        c = iso_date_or_none(ct_raw)
+        u = iso_date_or_none(ut_raw)
+        if c:
+            extra_front["created"] = c
+        if u:
+            extra_front["updated"] = u
+
+    if args.tag_weights and tag_weights:
+        extra_front["tag_weights"] = " ".join(f"{tg[1:]}:{c}" for tg, c in tag_weights.items())
+
+    if args.project_tag:
+        slug = extra_front.get("source_project") or extra_front.get("Project_name")
+        if slug and slug != "none":
+            tg = f"#project/{slugify(slug)}"
+            if tg not in tags:
+                tags.append(tg)
+
+    existing_policy = {
+        "keep_versions": args.keep_versions,
+        "suffix_on_duplicate": args.suffix_on_duplicate,
+        "skip_identical": args.skip_identical,
+        "version_scheme": args.version_scheme,
+        "conv_dt": datetime.datetime.fromtimestamp(float(ct_raw)) if (args.use_conv_timestamp and ct_raw) else None,
+    }
+
+    t_write = time.perf_counter()
+    path, rel = write_md(
+        args.output, title, date_primary, msgs, tags,
+        by_year=args.by_year, by_month=args.by_month,
+        existing_policy=existing_policy,
+        extra_front=extra_front if extra_front else None,
+        layout=layout,
+        branches=conv.get("branches") if args.branches == "sections" else None,
+    )
+
+    written = [path]
+    t_write = time.perf_counter() - t_write
+    words = sum(word_count(m.get("content", "")) for m in msgs)
+    record = {
+        "date": date_primary, "title": title, "tags": tags,
+        "relpath": rel, "count": len(msgs), "words": words
+    }
+
+    if args.branches == "notes" and conv.get("branches"):
+        # Una nota por rama: linaje común hasta la bifurcación + mensajes de la rama
+        branch_records = []
+        for i, br in enumerate(conv["branches"], 1):
+            b_title = f"{title} (rama {i})"
+            b_front = dict(extra_front)
+            b_front["branch_of"] = rel
+            b_front["branch_after"] = br["after"]
+            t0 = time.perf_counter()
+            b_path, b_rel = write_md(
+                args.output, title, date_primary, br["context"], tags,
+                by_year=args.by_year, by_month=args.by_month,
+                existing_policy=existing_policy,
+                extra_front=b_front,
+                layout=layout,
+                name_suffix=f"-rama-{i}",
+                front_title=b_title,
+            )
+            if os.path.normcase(b_path) == os.path.normcase(path):
+                raise RuntimeError(f"La nota de la rama {i} pisaría la nota principal: {rel}")
+            t_write += time.perf_counter() - t0
+            written.append(b_path)
+            branch_records.append({
+                "date": date_primary, "title": b_title, "tags": tags, "relpath": b_rel,
+                "count": len(br["context"]),
+                "words": sum(word_count(m.get("content", "")) for m in br["context"]),
+            })
+        record["branches"] = branch_records
+    if timed:
+        # Se descuenta en render_serial/render_parallel antes de guardar el registro en el manifest
+        record["_timings"] = {"tag": t_tag, "write": t_write, "total": time.perf_counter() - t_start,
+                              "files": len(written), "bytes": sum(os.path.getsize(p) for p in written)}
+    return record
+
+def account_timings(record: Dict[str, Any], stats: RunStats | None) -> None:
+    """Pasa los tiempos medidos en render_conversation (quizá en otro proceso) a las estadísticas."""
+    t = record.pop("_timings", None)
+    if t is None or stats is None:
+        return
+    stats.add_time("tag", t["tag"])
+    stats.add_time("write", t["write"])
+    stats.add("render", files_written=t["files"], bytes_written=t["bytes"])
+    stats.file_time(record.get("relpath"), t["total"])
+
+# ---------- modo multiproceso ----------
+
+_VERSION_SUFFIX_RE = re.compile(r"-(h[0-9a-f]{8}(-\d+)?|v\d+|t\d{12}(-\d+)?)$", re.IGNORECASE)
+# Las notas de rama (--branches notes) se llaman "<título> (rama N)" → <slug>-rama-N
+_BRANCH_SUFFIX_RE = re.compile(r"-rama-\d+$", re.IGNORECASE)
+
+def collision_key(conv: Dict[str, Any], args: argparse.Namespace) -> str:
+    """Ruta base de la nota sin sufijos de versión (-h…, -t…, -vN) ni de rama (-rama-N).
+
+    Dos conversaciones cuyos nombres pueden chocar (misma base, o una base que parece
+    una versión o una nota de rama de otra) comparten clave; así se procesan en el mismo
+    worker y en orden.
+    """
+    title = smart_title(conv.get("title"), conv.get("messages") or [])
+    ts = conv.get("create_time")
+    if args.date_field == "update" and conv.get("update_time") is not None:
+        ts = conv.get("update_time")
+    date_str = iso_date(ts)
+    y, m, _ = date_str.split("-")
+    out_dir = ""
+    if args.by_year:
+        out_dir = os.path.join(out_dir, y)
+    if args.by_month:
+        out_dir = os.path.join(out_dir, m if args.by_year else f"{y}-{m}")
+    stem = f"{date_str}_{slugify(title)[:80]}"
+    while True:
+        core = _BRANCH_SUFFIX_RE.sub("", _VERSION_SUFFIX_RE.sub("", stem))
+        if core == stem:
+            break
+        stem = core
+    return os.path.join(out_dir, stem)
+
+_WORKER_CTX: Dict[str, Any] = {}
+
+def _init_worker(args: argparse.Namespace, tagger: KeywordTagger | None, gizmo_map: Dict[str, str]) -> None:
+    _WORKER_CTX["args"] = args
+    _WORKER_CTX["tagger"] = tagger
+    _WORKER_CTX["gizmo_map"] = gizmo_map
+    # Cada worker solo nombra ficheros de sus collision_key: su caché nunca queda obsoleta
+    _WORKER_CTX["layout"] = OutputLayout()
+
+def _render_in_worker(conv: Dict[str, Any]) -> Dict[str, Any]:
+    return render_conversation(conv, _WORKER_CTX["args"], _WORKER_CTX["tagger"], _WORKER_CTX["gizmo_map"],
+                               layout=_WORKER_CTX["layout"])
+
+def render_serial(conversations: Iterable[Dict[str, Any]], args: argparse.Namespace,
+                  tagger: KeywordTagger | None, gizmo_map: Dict[str, str],
+                  manifest: ImportManifest | None = None, stats: RunStats | None = None) -> List[Dict[str, Any]]:
+    records: List[Dict[str, Any]] = []
+    layout = OutputLayout()
+    for conv in conversations:
+        token, cached = manifest.lookup(conv) if manifest else (None, None)
+        record = cached if cached is not None else render_conversation(conv, args, tagger, gizmo_map, layout=layout)
+        account_timings(record, stats)
+        if manifest:
+            manifest.remember(token, record)
+        records.append(record)
+    return records
+
+def render_parallel(conversations: Iterable[Dict[str, Any]], args: argparse.Namespace,
+                    tagger: KeywordTagger | None, gizmo_map: Dict[str, str], workers: int,
+                    manifest: ImportManifest | None = None, stats: RunStats | None = None) -> List[Dict[str, Any]]:
+    """Reparte las conversaciones entre `workers` procesos y devuelve los registros en orden.
+
+    Cada worker es un ejecutor de un solo proceso (cola FIFO). Las conversaciones con la
+    misma collision_key van siempre al mismo worker, de modo que la resolución de nombres
+    (--keep-versions, --skip-identical) ve los ficheros en el mismo orden que en serie.
+    """
+    shards = [ProcessPoolExecutor(max_workers=1, initializer=_init_worker,
+                                  initargs=(args, tagger, gizmo_map))
+              for _ in range(workers)]
+    window = workers * 8  # conversaciones en vuelo como máximo (memoria acotada con --stream)
+    pending: Deque[Tuple[Any, Future]] = deque()
+    records: List[Dict[str, Any]] = []
+
+    def collect() -> None:
+        token, fut = pending.popleft()
+        record = fut.result()
+        account_timings(record, stats)
+        if manifest:
+            manifest.remember(token, record)
+        records.append(record)
+
+    try:
+        for conv in conversations:
+            token, cached = manifest.lookup(conv) if manifest else (None, None)
+            if cached is not None:
+                fut: Future = Future()
+                fut.set_result(cached)
+            else:
+                key = collision_key(conv, args)
+                shard = shards[zlib.crc32(key.encode("utf-8")) % workers]
+                fut = shard.submit(_render_in_worker, conv)
+            pending.append((token, fut))
+            while len(pending) >= window:
+                collect()
+        while pending:
+            collect()
+    finally:
+        for ex in shards:
+            ex.shutdown(cancel_futures=True)
+    return records
+
+def load_tag_map(path: str | None) -> Dict[str, str]:
+    tag_map: Dict[str, str] = {}
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tag_map = json.load(f)
+        except Exception as e:
+            print("Advertencia: no pude cargar tag-map:", e)
+    return tag_map
+
+def load_gizmo_map(path: str | None) -> Dict[str, str]:
+    """Carga el mapa y expande las claves a todas las variantes (hex, g-, g-p-)."""
+    gizmo_map: Dict[str, str] = {}
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            for k, v in raw.items():
+                m = re.search(r'(?:^g(?:-p)?-)?([0-9a-f]{32})$', k.strip().lower())
+                if not m:
+                    continue
+                hx = m.group(1)
+                gizmo_map[hx] = v
+                gizmo_map["g-" + hx] = v
+                gizmo_map["g-p-" + hx] = v
+        except Exception as e:
+            print("Advertencia: no pude cargar gizmo_map:", e)
+    return gizmo_map
+
+def build_arg_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(description="Divide exportaciones de ChatGPT en Markdown para Obsidian.")
     ap.add_argument("input")
     ap.add_argument("output")
     ap.add_argument("--tag-map", default=None)
+    ap.add_argument("--tag-whole-word", action="store_true",
+                    help="Las claves del tag-map solo cuentan como palabra completa")
+    ap.add_argument("--tag-min-count", type=int, default=1,
+                    help="Apariciones mínimas de una clave para asignar su tag (por defecto 1)")
+    ap.add_argument("--tag-weights", action="store_true",
+                    help="Añade tag_weights al YAML con las apariciones por tag")
     ap.add_argument("--gizmo-map", default=None, help="JSON con id→nombre (g-*, g-p-* o hex) → slug/nombre")
     ap.add_argument("--make-index", action="store_true")
     ap.add_argument("--tag-indexes", action="store_true")
@@ -315,6 +1065,14 @@ def main():
     ap.add_argument("--by-year", action="store_true")
     ap.add_argument("--by-month", action="store_true")
     ap.add_argument("--top-n", type=int, default=20)
+    ap.add_argument("--stream", action="store_true",
+                    help="Lee conversations.json en streaming y escribe cada nota al vuelo (memoria ~1 conversación)")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Procesos para renderizar conversaciones en paralelo (0 = todos los núcleos)")
+    ap.add_argument("--branches", choices=["none", "sections", "notes"], default="none",
+                    help="Ramas alternativas del mapping: omitir, añadir como secciones o escribir notas aparte")
+    ap.add_argument("--manifest", default=None,
+                    help="JSON de importación (id → versiones por hash); salta conversaciones sin cambios")
 
     ap.add_argument("--date-field", choices=["create", "update"], default="create",
                     help="Elegir la fecha principal en el YAML (por defecto: create)")
@@ -334,117 +1092,21 @@ def main():
     ap.add_argument("--force-project-id", default=None, help="Forzar source_project_id si el export no trae gizmo_id")
     ap.add_argument("--force-project", default=None, help="Forzar source_project (nombre/slug)")
     ap.add_argument("--project-tag", action="store_true", help="Añade tag #project/<slug> si hay nombre")
+    add_stats_arguments(ap)
+    ap.add_argument("--catalog", nargs="?", const="", default=None,
+                    help="Registra las notas en el catálogo SQLite del vault. Sin ruta: el padre de la salida "
+                         "si esta se llama Conversaciones, si no la propia salida")
+    return ap
 
-    args = ap.parse_args()
-
-    ensure_dir(args.output)
-
-    tag_map: Dict[str, str] = {}
-    if args.tag_map:
-        try:
-            with open(args.tag_map, "r", encoding="utf-8") as f:
-                tag_map = json.load(f)
-        except Exception as e:
-            print("Advertencia: no pude cargar tag-map:", e)
-
-    # Cargar mapa y expandir claves a todas las variantes (hex, g-, g-p-)
-    gizmo_map: Dict[str, str] = {}
-    if args.gizmo_map:
-        try:
-            with open(args.gizmo_map, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            for k, v in raw.items():
-                m = re.search(r'(?:^g(?:-p)?-)?([0-9a-f]{32})$', k.strip().lower())
-                if not m:
-                    continue
-                hx = m.group(1)
-                gizmo_map[hx] = v
-                gizmo_map["g-" + hx] = v
-                gizmo_map["g-p-" + hx] = v
-        except Exception as e:
-            print("Advertencia: no pude cargar gizmo_map:", e)
-
-    conversations = load_conversations(args.input)
-    if not conversations:
-        print("No se encontraron conversaciones.")
-        sys.exit(2)
-
-    records: List[Dict[str, Any]] = []
-    for conv in conversations:
-        title = smart_title(conv.get("title"), conv.get("messages") or [])
-        ct_raw = conv.get("create_time")
-        ut_raw = conv.get("update_time")
-        date_primary = iso_date(ct_raw)
-        if args.date_field == "update" and ut_raw is not None:
-            date_primary = iso_date(ut_raw)
-
-        msgs = conv.get("messages") or []
-
-        full_text = (title or "") + "\n" + "\n".join(m.get("content", "") for m in msgs)
-        tags = []
-        if tag_map:
-            low = full_text.lower()
-            for kw, tg in tag_map.items():
-                if (kw or "").lower() in low:
-                    tags.append(tg if str(tg).startswith("#") else f"#{tg}")
-
-        # Resolver nombre de proyecto (si existe)
-        gid = conv.get("gizmo_id") or conv.get("gizmoId")
-        name_from_map = None
-        if gid:
-            hx = norm_hex_id(gid)
-            name_from_map = gizmo_map.get(gid) or gizmo_map.get("g-" + (hx or "")) or gizmo_map.get("g-p-" + (hx or "")) or gizmo_map.get(hx or "")
-
-        extra_front: Dict[str, Any] = {}
-        # Añadir Project_name siempre
-        extra_front["Project_name"] = name_from_map if name_from_map else "none"
-
-        if args.force_project_id:
-            extra_front["source_project_id"] = args.force_project_id
-        elif gid:
-            extra_front["source_project_id"] = gid
-
-        if args.force_project:
-            extra_front["source_project"] = args.force_project
-        elif name_from_map:
-            extra_front["source_project"] = name_from_map
-
-        if args.include_both_dates:
-            c = iso_date_or_none(ct_raw)
-            u = iso_date_or_none(ut_raw)
-            if c:
-                extra_front["created"] = c
-            if u:
-                extra_front["updated"] = u
-
-        if args.project_tag:
-            slug = extra_front.get("source_project") or extra_front.get("Project_name")
-            if slug and slug != "none":
-                tg = f"#project/{slugify(slug)}"
-                if tg not in tags:
-                    tags.append(tg)
-
-        existing_policy = {
-            "keep_versions": args.keep_versions,
-            "suffix_on_duplicate": args.suffix_on_duplicate,
-            "skip_identical": args.skip_identical,
-            "version_scheme": args.version_scheme,
-            "conv_dt": datetime.datetime.fromtimestamp(float(ct_raw)) if (args.use_conv_timestamp and ct_raw) else None,
-        }
-
-        path, rel = write_md(
-            args.output, title, date_primary, msgs, tags,
-            by_year=args.by_year, by_month=args.by_month,
-            existing_policy=existing_policy,
-            extra_front=extra_front if extra_front else None,
-        )
-
-        words = sum(word_count(m.get("content", "")) for m in msgs)
-        records.append({
-            "date": date_primary, "title": title, "tags": tags,
-            "relpath": rel, "count": len(msgs), "words": words
-        })
+def catalog_root(args: argparse.Namespace) -> str:
+    """Carpeta del vault cuyo catálogo recibe las notas de esta importación."""
+    if args.catalog:
+        return args.catalog
+    out = os.path.abspath(args.output)
+    return os.path.dirname(out) if os.path.basename(out) == "Conversaciones" else out
 
+def write_indexes(args: argparse.Namespace, records: List[Dict[str, Any]]) -> None:
+    """_index.md y _tags/<tag>.md a partir de los registros renderizados."""
     if args.make_index:
         path = os.path.join(args.output, "_index.md")
         with open(path, "w", encoding="utf-8") as f:
@@ -467,7 +1129,79 @@ def main():
                 for it in items:
                     f.write(f"- [{it['title']}]({it['relpath']}) — {it['date']}\n")
 
-    print(f"Listo. Exportadas {len(records)} conversaciones a: {args.output}")
+def run_split(args: argparse.Namespace, tagger: KeywordTagger | None = None,
+              gizmo_map: Dict[str, str] | None = None) -> int:
+    """Importa una exportación con las opciones de `args`. Devuelve las conversaciones exportadas.
+
+    Quien importe varias exportaciones seguidas (batch_sequencer) puede pasar el tagger y el
+    gizmo_map ya cargados; si no, se cargan de --tag-map / --gizmo-map.
+    """
+    ensure_dir(args.output)
+    stats = stats_from_args("split_chatgpt_export", args)
+
+    with stats.stage("load_maps"):
+        if tagger is None:
+            tag_map = load_tag_map(args.tag_map)
+            # Autómata construido una sola vez para todas las conversaciones
+            tagger = KeywordTagger(tag_map, whole_word=args.tag_whole_word) if tag_map else None
+        if gizmo_map is None:
+            gizmo_map = load_gizmo_map(args.gizmo_map)
+
+    stats.read_files([args.input], stage="parse")
+    if args.stream:
+        # El parseo ocurre mientras se renderiza: se mide el tiempo de sacar cada conversación
+        conversations = stats.timed_iter(iter_conversations(args.input, args.branches), "parse")
+    else:
+        with stats.stage("parse"):
+            conversations = load_conversations(args.input, args.branches)
+        if not conversations:
+            print("No se encontraron conversaciones.")
+            sys.exit(2)
+
+    manifest = None
+    if args.manifest:
+        manifest = ImportManifest(args.manifest, options_fingerprint(args, tagger, gizmo_map))
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    with stats.stage("render"):
+        if workers > 1:
+            records = render_parallel(conversations, args, tagger, gizmo_map, workers, manifest=manifest, stats=stats)
+        else:
+            records = render_serial(conversations, args, tagger, gizmo_map, manifest=manifest, stats=stats)
+    stats.add("render", notes=len(records))
+
+    if manifest:
+        manifest.save()
+        print(manifest.summary())
+        c = manifest.counts
+        stats.cache("manifest", hits=c["unchanged"], misses=c["new"] + c["changed"])
+
+    if not records:
+        print("No se encontraron conversaciones.")
+        sys.exit(2)
+    exported = len(records)
+    if args.branches == "notes":
+        records = [r2 for r in records for r2 in [r, *r.get("branches", [])]]
+
+    with stats.stage("indexes"):
+        write_indexes(args, records)
+
+    if args.catalog is not None:
+        # Tras renderizar (los workers no comparten la conexión): solo se leen las notas cambiadas.
+        # Varias conversaciones pueden acabar en la misma nota (versiones, --no-dedupe): cada
+        # ruta se cuenta una vez
+        paths = list(dict.fromkeys(os.path.join(args.output, r["relpath"]) for r in records))
+        with stats.stage("catalog"), VaultCatalog.for_vault(catalog_root(args)) as cat:
+            updated = cat.refresh(paths)
+        stats.cache("catalog", hits=len(paths) - updated, misses=updated)
+        print(f"Catálogo: {updated} notas registradas en {cat.db_path}")
+
+    print(f"Listo. Exportadas {exported} conversaciones a: {args.output}")
+    stats.finish()
+    return exported
+
+def main(argv: List[str] | None = None):
+    run_split(build_arg_parser().parse_args(argv))
 
 if __name__ == "__main__":
     main()
@@ -11,14 +11,24 @@ Opciones:
   --out _tree_index.md        Archivo de salida dentro del vault (por defecto)
   --max-per-month 0           Límite de notas por mes (0 = sin límite)
   --conversations-dir Conversaciones   Subcarpeta a escanear
+  --no-cache                  No usar ni guardar .tree_index_cache.json
+  --catalog                   Toma las notas del catálogo SQLite del vault (vault_catalog.py)
+
+El front-matter se lee solo hasta el '---' de cierre, y se guarda en .tree_index_cache.json
+(en la raíz del vault) por ruta, tamaño y mtime: sobre un vault sin cambios no se abre ninguna nota.
+Con --catalog el índice sale de una consulta a .memoria_catalog.sqlite (que antes se pone al día).
 """
 
 import os
 import re
+import json
 import argparse
 from pathlib import Path
 from collections import defaultdict
 
+from run_stats import RunStats, add_stats_arguments, stats_from_args
+from vault_jobs import SKIP_DIRS
+
 MONTH_NAMES_ES = {
     "01": "01 · enero",
     "02": "02 · febrero",
@@ -36,33 +46,35 @@ MONTH_NAMES_ES = {
 
 DATE_RX = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
 
-def read_frontmatter(path: Path) -> dict:
-    """Lectura mínima de front-matter YAML sin dependencias externas."""
-    try:
-        txt = path.read_text(encoding="utf-8")
-    except Exception:
-        return {}
-
-    if not txt.startswith("---"):
-        return {}
-
-    # Encuentra cierre del bloque YAML
-    # Acepta '---' en línea sola como cierre.
-    lines = txt.splitlines()
-    if len(lines) < 3:
-        return {}
+CACHE_NAME = ".tree_index_cache.json"
+CACHE_VERSION = 1
+MAX_FRONTMATTER_LINES = 1000  # sin cierre en estas líneas, se considera que no hay front-matter
 
+def read_frontmatter_lines(path: Path):
+    """Líneas del bloque YAML inicial, leyendo solo hasta el '---' de cierre. None si no hay bloque."""
     fm_lines = []
-    ended = False
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            ended = True
-            break
-        fm_lines.append(lines[i])
-
-    if not ended:
-        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            first = True
+            for raw in f:
+                for line in raw.splitlines():
+                    if first:
+                        if not line.startswith("---"):
+                            return None
+                        first = False
+                        continue
+                    # Acepta '---' en línea sola como cierre.
+                    if line.strip() == "---":
+                        return fm_lines
+                    fm_lines.append(line)
+                    if len(fm_lines) > MAX_FRONTMATTER_LINES:
+                        return None
+    except Exception:
+        return None
+    return None
 
+def parse_frontmatter(fm_lines: list[str]) -> dict:
+    """Pares clave: valor de las líneas del front-matter (sin dependencias externas)."""
     fm = {}
     for raw in fm_lines:
         if ":" not in raw:
@@ -76,6 +88,13 @@ def read_frontmatter(path: Path) -> dict:
         fm[k] = v
     return fm
 
+def read_frontmatter(path: Path) -> dict:
+    """Lectura mínima de front-matter YAML sin dependencias externas."""
+    fm_lines = read_frontmatter_lines(path)
+    if not fm_lines:
+        return {}
+    return parse_frontmatter(fm_lines)
+
 def infer_date_from_any(path: Path, title: str) -> str:
     """Intenta date en front, filename o contenido; retorna YYYY-MM-DD o '0000-00-00'."""
     # 1) Busca en nombre de archivo
@@ -104,36 +123,102 @@ def to_wikilink(rel_md_path: Path, title: str) -> str:
     alias = alias.replace("|", "¦")
     return f"[[{without_ext}|{alias}]]"
 
-def collect_notes(vault_root: Path, conversations_dir: str) -> list[dict]:
+def load_cache(vault_root: Path) -> dict:
+    try:
+        data = json.loads((vault_root / CACHE_NAME).read_text(encoding="utf-8"))
+        if data.get("version") == CACHE_VERSION:
+            return data.get("notes") or {}
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_cache(vault_root: Path, notes: dict) -> None:
+    path = vault_root / CACHE_NAME
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "notes": notes}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[!] No pude guardar la caché ({path}): {e}")
+
+def collect_notes(vault_root: Path, conversations_dir: str, cache: dict | None = None,
+                  run_stats: RunStats | None = None) -> list[dict]:
+    """
+    Si se pasa `cache` ({ruta relativa: {size, mtime_ns, fm}}), reutiliza el front-matter de las
+    notas con mismo tamaño y mtime y la deja actualizada solo con las notas presentes.
+    """
     base = vault_root / conversations_dir
     out = []
-    for root, _, files in os.walk(base):
+    seen = {}
+    read = 0
+    for root, dirs, files in os.walk(base):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
         for fn in files:
             if not fn.lower().endswith(".md"):
                 continue
             p = Path(root) / fn
-            fm = read_frontmatter(p)
-            project = (fm.get("Project_name") or "none").strip()
-            title = (fm.get("title") or p.stem).strip()
-            date = (fm.get("date") or "").strip()
-            if not DATE_RX.match(date):
-                date = infer_date_from_any(p, title)
-
-            y, m, d = (date[0:4], date[5:7], date[8:10]) if len(date) >= 10 else ("0000","00","00")
-            rel = p.relative_to(vault_root)
-            out.append({
-                "project": project or "none",
-                "title": title,
-                "date": date,
-                "year": y,
-                "month": m,
-                "day": d,
-                "rel": rel,
-            })
+            if cache is None:
+                fm = read_frontmatter(p)
+                read += 1
+            else:
+                key = p.relative_to(vault_root).as_posix()
+                try:
+                    st = p.stat()
+                    size, mtime = st.st_size, st.st_mtime_ns
+                except OSError:
+                    size = mtime = None
+                entry = cache.get(key)
+                if entry and entry.get("size") == size and entry.get("mtime_ns") == mtime:
+                    fm = entry.get("fm") or {}
+                else:
+                    fm = read_frontmatter(p)
+                    read += 1
+                seen[key] = {"size": size, "mtime_ns": mtime, "fm": fm}
+            out.append(note_row(vault_root, p, fm))
+    if cache is not None:
+        cache.clear()
+        cache.update(seen)
+    if run_stats is not None:
+        # Solo se lee el front-matter: se cuentan las notas abiertas, no sus bytes
+        run_stats.add(files_read=read, notes=len(out))
+        run_stats.cache("frontmatter", hits=len(out) - read, misses=read)
     # orden global por fecha desc, luego título
     out.sort(key=lambda r: (r["date"], r["title"].lower()), reverse=True)
     return out
 
+def note_row(vault_root: Path, p: Path, fm: dict) -> dict:
+    """Fila del índice para una nota a partir de su front-matter (con los mismos respaldos de fecha/título)."""
+    project = (fm.get("Project_name") or "none").strip()
+    title = (fm.get("title") or p.stem).strip()
+    date = (fm.get("date") or "").strip()
+    if not DATE_RX.match(date):
+        date = infer_date_from_any(p, title)
+
+    y, m, d = (date[0:4], date[5:7], date[8:10]) if len(date) >= 10 else ("0000","00","00")
+    return {
+        "project": project or "none",
+        "title": title,
+        "date": date,
+        "year": y,
+        "month": m,
+        "day": d,
+        "rel": p.relative_to(vault_root),
+    }
+
+def collect_notes_from_catalog(vault_root: Path, conversations_dir: str) -> list[dict]:
+    """Igual que collect_notes, pero con una consulta al catálogo en vez de abrir las notas."""
+    from vault_catalog import VaultCatalog  # import local: vault_catalog importa este módulo
+
+    prefix = Path(conversations_dir).as_posix().strip("/") + "/"
+    with VaultCatalog.for_vault(vault_root) as cat:
+        cat.sync()
+        out = []
+        for r in cat.notes(prefix):
+            fm = {"Project_name": r["project"], "title": r["title"], "date": r["date"]}
+            out.append(note_row(vault_root, vault_root / r["path"], fm))
+    out.sort(key=lambda r: (r["date"], r["title"].lower()), reverse=True)
+    return out
+
 def group_by_project_year_month(rows: list[dict]):
     tree = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
     counts = defaultdict(int)
@@ -186,26 +271,40 @@ def render_markdown(tree, counts, max_per_month: int, conversations_dir: str) ->
     lines.append("")  # newline final
     return "\n".join(lines)
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser(description="Genera un árbol de navegación por Project_name (wikilinks Obsidian).")
     ap.add_argument("vault", help="Ruta al Vault (raíz que contiene la carpeta de conversaciones)")
     ap.add_argument("--out", default="_tree_index.md", help="Archivo de salida dentro del vault")
     ap.add_argument("--max-per-month", type=int, default=0, help="Límite de notas por mes (0 = sin límite)")
     ap.add_argument("--conversations-dir", default="Conversaciones", help="Subcarpeta a escanear dentro del vault")
-    args = ap.parse_args()
+    ap.add_argument("--no-cache", action="store_true", help=f"No usar ni guardar {CACHE_NAME}")
+    ap.add_argument("--catalog", action="store_true", help="Lee las notas del catálogo SQLite del vault")
+    add_stats_arguments(ap)
+    args = ap.parse_args(argv)
 
     vault = Path(args.vault).expanduser().resolve()
     if not vault.is_dir():
         raise SystemExit(f"[x] No existe la carpeta del vault: {vault}")
 
-    rows = collect_notes(vault, args.conversations_dir)
-    tree, counts = group_by_project_year_month(rows)
-    md = render_markdown(tree, counts, args.max_per_month, args.conversations_dir)
-
-    out_path = vault / args.out
-    out_path.write_text(md, encoding="utf-8")
+    stats = stats_from_args("tree_index", args)
+    with stats.stage("collect"):
+        if args.catalog:
+            rows = collect_notes_from_catalog(vault, args.conversations_dir)
+            stats.add(notes=len(rows))
+        else:
+            cache = None if args.no_cache else load_cache(vault)
+            rows = collect_notes(vault, args.conversations_dir, cache, run_stats=stats)
+            if cache is not None:
+                save_cache(vault, cache)
+    with stats.stage("render"):
+        tree, counts = group_by_project_year_month(rows)
+        md = render_markdown(tree, counts, args.max_per_month, args.conversations_dir)
+        out_path = vault / args.out
+        out_path.write_text(md, encoding="utf-8")
+        stats.wrote(out_path)
     print(f"✅ Índice generado: {out_path}")
     print(f"   Proyectos: {len(tree)}  ·  Notas: {sum(counts.values())}")
+    stats.finish()
 
 if __name__ == "__main__":
     main()
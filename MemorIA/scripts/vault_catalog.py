@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vault_catalog.py — Catálogo SQLite de un vault (<vault>/.memoria_catalog.sqlite).
+
+Guarda por nota: título, fecha, proyecto, fuente, nº de mensajes y de palabras, tags,
+imágenes embebidas (![[...]]) y andamiajes ("📄 Archivo cargado: **...**"), junto con su
+tamaño y mtime. Una nota solo se vuelve a leer si cambian tamaño o mtime.
+
+Quién lo rellena:
+- split_chatgpt_export.py --catalog   notas recién escritas en RAW_VAULT
+- vault_cleaner.py --catalog          vaults limpios tras generarlos
+- vault_transform.py --catalog        notas reescritas por las etapas
+Quién lo consulta:
+- tree_index.py --catalog, scaffolding_index.py --catalog (una consulta SQL en vez de leer el vault)
+
+Uso suelto:
+  python vault_catalog.py /ruta/al/vault            sincroniza el catálogo con el vault
+  python vault_catalog.py /ruta/al/vault --stats    además muestra totales por proyecto y tag
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from scaffolding_index import SCAFFOLD_RE
+from tree_index import parse_frontmatter
+from vault_jobs import SKIP_DIRS
+
+CATALOG_NAME = ".memoria_catalog.sqlite"
+SCHEMA_VERSION = 1
+
+ROLE_HEADING_RE = re.compile(r"^###\s+[A-Za-z]+\s*$")
+IMAGE_EMBED_RE = re.compile(r"!\[\[([^\]|#]+)(?:[|#][^\]]*)?\]\]")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    path       TEXT PRIMARY KEY,   -- ruta relativa al vault, con '/'
+    size       INTEGER,
+    mtime_ns   INTEGER,
+    title      TEXT,
+    date       TEXT,
+    project    TEXT,
+    project_id TEXT,
+    source     TEXT,
+    messages   INTEGER,
+    words      INTEGER
+);
+CREATE TABLE IF NOT EXISTS tags      (path TEXT NOT NULL, tag TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS images    (path TEXT NOT NULL, target TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS scaffolds (path TEXT NOT NULL, name TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS tags_path      ON tags (path);
+CREATE INDEX IF NOT EXISTS tags_tag       ON tags (tag);
+CREATE INDEX IF NOT EXISTS images_path    ON images (path);
+CREATE INDEX IF NOT EXISTS scaffolds_path ON scaffolds (path);
+CREATE INDEX IF NOT EXISTS notes_project  ON notes (project, date);
+"""
+
+def default_catalog_path(vault: Path) -> Path:
+    return vault / CATALOG_NAME
+
+def split_front_matter(text: str) -> Tuple[Optional[List[str]], str]:
+    """(líneas del front-matter o None, cuerpo). Mismas reglas que tree_index.read_frontmatter."""
+    if not text.startswith("---"):
+        return None, text
+    lines = text.splitlines(keepends=True)
+    for i in range(1, len(lines)):
+        if lines[i].strip() == "---":
+            return [ln.rstrip("\r\n") for ln in lines[1:i]], "".join(lines[i + 1:])
+    return None, text
+
+def parse_note(text: str) -> Dict:
+    """Metadatos de una nota a partir de su texto."""
+    fm_lines, body = split_front_matter(text)
+    fm = parse_frontmatter(fm_lines) if fm_lines else {}
+    messages = words = 0
+    for line in body.splitlines():
+        if ROLE_HEADING_RE.match(line):
+            messages += 1
+        else:
+            words += len(line.split())
+    return {
+        "title": fm.get("title"),
+        "date": fm.get("date"),
+        "project": fm.get("Project_name"),
+        "project_id": fm.get("source_project_id"),
+        "source": fm.get("source"),
+        "messages": messages,
+        "words": words,
+        "tags": [t for t in (fm.get("tags") or "").split() if t],
+        "images": [m.group(1).strip() for m in IMAGE_EMBED_RE.finditer(body)],
+        "scaffolds": [m.group(1).strip() for m in SCAFFOLD_RE.finditer(text)],
+    }
+
+class VaultCatalog:
+    """Conexión al catálogo de un vault. Las rutas se guardan relativas a la carpeta del .sqlite."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.root = self.db_path.parent
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            # Esquema de otra versión: el catálogo es derivable, se rehace entero
+            self.conn.close()
+            self.db_path.unlink()
+            self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @classmethod
+    def for_vault(cls, vault: Path) -> "VaultCatalog":
+        return cls(default_catalog_path(Path(vault)))
+
+    def __enter__(self) -> "VaultCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def rel(self, path: Path) -> Optional[str]:
+        """Ruta relativa al vault, o None si la nota queda fuera de él."""
+        rel = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        if rel.startswith(".."):
+            return None
+        return rel.replace(os.sep, "/")
+
+    def _forget(self, rel: str) -> None:
+        for table in ("notes", "tags", "images", "scaffolds"):
+            self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (rel,))
+
+    def refresh(self, paths: Iterable[Path], known: Optional[Dict[str, Tuple[int, int]]] = None) -> int:
+        """(Re)indexa las notas dadas cuyo tamaño o mtime haya cambiado. Devuelve cuántas se leyeron."""
+        if known is None:
+            known = {}
+        updated = 0
+        with self.conn:
+            for path in paths:
+                rel = self.rel(Path(path))
+                if rel is None:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    self._forget(rel)
+                    continue
+                stamp = known.get(rel)
+                if stamp is None:
+                    row = self.conn.execute("SELECT size, mtime_ns FROM notes WHERE path = ?", (rel,)).fetchone()
+                    stamp = tuple(row) if row else None
+                if stamp == (st.st_size, st.st_mtime_ns):
+                    continue
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    meta = parse_note(f.read())
+                self._forget(rel)
+                self.conn.execute(
+                    "INSERT INTO notes (path, size, mtime_ns, title, date, project, project_id, source, messages, words)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (rel, st.st_size, st.st_mtime_ns, meta["title"], meta["date"], meta["project"],
+                     meta["project_id"], meta["source"], meta["messages"], meta["words"]))
+                self.conn.executemany("INSERT INTO tags (path, tag) VALUES (?, ?)", [(rel, t) for t in meta["tags"]])
+                self.conn.executemany("INSERT INTO images (path, target) VALUES (?, ?)", [(rel, t) for t in meta["images"]])
+                self.conn.executemany("INSERT INTO scaffolds (path, name) VALUES (?, ?)",
+                                      [(rel, n) for n in meta["scaffolds"]])
+                updated += 1
+        return updated
+
+    def sync(self) -> Tuple[int, int]:
+        """Pone el catálogo al día con el vault: solo stat de cada nota y lectura de las cambiadas.
+        Devuelve (leídas, eliminadas)."""
+        known = {p: (s, m) for p, s, m in self.conn.execute("SELECT path, size, mtime_ns FROM notes")}
+        present: List[Path] = []
+        for root, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            for fn in sorted(files):
+                if fn.lower().endswith(".md"):
+                    present.append(Path(root) / fn)
+        updated = self.refresh(present, known)
+        present_rel = {self.rel(p) for p in present}
+        gone = [p for p in known if p not in present_rel]
+        with self.conn:
+            for rel in gone:
+                self._forget(rel)
+        return updated, len(gone)
+
+    # ---------------- Consultas ----------------
+
+    def notes(self, prefix: str = "") -> List[sqlite3.Row]:
+        self.conn.row_factory = sqlite3.Row
+        try:
+            return self.conn.execute(
+                "SELECT * FROM notes WHERE substr(path, 1, ?) = ? ORDER BY path", (len(prefix), prefix)).fetchall()
+        finally:
+            self.conn.row_factory = None
+
+    def scaffolds(self) -> Dict[str, List[str]]:
+        out: Dict[str, List[str]] = {}
+        for name, path in self.conn.execute("SELECT name, path FROM scaffolds ORDER BY path, rowid"):
+            out.setdefault(name, []).append(path)
+        return out
+
+    def counts(self) -> Dict[str, List[Tuple[str, int]]]:
+        q = self.conn.execute
+        return {
+            "projects": q("SELECT COALESCE(project, 'none'), COUNT(*) FROM notes GROUP BY 1 ORDER BY 2 DESC").fetchall(),
+            "tags": q("SELECT tag, COUNT(*) FROM tags GROUP BY tag ORDER BY 2 DESC").fetchall(),
+        }
+
+def main():
+    ap = argparse.ArgumentParser(description="Sincroniza el catálogo SQLite de un vault.")
+    ap.add_argument("vault", help="Carpeta raíz del Vault")
+    ap.add_argument("--stats", action="store_true", help="Muestra totales por proyecto y tag")
+    args = ap.parse_args()
+
+    vault = Path(args.vault).expanduser().resolve()
+    if not vault.is_dir():
+        sys.exit(f"❌ Carpeta no válida: {vault}")
+
+    with VaultCatalog.for_vault(vault) as cat:
+        updated, removed = cat.sync()
+        total = cat.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        print(f"✅ Catálogo: {cat.db_path}")
+        print(f"   Notas: {total}  ·  leídas: {updated}  ·  eliminadas: {removed}")
+        if args.stats:
+            c = cat.counts()
+            print("\nProyectos:")
+            for name, n in c["projects"]:
+                print(f"- {name}: {n}")
+            print("\nTags:")
+            for tag, n in c["tags"]:
+                print(f"- {tag}: {n}")
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,29 @@ Construye un Vault LIMPIO a partir de un Vault ARCHIVO creado por split_chatgpt_
 
 Preserva metadatos del front-matter original (incluyendo source_project_id/source_project/tags)
 al fusionar o invertir bloques, y solo actualiza title/date/source.
+
+Con --low-memory trabaja en dos pasadas: la primera solo guarda ruta, base, fecha, tamaño
+y nº de palabras de cada nota; la segunda carga un grupo cada vez para fusionarlo o copiarlo.
+La memoria máxima depende entonces del grupo más grande, no del tamaño del Vault.
+
+Con --incremental guarda en LIMPIO/.cleaner_state.json, por grupo, sus notas de origen
+(tamaño, mtime y sha1). En la siguiente ejecución solo rehace los grupos con miembros nuevos
+o cambiados, borra las salidas de los grupos que ya no existen, y las notas con mismo tamaño y
+mtime ni se leen.
+
+Con --target VARIANTE=CARPETA (repetible; variantes forward y reverse) genera varios Vaults
+LIMPIOS en una sola lectura del ARCHIVO: cada grupo se fusiona una vez y el orden inverso
+por bloques se deriva de esa misma fusión.
+  python vault_cleaner.py RAW_VAULT --target forward=MERGED_VAULT --target reverse=REVERSE_VAULT --merge
+
+Con --catalog, al terminar pone al día el catálogo SQLite de cada LIMPIO (vault_catalog.py):
+solo se leen las notas escritas en esta ejecución y se eliminan las de grupos borrados.
 """
-import argparse, os, re, shutil, hashlib
-from typing import Dict, List, Tuple
+import argparse, os, re, shutil, hashlib, json, time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from run_stats import RunStats, add_stats_arguments, stats_from_args
+from vault_catalog import VaultCatalog
 
 # ---------------- Utilidades seguras (Python 3.11+) ----------------
 
@@ -51,12 +71,15 @@ def read_front_matter(md_path: str) -> Tuple[Dict[str, str], List[Dict[str, str]
     """Devuelve (front, messages). Front es dict de claves YAML planas.
     Mensajes se leen del cuerpo '### Role' secciones.
     """
-    front: Dict[str, str] = {}
-    messages: List[Dict[str, str]] = []
     if not os.path.exists(md_path):
-        return front, messages
+        return {}, []
     with open(md_path, "r", encoding="utf-8") as f:
         txt = f.read()
+    return parse_note_text(txt)
+
+def parse_note_text(txt: str) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+    front: Dict[str, str] = {}
+    messages: List[Dict[str, str]] = []
     # Parse YAML front matter simple
     if txt.startswith("---\n"):
         end = txt.find("\n---\n", 4)
@@ -102,106 +125,393 @@ def safe_title_from_base(base_name: str) -> str:
     title_core = core[11:] if len(core) > 11 and core[4] == "-" else core
     return title_core.replace('"', "'")
 
+# ---------------- Agrupación ----------------
+
+# base normalizado sin sufijos -h..., -v..., -t...
+VERSION_SUFFIX_RE = re.compile(r"-(h[0-9a-f]{8}(-\d+)?|v\d+|t\d{12})(?=\.md$)", re.IGNORECASE)
+BASE_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})_")
+
+def base_core_of(filename: str) -> str:
+    return VERSION_SUFFIX_RE.sub("", filename)
+
+def list_archive(conv_dir: str) -> List[str]:
+    import glob
+    return sorted(glob.glob(os.path.join(conv_dir, "**", "*.md"), recursive=True))
+
+def scan_note(path: str, keep_content: bool = True) -> Dict:
+    """Metadatos de una nota del ARCHIVO. Con keep_content=False no guarda front ni mensajes."""
+    base_core = base_core_of(os.path.basename(path))
+    # Extraer fecha YYYY-MM-DD del nombre
+    m = BASE_DATE_RE.match(base_core)
+    front, messages = read_front_matter(path)
+    item = {
+        "path": path,
+        "base": base_core,
+        "date": m.group(1) if m else None,
+        "size": os.path.getsize(path),
+        "words": sum(len((mm.get("content") or "").split()) for mm in messages),
+    }
+    if keep_content:
+        item["front"] = front
+        item["messages"] = messages
+    return item
+
+def scan_archive(paths: Iterable[str], keep_content: bool = True) -> Iterator[Dict]:
+    for path in paths:
+        yield scan_note(path, keep_content)
+
+def scan_note_cached(path: str, rel: str, cache: Dict[str, Dict], seen: Dict[str, Dict]) -> Dict:
+    """
+    Como scan_note(keep_content=False), añadiendo sha1 del contenido. Si `cache` tiene la nota con
+    el mismo tamaño y mtime no la lee; el resultado queda en `seen` para el siguiente estado.
+    """
+    st = os.stat(path)
+    base_core = base_core_of(os.path.basename(path))
+    m = BASE_DATE_RE.match(base_core)
+    entry = cache.get(rel)
+    if not entry or entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+        with open(path, "rb") as f:
+            data = f.read()
+        # Mismos saltos de línea que open(..., "r") en read_front_matter
+        txt = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        _, messages = parse_note_text(txt)
+        entry = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha1": hashlib.sha1(data).hexdigest(),
+            "words": sum(len((mm.get("content") or "").split()) for mm in messages),
+        }
+    seen[rel] = entry
+    return {"path": path, "rel": rel, "base": base_core, "date": m.group(1) if m else None,
+            "size": entry["size"], "words": entry["words"], "sha1": entry["sha1"]}
+
+def group_signature(items: List[Dict]) -> str:
+    h = hashlib.sha1()
+    for rel, sha in sorted((it["rel"], it["sha1"]) for it in items):
+        h.update(f"{rel}\0{sha}\n".encode("utf-8"))
+    return h.hexdigest()
+
+def group_by_base(items: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    groups: Dict[str, List[Dict]] = {}
+    for it in items:
+        groups.setdefault(it["base"], []).append(it)
+    return groups
+
+def load_content(item: Dict) -> Dict:
+    """Devuelve el item con front y mensajes (los lee del disco si la primera pasada no los guardó)."""
+    if "messages" in item:
+        return item
+    front, messages = read_front_matter(item["path"])
+    return dict(item, front=front, messages=messages)
+
+def pick_champion(items: List[Dict]) -> List[Dict]:
+    """Ordena el grupo: campeón por palabras, luego tamaño (primero el campeón)."""
+    return sorted(items, key=lambda x: (x["words"], x["size"]), reverse=True)
+
+def merge_messages(items_sorted: List[Dict]) -> List[Dict[str, str]]:
+    """Dedupe + merge en el orden del grupo (campeón primero)."""
+    seen = set()
+    merged: List[Dict[str, str]] = []
+    for it in items_sorted:
+        for mm in it["messages"]:
+            fp = msg_fp(mm)
+            if fp not in seen:
+                merged.append(mm); seen.add(fp)
+    return merged
+
+def output_path(clean_root: str, base_core: str, date: str, by_year: bool, by_month: bool) -> str:
+    y, m = (date[:4], date[5:7]) if re.match(r"\d{4}-\d{2}-\d{2}", date) else ("0000", "00")
+    # Forzamos carpeta base 'Conversaciones' dentro del vault limpio
+    out_dir = os.path.join(clean_root, "Conversaciones")
+    if by_year:
+        out_dir = os.path.join(out_dir, y)
+    if by_month:
+        out_dir = os.path.join(out_dir, m if by_year else f"{y}-{m}")
+    return os.path.join(out_dir, base_core)
+
+class CleanTarget(NamedTuple):
+    root: str              # carpeta del Vault LIMPIO
+    reverse_blocks: bool   # variante reverse: bloques User+Assistant en orden inverso
+
+TARGET_VARIANTS = {"forward": False, "reverse": True}
+
+class GroupBuild(NamedTuple):
+    """Lo que comparten todas las variantes de un grupo: campeón, fecha y fusión (si la hay)."""
+    base_core: str
+    champion: Dict
+    date: str
+    merged: Optional[List[Dict[str, str]]]
+
+def build_group(base_core: str, items: List[Dict], merge: bool, need_messages: bool) -> GroupBuild:
+    """Elige campeón y fusiona una sola vez. Solo carga del disco lo que hace falta."""
+    items_sorted = pick_champion(items)
+    do_merge = merge and len(items_sorted) > 1
+    if do_merge:
+        items_sorted = [load_content(it) for it in items_sorted]
+    champion = items_sorted[0]
+    if do_merge or need_messages or not champion["date"]:
+        champion = items_sorted[0] = load_content(champion)
+    date = champion["date"] or champion["front"].get("date", "0000-00-00")
+    return GroupBuild(base_core, champion, date, merge_messages(items_sorted) if do_merge else None)
+
+def write_variant(build: GroupBuild, clean_root: str, reverse_blocks: bool, by_year: bool, by_month: bool) -> str:
+    """Escribe una variante de un grupo ya construido. Devuelve la ruta escrita."""
+    champion, date = build.champion, build.date
+    dst = output_path(clean_root, build.base_core, date, by_year, by_month)
+
+    if build.merged is not None or reverse_blocks:
+        msgs = build.merged if build.merged is not None else champion["messages"]
+        if reverse_blocks:
+            msgs = flatten_blocks(list(reversed(group_blocks(msgs))))
+        # Preservar front del campeón y actualizar campos core
+        front = dict(champion["front"]) if champion.get("front") else {}
+        front["title"] = '"' + safe_title_from_base(champion["base"]) + '"'
+        front["date"] = date or "0000-00-00"
+        if build.merged is not None:
+            front["source"] = "archive_merge" + ("_reverse" if reverse_blocks else "")
+        else:
+            front["source"] = "archive_copy_reverse"
+        write_merged_md(dst, front, msgs)
+    else:
+        # copiar tal cual
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copy2(champion["path"], dst)
+    return dst
+
+def write_group(base_core: str, items: List[Dict], clean_root: str, merge: bool, reverse_blocks: bool,
+                by_year: bool, by_month: bool) -> str:
+    """Escribe la nota limpia de un grupo para un único Vault. Devuelve la ruta escrita."""
+    build = build_group(base_core, items, merge, need_messages=reverse_blocks)
+    return write_variant(build, clean_root, reverse_blocks, by_year, by_month)
+
+def clean_full(conv_dir: str, targets: List[CleanTarget], merge: bool, by_year: bool, by_month: bool,
+               low_memory: bool = False, run_stats: Optional[RunStats] = None) -> int:
+    """Reconstruye todos los grupos en todos los destinos. Devuelve el nº de grupos."""
+    run_stats = run_stats or RunStats("vault_cleaner")
+    # Recoger todos los .md agrupados por base (sin sufijos -hXXXX, -v2, etc.)
+    with run_stats.stage("scan"):
+        paths = list_archive(conv_dir)
+        run_stats.read_files(paths)
+        groups = group_by_base(scan_archive(paths, keep_content=not low_memory))
+    need_messages = any(t.reverse_blocks for t in targets)
+    total = len(groups)
+    with run_stats.stage("build", notes=total):
+        for base_core in sorted(groups):
+            t0 = time.perf_counter()
+            build = build_group(base_core, groups.pop(base_core), merge, need_messages)
+            for t in targets:
+                run_stats.wrote(write_variant(build, t.root, t.reverse_blocks, by_year, by_month))
+            run_stats.file_time(base_core, time.perf_counter() - t0)
+    return total
+
+# ---------------- Estado incremental ----------------
+
+STATE_NAME = ".cleaner_state.json"
+
+class CleanerState:
+    """
+    files:  {ruta relativa a Conversaciones/: {size, mtime_ns, sha1, words}}
+    groups: {base_core: {"sig": firma de sus miembros, "output": ruta relativa a LIMPIO}}
+    Si cambian las opciones de salida se conservan los files pero se rehacen todos los grupos.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, options: Dict):
+        self.path = path
+        self.options = options
+        self.files: Dict[str, Dict] = {}
+        self.groups: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, clean_root: str, options: Dict) -> "CleanerState":
+        state = cls(os.path.join(clean_root, STATE_NAME), options)
+        try:
+            with open(state.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return state
+        if data.get("version") != cls.VERSION:
+            return state
+        state.files = data.get("files", {})
+        groups = data.get("groups", {})
+        if data.get("options") == options:
+            state.groups = groups
+        else:
+            # Firmas vacías: todo se rehace, pero se siguen conociendo las salidas antiguas para borrarlas
+            state.groups = {b: {"sig": None, "output": g.get("output")} for b, g in groups.items()}
+        return state
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "options": self.options,
+                       "files": self.files, "groups": self.groups}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+def remove_output(clean_root: str, rel: str) -> None:
+    """Borra una salida antigua y las carpetas de año/mes que queden vacías."""
+    if not rel:
+        return
+    path = os.path.join(clean_root, rel)
+    if os.path.isfile(path):
+        os.remove(path)
+    stop = os.path.join(clean_root, "Conversaciones")
+    parent = os.path.dirname(path)
+    while os.path.normcase(parent) != os.path.normcase(stop) and parent.startswith(stop):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+
+def clean_incremental(conv_dir: str, targets: List[CleanTarget], merge: bool,
+                      by_year: bool, by_month: bool, verbose: bool = False,
+                      run_stats: Optional[RunStats] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Rehace solo los grupos cuyo origen ha cambiado, con un estado por destino.
+    Un grupo que cambia se construye una vez para todos los destinos que lo necesiten.
+    Devuelve contadores por carpeta de destino.
+    """
+    run_stats = run_stats or RunStats("vault_cleaner")
+    states = [CleanerState.load(t.root, {"merge": merge, "reverse_blocks": t.reverse_blocks,
+                                         "by_year": by_year, "by_month": by_month}) for t in targets]
+    # Una sola lectura del ARCHIVO: vale la caché de cualquiera de los estados
+    cache: Dict[str, Dict] = {}
+    for st in reversed(states):
+        cache.update(st.files)
+    seen_files: Dict[str, Dict] = {}
+    with run_stats.stage("scan"):
+        items = (scan_note_cached(p, os.path.relpath(p, conv_dir).replace(os.sep, "/"), cache, seen_files)
+                 for p in list_archive(conv_dir))
+        groups = group_by_base(items)
+    if run_stats.enabled:
+        # scan_note_cached crea una entrada nueva solo para las notas que ha tenido que leer
+        read = [e for rel, e in seen_files.items() if cache.get(rel) is not e]
+        run_stats.add("scan", files_read=len(read), bytes_read=sum(e["size"] for e in read))
+        run_stats.cache("files", hits=len(seen_files) - len(read), misses=len(read))
+
+    stats = {t.root: {"rebuilt": 0, "unchanged": 0, "removed": 0} for t in targets}
+    new_groups: List[Dict[str, Dict]] = [{} for _ in targets]
+    label = (lambda t, rel: f"[{'reverse' if t.reverse_blocks else 'forward'}] {rel}") if len(targets) > 1 \
+        else (lambda t, rel: rel)
+    built = 0
+    with run_stats.stage("build"):
+        for base_core in sorted(groups):
+            members = groups.pop(base_core)
+            sig = group_signature(members)
+            pending = []
+            for i, (t, st) in enumerate(zip(targets, states)):
+                prev = st.groups.get(base_core)
+                if prev and prev.get("sig") == sig and os.path.isfile(os.path.join(t.root, prev["output"])):
+                    new_groups[i][base_core] = prev
+                    stats[t.root]["unchanged"] += 1
+                else:
+                    pending.append(i)
+            if not pending:
+                continue
+            t0 = time.perf_counter()
+            built += 1
+            build = build_group(base_core, members, merge, any(targets[i].reverse_blocks for i in pending))
+            for i in pending:
+                t, prev = targets[i], states[i].groups.get(base_core)
+                dst = write_variant(build, t.root, t.reverse_blocks, by_year, by_month)
+                run_stats.wrote(dst)
+                rel = os.path.relpath(dst, t.root).replace(os.sep, "/")
+                if prev and prev.get("output") != rel:
+                    remove_output(t.root, prev.get("output"))
+                new_groups[i][base_core] = {"sig": sig, "output": rel}
+                stats[t.root]["rebuilt"] += 1
+                if verbose:
+                    print(f"✔ {label(t, rel)}")
+            run_stats.file_time(base_core, time.perf_counter() - t0)
+    run_stats.add("build", notes=built)
+
+    for i, (t, st) in enumerate(zip(targets, states)):
+        for base_core, prev in st.groups.items():
+            if base_core not in new_groups[i]:
+                remove_output(t.root, prev.get("output"))
+                stats[t.root]["removed"] += 1
+                if verbose:
+                    print(f"✖ {label(t, prev.get('output'))}")
+        st.files = seen_files
+        st.groups = new_groups[i]
+        st.save()
+    run_stats.cache("groups", hits=sum(c["unchanged"] for c in stats.values()),
+                    misses=sum(c["rebuilt"] for c in stats.values()))
+    return stats
+
+def parse_target(raw: str) -> CleanTarget:
+    variant, sep, root = raw.partition("=")
+    variant = variant.strip().lower()
+    if not sep or not root.strip() or variant not in TARGET_VARIANTS:
+        raise argparse.ArgumentTypeError(
+            f"--target espera VARIANTE=CARPETA con VARIANTE en {', '.join(TARGET_VARIANTS)}: {raw!r}")
+    return CleanTarget(root.strip(), TARGET_VARIANTS[variant])
+
 # ---------------- Programa principal ----------------
 
-def main():
+def sync_catalogs(targets: List[CleanTarget]) -> None:
+    for t in targets:
+        with VaultCatalog.for_vault(t.root) as cat:
+            updated, removed = cat.sync()
+        print(f"Catálogo: {updated} notas actualizadas, {removed} eliminadas ({cat.db_path})")
+
+def main(argv: Optional[List[str]] = None):
     ap = argparse.ArgumentParser()
     ap.add_argument("archive_root")  # RAW_VAULT
-    ap.add_argument("clean_root")    # MERGED_VAULT o REVERSE_VAULT
+    ap.add_argument("clean_root", nargs="?")  # MERGED_VAULT o REVERSE_VAULT
+    ap.add_argument("--target", action="append", type=parse_target, default=[], metavar="VARIANTE=CARPETA",
+                    help="Destino adicional (repetible): forward=MERGED_VAULT, reverse=REVERSE_VAULT")
     ap.add_argument("--merge", action="store_true")
     ap.add_argument("--reverse-blocks", action="store_true")
     ap.add_argument("--by-year", action="store_true")
     ap.add_argument("--by-month", action="store_true")
+    ap.add_argument("--low-memory", action="store_true",
+                    help="Dos pasadas: solo metadatos en memoria, carga un grupo cada vez")
+    ap.add_argument("--incremental", action="store_true",
+                    help=f"Rehace solo los grupos con notas nuevas o cambiadas (estado en {STATE_NAME})")
+    ap.add_argument("--catalog", action="store_true",
+                    help="Actualiza el catálogo SQLite de cada salida al terminar")
     ap.add_argument("--verbose", action="store_true")
-    args = ap.parse_args()
+    add_stats_arguments(ap)
+    args = ap.parse_args(argv)
+
+    targets: List[CleanTarget] = []
+    if args.clean_root:
+        targets.append(CleanTarget(args.clean_root, args.reverse_blocks))
+    targets.extend(args.target)
+    if not targets:
+        ap.error("indica clean_root o al menos un --target VARIANTE=CARPETA")
+    roots = [os.path.normcase(os.path.abspath(t.root)) for t in targets]
+    if len(set(roots)) != len(roots):
+        ap.error("cada destino necesita su propia carpeta")
 
     conv_dir = os.path.join(args.archive_root, "Conversaciones")
     if not os.path.isdir(conv_dir):
         raise SystemExit(f"No existe carpeta: {conv_dir}")
 
-    # Recoger todos los .md agrupados por base (sin sufijos -hXXXX, -v2, etc.)
-    import glob
-    files = sorted(glob.glob(os.path.join(conv_dir, "**", "*.md"), recursive=True))
-    groups: Dict[str, List[Dict[str, str]]] = {}
-    for path in files:
-        base = os.path.basename(path)
-        # base normalizado sin sufijos -h..., -v..., -t...
-        base_core = re.sub(r"-(h[0-9a-f]{8}(-\d+)?|v\d+|t\d{12})(?=\.md$)", "", base, flags=re.IGNORECASE)
-        # Extraer fecha YYYY-MM-DD del nombre
-        m = re.match(r"(\d{4}-\d{2}-\d{2})_", base_core)
-        date = m.group(1) if m else None
-        # Leer front y mensajes
-        front, messages = read_front_matter(path)
-        groups.setdefault(base_core, []).append({
-            "path": path,
-            "base": base_core,
-            "date": date,
-            "front": front,
-            "messages": messages,
-            "size": os.path.getsize(path),
-            "words": sum(len((mm.get("content") or "").split()) for mm in messages),
-        })
-
-    os.makedirs(args.clean_root, exist_ok=True)
-    os.makedirs(os.path.join(args.clean_root, "Conversaciones"), exist_ok=True)
-
-    for base_core, items in sorted(groups.items()):
-        # Elegir campeón por palabras, luego tamaño
-        items_sorted = sorted(items, key=lambda x: (x["words"], x["size"]), reverse=True)
-        champion = items_sorted[0]
-        date = champion["date"] or champion["front"].get("date", "0000-00-00")
-        # Destino
-        y, m = (date[:4], date[5:7]) if re.match(r"\d{4}-\d{2}-\d{2}", date) else ("0000", "00")
-
-        # --- NUEVO BLOQUE ---
-        # Forzamos carpeta base 'Conversaciones' dentro del vault limpio
-        base_conv = os.path.join(args.clean_root, "Conversaciones")
-        out_dir = base_conv
-        if args.by_year:
-            out_dir = os.path.join(out_dir, y)
-        if args.by_month:
-            out_dir = os.path.join(out_dir, m if args.by_year else f"{y}-{m}")
-        
-        dst = os.path.join(out_dir, base_core)
-        # --- FIN DEL BLOQUE ---
-
-
-        if args.merge and len(items_sorted) > 1:
-            # Dedupe + merge
-            seen = set()
-            merged: List[Dict[str, str]] = []
-            for it in items_sorted:
-                for mm in it["messages"]:
-                    fp = msg_fp(mm)
-                    if fp not in seen:
-                        merged.append(mm); seen.add(fp)
-
-            if args.reverse_blocks:
-                merged = flatten_blocks(list(reversed(group_blocks(merged))))
-
-            # Preservar front del campeón y actualizar campos core
-            front = dict(champion["front"]) if champion.get("front") else {}
-            safe_title = safe_title_from_base(champion["base"])
-            front["title"] = '"' + safe_title + '"'
-            front["date"] = date or "0000-00-00"
-            front["source"] = "archive_merge" + ("_reverse" if args.reverse_blocks else "")
-            write_merged_md(dst, front, merged)
-        else:
-            if args.reverse_blocks:
-                msgs = champion["messages"]
-                rev = flatten_blocks(list(reversed(group_blocks(msgs))))
-                front = dict(champion["front"]) if champion.get("front") else {}
-                safe_title = safe_title_from_base(champion["base"])
-                front["title"] = '"' + safe_title + '"'
-                front["date"] = date or "0000-00-00"
-                front["source"] = "archive_copy_reverse"
-                write_merged_md(dst, front, rev)
-            else:
-                # copiar tal cual
-                os.makedirs(os.path.dirname(dst), exist_ok=True)
-                shutil.copy2(champion["path"], dst)
-
-    print(f"Listo. Salida: {args.clean_root}")
+    for t in targets:
+        os.makedirs(t.root, exist_ok=True)
+        os.makedirs(os.path.join(t.root, "Conversaciones"), exist_ok=True)
+
+    run_stats = stats_from_args("vault_cleaner", args)
+    if args.incremental:
+        stats = clean_incremental(conv_dir, targets, args.merge, args.by_year, args.by_month, args.verbose,
+                                  run_stats=run_stats)
+        for t in targets:
+            st = stats[t.root]
+            print(f"Grupos: {st['rebuilt']} rehechos, {st['unchanged']} sin cambios, {st['removed']} eliminados.")
+            print(f"Listo. Salida: {t.root}")
+    else:
+        clean_full(conv_dir, targets, args.merge, args.by_year, args.by_month, args.low_memory, run_stats=run_stats)
+    if args.catalog:
+        with run_stats.stage("catalog"):
+            sync_catalogs(targets)
+    if not args.incremental:
+        for t in targets:
+            print(f"Listo. Salida: {t.root}")
+    run_stats.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vault_jobs.py — Capa común de ejecución --jobs N para los scripts que procesan nota a nota.
+
+run_jobs(fn, items, jobs) aplica fn a cada elemento y devuelve los resultados en el
+MISMO orden que `items`, tanto en serie (jobs=1) como con un pool de procesos, así que
+los informes y totales de cada script no cambian con el paralelismo.
+
+Reglas para usarla:
+- fn debe ser una función de nivel de módulo (o functools.partial de una) para poder
+  enviarse a otros procesos.
+- El estado grande y común (p.ej. el índice del IMAGE_BANK) se pasa con initializer/initargs
+  una vez por proceso, no con cada tarea. En serie el initializer se llama en este proceso.
+- Con stats (run_stats.RunStats activo) cada elemento se cronometra donde se ejecuta: su
+  tiempo va a las notas más lentas y, en paralelo, la CPU de los procesos a la etapa en curso.
+
+SKIP_DIRS son las carpetas que ningún recorrido del vault debe tocar; todos los scripts
+que procesan nota a nota la importan de aquí.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+# Configuración de Obsidian, repositorio git y papelera de Obsidian
+SKIP_DIRS = frozenset({".obsidian", ".git", ".trash"})
+
+def add_jobs_argument(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Procesos en paralelo (1 = en serie, 0 = todos los núcleos)")
+
+
+def resolve_jobs(jobs: int) -> int:
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def _timed_call(fn: Callable[[Any], Any], item: Any) -> tuple:
+    t0, c0 = time.perf_counter(), time.process_time()
+    result = fn(item)
+    return time.perf_counter() - t0, time.process_time() - c0, result
+
+
+def run_jobs(fn: Callable[[Any], Any], items: Sequence[Any], jobs: int = 1,
+             initializer: Optional[Callable[..., None]] = None, initargs: tuple = (),
+             chunksize: Optional[int] = None, stats: Any = None) -> Iterator[Any]:
+    """Itera fn(item) para cada item, en orden, con `jobs` procesos."""
+    if stats is not None and stats.enabled:
+        parallel = min(resolve_jobs(jobs), max(1, len(items))) > 1
+        timed = run_jobs(partial(_timed_call, fn), items, jobs, initializer, initargs, chunksize)
+        for item, (seconds, cpu, result) in zip(items, timed):
+            stats.file_time(item, seconds)
+            if parallel:
+                stats.add_worker_cpu(cpu)
+            yield result
+        return
+    jobs = min(resolve_jobs(jobs), max(1, len(items)))
+    if jobs <= 1:
+        if initializer:
+            initializer(*initargs)
+        for item in items:
+            yield fn(item)
+        return
+    if chunksize is None:
+        # Lotes medianos: pocos viajes entre procesos sin desequilibrar el reparto
+        chunksize = max(1, min(64, len(items) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as ex:
+        yield from ex.map(fn, items, chunksize=chunksize)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vault_search.py — Búsqueda de texto completo en un vault (SQLite FTS5).
+
+Guarda en <vault>/.memoria_search.sqlite una fila por mensaje ('### Role') de cada nota,
+con su rol y el proyecto, la fecha y los tags del front-matter que escribe split_chatgpt_export.py.
+El índice es incremental: solo se releen las notas nuevas o con otro tamaño/mtime, y se
+quitan las que ya no existen.
+
+Uso:
+  python vault_search.py index /ruta/al/vault                 crea o pone al día el índice
+  python vault_search.py query /ruta/al/vault "ritual luna"   notas por relevancia (bm25) con fragmento
+
+Opciones de query:
+  --project "Proyecto X"   --role user|assistant|tool   --tag ritual
+  --since 2024-01-01  --until 2024-12-31  --limit 20
+  --fts                    pasa la consulta tal cual a FTS5 (AND/OR/NOT, "frases", prefijo*)
+  --update                 pone al día el índice antes de buscar
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from run_stats import RunStats, add_stats_arguments, stats_from_args
+from tree_index import parse_frontmatter
+from vault_catalog import split_front_matter
+from vault_jobs import SKIP_DIRS
+
+INDEX_NAME = ".memoria_search.sqlite"
+SCHEMA_VERSION = 1
+
+# Igual que vault_cleaner.parse_note_text
+ROLE_SPLIT_RE = re.compile(r"^###\s+([A-Za-z]+)\s*$", re.MULTILINE)
+
+# Cada nota reserva un rango de rowids en la tabla FTS: borrarla es un DELETE por rango
+MSG_BITS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY,
+    path     TEXT UNIQUE NOT NULL,  -- ruta relativa al vault, con '/'
+    size     INTEGER,
+    mtime_ns INTEGER
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages USING fts5(
+    content,
+    path UNINDEXED, role UNINDEXED, title UNINDEXED,
+    project UNINDEXED, date UNINDEXED, tags UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+def split_messages(body: str) -> List[Tuple[str, str]]:
+    """[(rol, contenido)] de las secciones '### Role' del cuerpo."""
+    parts = ROLE_SPLIT_RE.split(body)
+    return [(parts[i].strip().lower(), parts[i + 1].strip()) for i in range(1, len(parts), 2)]
+
+def note_rows(text: str, fallback_title: str) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+    fm_lines, body = split_front_matter(text)
+    fm = parse_frontmatter(fm_lines) if fm_lines else {}
+    meta = {
+        "title": fm.get("title") or fallback_title,
+        "project": fm.get("Project_name") or "none",
+        "date": fm.get("date") or "",
+        "tags": " ".join(t.lstrip("#") for t in (fm.get("tags") or "").split()),
+    }
+    return meta, [(role, content) for role, content in split_messages(body) if content]
+
+def to_fts_query(text: str) -> str:
+    """Cada palabra como término literal (sin sintaxis FTS5), todas obligatorias."""
+    return " ".join('"' + w.replace('"', '""') + '"' for w in text.split())
+
+class SearchIndex:
+    def __init__(self, vault: Path, conversations_dir: str = "Conversaciones"):
+        self.vault = Path(vault)
+        self.base = self.vault / conversations_dir
+        self.db_path = self.vault / INDEX_NAME
+        self.conn = sqlite3.connect(str(self.db_path))
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            # Índice de otra versión: es derivable del vault, se rehace entero
+            self.conn.close()
+            self.db_path.unlink()
+            self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def _walk(self) -> Iterator[Path]:
+        for root, dirs, files in os.walk(self.base):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            for fn in sorted(files):
+                if fn.lower().endswith(".md"):
+                    yield Path(root) / fn
+
+    def _drop(self, note_id: int) -> None:
+        lo = note_id << MSG_BITS
+        self.conn.execute("DELETE FROM messages WHERE rowid BETWEEN ? AND ?", (lo, lo + (1 << MSG_BITS) - 1))
+
+    def update(self, verbose: bool = False, run_stats: Optional[RunStats] = None) -> Dict[str, int]:
+        """Pone el índice al día con el vault. Devuelve {indexadas, sin_cambios, eliminadas}."""
+        run_stats = run_stats or RunStats("vault_search")
+        stats = {"indexadas": 0, "sin_cambios": 0, "eliminadas": 0}
+        known = {p: (i, s, m) for i, p, s, m in self.conn.execute("SELECT id, path, size, mtime_ns FROM files")}
+        seen = set()
+        with self.conn:
+            for p in self._walk():
+                rel = p.relative_to(self.vault).as_posix()
+                seen.add(rel)
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                prev = known.get(rel)
+                if prev and prev[1:] == (st.st_size, st.st_mtime_ns):
+                    stats["sin_cambios"] += 1
+                    continue
+                if prev:
+                    note_id = prev[0]
+                    self._drop(note_id)
+                    self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                      (st.st_size, st.st_mtime_ns, note_id))
+                else:
+                    note_id = self.conn.execute("INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                                (rel, st.st_size, st.st_mtime_ns)).lastrowid
+                meta, msgs = note_rows(p.read_text(encoding="utf-8", errors="ignore"), p.stem)
+                base_rowid = note_id << MSG_BITS
+                self.conn.executemany(
+                    "INSERT INTO messages (rowid, content, path, role, title, project, date, tags)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(base_rowid + i, content, rel, role, meta["title"], meta["project"], meta["date"], meta["tags"])
+                     for i, (role, content) in enumerate(msgs[:(1 << MSG_BITS) - 1])])
+                stats["indexadas"] += 1
+                run_stats.add(files_read=1, bytes_read=st.st_size, notes=1)
+                if verbose:
+                    print(f"✔ {rel} ({len(msgs)} mensajes)")
+            for rel, (note_id, _, _) in known.items():
+                if rel not in seen:
+                    self._drop(note_id)
+                    self.conn.execute("DELETE FROM files WHERE id = ?", (note_id,))
+                    stats["eliminadas"] += 1
+                    if verbose:
+                        print(f"✖ {rel}")
+        run_stats.cache("files", hits=stats["sin_cambios"], misses=stats["indexadas"])
+        return stats
+
+    def search(self, query: str, limit: int = 20, project: Optional[str] = None, role: Optional[str] = None,
+               tag: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+               snippet_tokens: int = 16) -> List[Dict[str, str]]:
+        """Notas ordenadas por su mensaje más relevante (bm25), con un fragmento de ese mensaje."""
+        sql = ["SELECT path, title, project, date, role,"
+               " snippet(messages, 0, '«', '»', '…', ?) FROM messages WHERE messages MATCH ?"]
+        params: List = [snippet_tokens, query]
+        if project:
+            sql.append("AND project = ?")
+            params.append(project)
+        if role:
+            sql.append("AND role = ?")
+            params.append(role.lower())
+        if tag:
+            sql.append("AND instr(' ' || tags || ' ', ?) > 0")
+            params.append(f" {tag.lstrip('#')} ")
+        if since:
+            sql.append("AND date >= ?")
+            params.append(since)
+        if until:
+            sql.append("AND date <= ?")
+            params.append(until)
+        sql.append("ORDER BY rank")
+
+        hits: List[Dict[str, str]] = []
+        seen = set()
+        # El cursor es perezoso: se deja de leer al llenar `limit` notas distintas
+        for path, title, proj, date, r, snip in self.conn.execute(" ".join(sql), params):
+            if path in seen:
+                continue
+            seen.add(path)
+            hits.append({"path": path, "title": title, "project": proj, "date": date, "role": r,
+                         "snippet": " ".join(snip.split())})
+            if len(hits) >= limit:
+                break
+        return hits
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(description="Índice de texto completo (FTS5) y búsqueda en un Vault.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    ap_index = sub.add_parser("index", help="Crea o pone al día el índice")
+    ap_index.add_argument("vault", help="Carpeta raíz del Vault")
+    ap_index.add_argument("--rebuild", action="store_true", help=f"Borra {INDEX_NAME} y lo rehace")
+    ap_index.add_argument("--verbose", action="store_true")
+
+    ap_query = sub.add_parser("query", help="Busca en el índice")
+    ap_query.add_argument("vault", help="Carpeta raíz del Vault")
+    ap_query.add_argument("text", help="Palabras a buscar (todas deben aparecer en el mismo mensaje)")
+    ap_query.add_argument("--fts", action="store_true", help="La consulta usa la sintaxis de FTS5")
+    ap_query.add_argument("--project", default=None)
+    ap_query.add_argument("--role", default=None, help="user, assistant, tool…")
+    ap_query.add_argument("--tag", default=None)
+    ap_query.add_argument("--since", default=None, help="Fecha mínima YYYY-MM-DD")
+    ap_query.add_argument("--until", default=None, help="Fecha máxima YYYY-MM-DD")
+    ap_query.add_argument("--limit", type=int, default=20)
+    ap_query.add_argument("--update", action="store_true", help="Pone al día el índice antes de buscar")
+
+    for p in (ap_index, ap_query):
+        p.add_argument("--conversations-dir", default="Conversaciones", help="Subcarpeta a indexar dentro del vault")
+        add_stats_arguments(p)
+    args = ap.parse_args(argv)
+
+    vault = Path(args.vault).expanduser().resolve()
+    if not vault.is_dir():
+        sys.exit(f"❌ Carpeta no válida: {vault}")
+
+    run_stats = stats_from_args("vault_search", args)
+    if args.cmd == "index":
+        if args.rebuild and (vault / INDEX_NAME).exists():
+            (vault / INDEX_NAME).unlink()
+        t0 = time.perf_counter()
+        with run_stats.stage("index"), SearchIndex(vault, args.conversations_dir) as idx:
+            stats = idx.update(args.verbose, run_stats)
+        print(f"✅ Índice: {vault / INDEX_NAME}")
+        print(f"   Notas indexadas: {stats['indexadas']}  ·  sin cambios: {stats['sin_cambios']}"
+              f"  ·  eliminadas: {stats['eliminadas']}  ({time.perf_counter() - t0:.1f} s)")
+        run_stats.finish()
+        return
+
+    if not args.update and not (vault / INDEX_NAME).exists():
+        sys.exit(f"❌ No hay índice en {vault}. Créalo con: python vault_search.py index \"{vault}\"")
+    with SearchIndex(vault, args.conversations_dir) as idx:
+        if args.update:
+            with run_stats.stage("index"):
+                idx.update(run_stats=run_stats)
+        query = args.text if args.fts else to_fts_query(args.text)
+        t0 = time.perf_counter()
+        try:
+            with run_stats.stage("query"):
+                hits = idx.search(query, args.limit, args.project, args.role, args.tag, args.since, args.until)
+        except sqlite3.OperationalError as e:
+            sys.exit(f"❌ Consulta no válida ({e})")
+        ms = (time.perf_counter() - t0) * 1000
+
+    for i, h in enumerate(hits, 1):
+        print(f"{i}. {h['date']} · {h['project']} · {h['path']}")
+        print(f"   {h['title']}")
+        print(f"   [{h['role']}] {h['snippet']}")
+    print(f"\n{len(hits)} notas en {ms:.0f} ms")
+    run_stats.finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vault_transform.py — Motor único para el Escuadrón de limpieza.
+
+Lee cada nota UNA vez, aplica en memoria las etapas elegidas (en el orden dado)
+y escribe como mucho una vez por nota, con un único .bak. Cada etapa es la misma
+transformación que su script suelto, así que los contadores por etapa coinciden
+con ejecutar los scripts uno detrás de otro con --in-place.
+
+Etapas:
+  inject       ImageLinkInjector     (sediment://file_<id> → ![[IMAGE_BANK/...]], requiere --image-bank)
+  roleblock    RoleBlockExtractor    (dicts en bloques ### User/Assistant/Tool)
+  tether       RenderTetherQuotes    (tether_quote → cita legible)
+  imageblocks  CleanImageToolBlocks  (wikilinks de imagen fuera de los {…})
+  tidy         TidyBlankLines        (líneas en blanco múltiples)
+
+Uso:
+  python vault_transform.py /ruta/al/vault --stages roleblock,tether,imageblocks,tidy --in-place
+  python vault_transform.py /ruta/al/vault --image-bank /ruta/IMAGE_BANK --in-place
+
+Con --catalog (y --in-place) las notas reescritas se actualizan en el catálogo SQLite del vault.
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import CleanImageToolBlocks
+import ImageLinkInjector
+import RenderTetherQuotes
+import RoleBlockExtractor
+import TidyBlankLines
+from run_stats import add_stats_arguments, stats_from_args
+from vault_catalog import VaultCatalog
+from vault_jobs import SKIP_DIRS, add_jobs_argument, run_jobs
+
+# ---------------- Etapas ----------------
+# Cada etapa: (texto, opciones) → (texto nuevo, contadores de esa nota)
+
+def stage_inject(text: str, opts: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+    new_text, subs, missing = ImageLinkInjector.transform_text(text, opts["image_bank"], opts["wiki_prefix"])
+    return new_text, {"archivos_con_referencias": int(bool(subs or missing)), "enlaces": subs, "sin_imagen": missing}
+
+def stage_roleblock(text: str, opts: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+    new_text, changed, count = RoleBlockExtractor.transform_text(text, keep_json=opts["keep_json"])
+    return new_text, {"archivos": int(changed), "bloques": count}
+
+def stage_tether(text: str, opts: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+    new_text, conv = RenderTetherQuotes.transform_text(text)
+    return new_text, {"convertidos": conv}
+
+def stage_imageblocks(text: str, opts: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+    new_text, links, blocks = CleanImageToolBlocks.transform_text(text)
+    return new_text, {"enlaces": links, "bloques": blocks}
+
+def stage_tidy(text: str, opts: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+    new_text = TidyBlankLines.tidy_text(text)
+    return new_text, {"archivos": int(new_text != text)}
+
+STAGES: Dict[str, Callable[[str, Dict[str, Any]], Tuple[str, Dict[str, int]]]] = {
+    "inject": stage_inject,
+    "roleblock": stage_roleblock,
+    "tether": stage_tether,
+    "imageblocks": stage_imageblocks,
+    "tidy": stage_tidy,
+}
+DEFAULT_STAGES = ["roleblock", "tether", "imageblocks", "tidy"]
+
+# ---------------- Motor ----------------
+
+def transform_note(text: str, stages: List[str], opts: Dict[str, Any],
+                   timings: Optional[List[float]] = None) -> Tuple[str, List[Dict[str, int]]]:
+    """Aplica las etapas en orden sobre el texto en memoria (si se pasa `timings`, añade los segundos de cada una)."""
+    per_stage = []
+    for name in stages:
+        t0 = time.perf_counter()
+        text, counts = STAGES[name](text, opts)
+        if timings is not None:
+            timings.append(time.perf_counter() - t0)
+        per_stage.append(counts)
+    return text, per_stage
+
+def process_note(path: Path, stages: List[str], opts: Dict[str, Any],
+                 in_place: bool, make_backup: bool,
+                 timings: Optional[List[float]] = None) -> Tuple[bool, List[Dict[str, int]]]:
+    """Lee la nota una vez, la transforma y la escribe como mucho una vez."""
+    original = path.read_text(encoding="utf-8", errors="ignore")
+    text, per_stage = transform_note(original, stages, opts, timings)
+    changed = text != original
+    if in_place and changed:
+        if make_backup:
+            bak = path.with_suffix(path.suffix + ".bak")
+            if not bak.exists():
+                shutil.copy2(path, bak)
+        path.write_text(text, encoding="utf-8")
+    return changed, per_stage
+
+# Etapas y opciones por proceso (el índice del banco viaja una vez con el initializer)
+_JOB_CTX: Dict[str, Any] = {}
+
+def _init_job(stages: List[str], opts: Dict[str, Any], timed: bool = False):
+    _JOB_CTX["stages"] = stages
+    _JOB_CTX["opts"] = opts
+    _JOB_CTX["timed"] = timed
+
+def _process_note_job(path: Path, in_place: bool,
+                      make_backup: bool) -> Tuple[bool, List[Dict[str, int]], Optional[List[float]]]:
+    timings: Optional[List[float]] = [] if _JOB_CTX["timed"] else None
+    changed, per_stage = process_note(path, _JOB_CTX["stages"], _JOB_CTX["opts"], in_place, make_backup, timings)
+    return changed, per_stage, timings
+
+def walk_md(root: Path):
+    for p in root.rglob("*.md"):
+        if set(p.parts) & SKIP_DIRS:
+            continue
+        yield p
+
+def parse_stages(raw: str) -> List[str]:
+    stages = [s.strip().lower() for s in raw.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise SystemExit(f"❌ Etapas desconocidas: {', '.join(unknown)} (válidas: {', '.join(STAGES)})")
+    return stages
+
+def main(argv: List[str] | None = None):
+    ap = argparse.ArgumentParser(description="Aplica varias limpiezas al Vault en una sola pasada por nota.")
+    ap.add_argument("vault", help="Carpeta raíz del Vault")
+    ap.add_argument("--stages", default=None,
+                    help=f"Etapas en orden, separadas por comas ({', '.join(STAGES)}). "
+                         f"Por defecto: inject (si hay --image-bank) + {','.join(DEFAULT_STAGES)}")
+    ap.add_argument("--image-bank", default=None, help="Banco de imágenes para la etapa inject")
+    ap.add_argument("--wiki-prefix", default="IMAGE_BANK", help="Prefijo de los wikilinks de inject")
+    ap.add_argument("--keep-json", action="store_true", help="roleblock: añade el dict original colapsado")
+    ap.add_argument("--in-place", action="store_true", help="Aplica cambios en los archivos")
+    ap.add_argument("--no-backup", action="store_true", help="No crear .bak")
+    ap.add_argument("--catalog", action="store_true", help="Actualiza el catálogo SQLite del vault con las notas escritas")
+    add_jobs_argument(ap)
+    add_stats_arguments(ap)
+    args = ap.parse_args(argv)
+    stats = stats_from_args("vault_transform", args)
+
+    vault = Path(args.vault).expanduser().resolve()
+    if not vault.is_dir():
+        sys.exit(f"❌ Carpeta no válida: {vault}")
+
+    if args.stages:
+        stages = parse_stages(args.stages)
+    else:
+        stages = (["inject"] if args.image_bank else []) + DEFAULT_STAGES
+
+    opts: Dict[str, Any] = {"keep_json": args.keep_json, "wiki_prefix": args.wiki_prefix, "image_bank": None}
+    if "inject" in stages:
+        if not args.image_bank:
+            sys.exit("❌ La etapa inject necesita --image-bank")
+        img_dir = Path(args.image_bank).expanduser().resolve()
+        if not img_dir.is_dir():
+            sys.exit(f"❌ Carpeta de imágenes no válida: {img_dir}")
+        with stats.stage("bank_index"):
+            opts["image_bank"] = ImageLinkInjector.ImageBankIndex.load(img_dir)
+        cached = opts["image_bank"].from_cache
+        stats.cache("bank_index", hits=int(cached), misses=int(not cached))
+
+    files = list(walk_md(vault))
+    print(f"Escaneando {len(files)} notas · etapas: {' → '.join(stages)}\n")
+
+    totals: List[Dict[str, int]] = [{} for _ in stages]
+    written = 0
+    changed_paths: List[Path] = []
+    job = partial(_process_note_job, in_place=args.in_place, make_backup=not args.no_backup)
+    with stats.stage("process", notes=len(files)):
+        stats.read_files(files)
+        results = run_jobs(job, files, args.jobs, initializer=_init_job,
+                           initargs=(stages, opts, stats.enabled), stats=stats)
+        for md, (changed, per_stage, timings) in zip(files, results):
+            for acc, counts in zip(totals, per_stage):
+                for k, v in counts.items():
+                    acc[k] = acc.get(k, 0) + v
+            # Tiempo de cada etapa sumado en los procesos que la ejecutan
+            for name, seconds in zip(stages, timings or []):
+                stats.add_time(f"stage:{name}", seconds)
+            if changed:
+                written += 1
+                changed_paths.append(md)
+                print(f"✔ {md.relative_to(vault)}")
+                if args.in_place:
+                    stats.wrote(md)
+
+    print("\nResumen por etapa:")
+    for name, acc in zip(stages, totals):
+        detail = ", ".join(f"{k}={v}" for k, v in acc.items()) or "sin cambios"
+        print(f"- {name}: {detail}")
+    print(f"- Notas {'escritas' if args.in_place else 'con cambios'}: {written}")
+    if args.catalog and args.in_place:
+        with VaultCatalog.for_vault(vault) as cat:
+            cat.refresh(changed_paths)
+        print(f"- Catálogo actualizado: {len(changed_paths)} notas")
+    if not args.in_place:
+        print("(Dry-run: sin escribir cambios, usa --in-place para aplicarlos)")
+    stats.finish()
+
+if __name__ == "__main__":
+    main()